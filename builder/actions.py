@@ -1,12 +1,12 @@
-from collections import defaultdict
-
 import structlog
 from django.db import transaction
 from django.db.models import Count
 from django.utils.text import slugify
 
+from codelists import actions as codelists_actions
 from codelists.hierarchy import Hierarchy
 from codelists.models import CodeObj, SearchResult
+from opencodelists.db_utils import bulk_update_by_key
 
 logger = structlog.get_logger()
 
@@ -59,30 +59,41 @@ def delete_search(*, search):
 
 @transaction.atomic
 def update_code_statuses(*, draft, updates):
+    """Apply a batch of updates to the statuses of a draft's codes, and return a
+    mapping from each code whose status has changed to its new status.
+
+    Changed statuses are written with db_utils.bulk_update_by_key().
+    """
+
     code_to_status = dict(draft.code_objs.values_list("code", "status"))
     h = Hierarchy.from_codes(draft.coding_system, list(code_to_status))
     new_code_to_status = h.update_node_to_status(code_to_status, updates)
 
-    status_to_new_code = defaultdict(list)
-    for code, status in new_code_to_status.items():
-        status_to_new_code[status].append(code)
+    changes = {
+        code: status
+        for code, status in new_code_to_status.items()
+        if code in code_to_status and code_to_status[code] != status
+    }
 
-    for status, codes in status_to_new_code.items():
-        draft.code_objs.filter(code__in=codes).update(status=status)
+    bulk_update_by_key(CodeObj, {"version": draft.pk}, "code", "status", changes)
 
     logger.info("Updated code statuses", draft_pk=draft.pk)
 
+    return changes
+
 
 def save(*, draft):
     """Convert CodelistVersion from something that's in the builder to something that's
     shown on the site.
 
-    All this does is unset the draft_owner attribute.
+    All this does is unset the draft_owner attribute, and add the version's codes to the
+    index of codes.
     """
 
     assert not draft.code_objs.filter(status__in=["?", "!"]).exists()
     draft.draft_owner = None
     draft.save()
+    codelists_actions.update_code_index(version=draft)
 
 
 def discard_draft(*, draft):
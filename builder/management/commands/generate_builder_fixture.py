@@ -51,35 +51,13 @@ class Command(BaseCommand):
                     "searches",
                     "filter",
                     "tree_tables",
-                    "all_codes",
-                    "included_codes",
-                    "excluded_codes",
-                    "parent_map",
-                    "child_map",
-                    "code_to_term",
-                    "code_to_status",
+                    "hierarchy",
                     "is_editable",
                     "update_url",
                     "search_url",
                 ]
             }
 
-            # Ensure that all fields are sorted, to allow for meaningful diffs should
-            # the data change.
-            data["all_codes"] = sorted(data["all_codes"])
-            data["included_codes"] = sorted(data["included_codes"])
-            data["excluded_codes"] = sorted(data["excluded_codes"])
-            data["parent_map"] = {
-                code: sorted(parents)
-                for code, parents in sorted(data["parent_map"].items())
-            }
-            data["child_map"] = {
-                code: sorted(children)
-                for code, children in sorted(data["child_map"].items())
-            }
-            data["code_to_term"] = dict(sorted(data["code_to_term"].items()))
-            data["code_to_status"] = dict(sorted(data["code_to_status"].items()))
-
             js_fixtures_path = Path(
                 settings.BASE_DIR, "static", "test", "js", "fixtures"
             )
@@ -155,7 +155,14 @@ def test_update_code_statuses(tennis_elbow):
     )
 
     # Act: process single update from the client
-    actions.update_code_statuses(draft=draft, updates=[("35185008", "+")])
+    changes = actions.update_code_statuses(draft=draft, updates=[("35185008", "+")])
+
+    # Assert that only the codes whose statuses have changed are returned
+    assert changes == {
+        "35185008": "+",  # Enthesopathy of elbow region
+        "73583000": "(+)",  # Epicondylitis
+        "202855006": "(+)",  # Lateral epicondylitis
+    }
 
     # Assert that results have the expected status
     assert dict(draft.code_objs.values_list("code", "status")) == {
@@ -1,3 +1,10 @@
+import gc
+import json
+import weakref
+
+from codelists.hierarchy import Hierarchy
+
+
 def test_draft_with_no_searches(client, draft_with_no_searches):
     client.force_login(draft_with_no_searches.draft_owner)
     rsp = client.get(draft_with_no_searches.get_builder_url("draft"))
@@ -44,3 +51,53 @@ def test_no_search_term(client, draft_with_some_searches):
 
     assert rsp.status_code == 200
     assert b"No search term" in rsp.content
+
+
+def test_update(client, draft_with_no_searches):
+    draft = draft_with_no_searches
+    client.force_login(draft.draft_owner)
+    rsp = client.post(
+        draft.get_builder_url("update"),
+        json.dumps(
+            {"seq": 3, "updates": [["439656005", "+"]]}  # include "Arthritis of elbow"
+        ),
+        content_type="application/json",
+    )
+
+    assert rsp.status_code == 200
+    assert rsp.json() == {
+        "seq": 3,
+        "updates": [["439656005", "+"]],
+        "changes": {
+            "439656005": "+",  # Arthritis of elbow
+            "202855006": "(+)",  # Lateral epicondylitis
+        },
+    }
+    assert draft.code_objs.get(code="439656005").status == "+"
+
+
+def test_hierarchies_are_freed_after_request(
+    client, draft_with_no_searches, monkeypatch
+):
+    # Record a weak reference to each Hierarchy built while handling the request
+    refs = []
+    from_codes = Hierarchy.from_codes.__func__
+
+    def recording_from_codes(cls, coding_system, codes):
+        hierarchy = from_codes(cls, coding_system, codes)
+        refs.append(weakref.ref(hierarchy))
+        return hierarchy
+
+    monkeypatch.setattr(Hierarchy, "from_codes", classmethod(recording_from_codes))
+
+    draft = draft_with_no_searches
+    client.force_login(draft.draft_owner)
+    client.post(
+        draft.get_builder_url("update"),
+        json.dumps({"updates": [["439656005", "+"]]}),
+        content_type="application/json",
+    )
+
+    gc.collect()
+    assert refs
+    assert all(ref() is None for ref in refs)
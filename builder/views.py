@@ -7,6 +7,7 @@ from django.shortcuts import get_object_or_404, redirect, render
 from django.views.decorators.http import require_http_methods
 
 from codelists.hierarchy import Hierarchy
+from codelists.presenters import present_compact_hierarchy
 from codelists.search import do_search
 
 from . import actions
@@ -58,9 +59,6 @@ def _draft(request, draft, search_slug):
     code_to_status = dict(draft.code_objs.values_list("code", "status"))
     all_codes = list(code_to_status)
 
-    included_codes = [c for c in all_codes if code_to_status[c] == "+"]
-    excluded_codes = [c for c in all_codes if code_to_status[c] == "-"]
-
     if search_slug is None:
         search = None
         displayed_codes = list(code_to_status)
@@ -130,13 +128,7 @@ def _draft(request, draft, search_slug):
         "searches": searches,
         "filter": filter,
         "tree_tables": tree_tables,
-        "all_codes": all_codes,
-        "included_codes": included_codes,
-        "excluded_codes": excluded_codes,
-        "parent_map": {p: list(cc) for p, cc in hierarchy.parent_map.items()},
-        "child_map": {c: list(pp) for c, pp in hierarchy.child_map.items()},
-        "code_to_term": code_to_term,
-        "code_to_status": code_to_status,
+        "hierarchy": present_compact_hierarchy(hierarchy, code_to_status, code_to_term),
         "is_editable": request.user == draft.draft_owner,
         "update_url": update_url,
         "search_url": search_url,
@@ -150,9 +142,20 @@ def _draft(request, draft, search_slug):
 @require_http_methods(["POST"])
 @load_draft
 def update(request, draft):
-    updates = json.loads(request.body)["updates"]
-    actions.update_code_statuses(draft=draft, updates=updates)
-    return JsonResponse({"updates": updates})
+    """Apply a batch of status updates from the builder.
+
+    The request contains a list of updates, and a sequence number which is echoed back
+    in the response so that the client can match responses to requests.  The response
+    also contains the new status of each code whose status has changed, so that the
+    client can check that its statuses agree with the server's.
+    """
+
+    data = json.loads(request.body)
+    updates = data["updates"]
+    changes = actions.update_code_statuses(draft=draft, updates=updates)
+    return JsonResponse(
+        {"seq": data.get("seq"), "updates": updates, "changes": changes}
+    )
 
 
 @login_required
@@ -4,12 +4,14 @@ from django.utils.text import slugify
 
 from builder import actions as builder_actions
 from coding_systems.snomedct import ecl_parser
-from opencodelists.dict_utils import invert_dict
+from opencodelists.db_utils import bulk_update_by_key
 from opencodelists.models import User
 
+from .compact import pack_code_statuses, unpack_code_statuses
 from .definition2 import Definition2
+from .diffs import compute_diff
 from .hierarchy import Hierarchy
-from .models import CodeObj
+from .models import CodeObj, IndexedCode, VersionDiff
 from .search import do_search
 
 logger = structlog.get_logger()
@@ -80,6 +82,7 @@ def create_codelist_with_codes(*, owner, name, coding_system_id, codes, slug=Non
         CodeObj(version=version, code=code, status=status)
         for code, status in definition.code_to_status(hierarchy).items()
     )
+    update_code_index(version=version)
 
     return codelist
 
@@ -121,6 +124,7 @@ def create_signoff(*, codelist, user, date):
 
 def create_version(*, codelist, csv_data):
     version = codelist.versions.create(csv_data=csv_data)
+    update_code_index(version=version)
     logger.info("Created Version", version_pk=version.pk)
     return version
 
@@ -162,6 +166,11 @@ def create_version_with_codes(
         if node in codes
     )
 
+    update_code_index(version=next_clv)
+    previous_version = previous_published_version(next_clv)
+    if previous_version is not None:
+        record_version_diff(version=next_clv, previous_version=previous_version)
+
     return next_clv
 
 
@@ -239,26 +248,150 @@ def update_codelist(*, codelist, description, methodology):
     return codelist
 
 
+@transaction.atomic
 def update_version(*, version, csv_data):
     """Update a version."""
 
     assert version.is_draft
     version.csv_data = csv_data
     version.save()
+    update_code_index(version=version)
 
     logger.info("Updated Version", version_pk=version.pk)
 
 
+@transaction.atomic
 def publish_version(*, version):
-    """Publish a version."""
+    """Publish a version, and record how it differs from the previously published
+    version, if there is one."""
 
     assert version.is_draft
     version.is_draft = False
     version.save()
 
+    previous_version = previous_published_version(version)
+    if previous_version is not None:
+        record_version_diff(version=version, previous_version=previous_version)
+
     logger.info("Published Version", version_pk=version.pk)
 
 
+def previous_published_version(version):
+    """Return the latest published version of the version's codelist that was created
+    before the version, or None if there is no such version."""
+
+    return (
+        version.codelist.versions.filter(
+            is_draft=False, draft_owner=None, id__lt=version.id
+        )
+        .order_by("id")
+        .last()
+    )
+
+
+@transaction.atomic
+def compact_version(*, version):
+    """Replace a published new-style version's CodeObjs with the version's
+    compact_code_statuses column, which holds the statuses of the version's codes in
+    much less space.
+
+    Versions with searches are left alone, since their searches' results refer to their
+    CodeObjs.  Compacting can be undone with expand_version().
+    """
+
+    assert not version.is_draft
+    assert not version.csv_data
+    assert version.compact_code_statuses is None
+
+    if version.searches.exists():
+        return
+
+    version.compact_code_statuses = pack_code_statuses(
+        dict(version.code_objs.values_list("code", "status"))
+    )
+    version.save()
+    version.code_objs.all().delete()
+
+    logger.info("Compacted Version", version_pk=version.pk)
+
+
+@transaction.atomic
+def expand_version(*, version):
+    """Recreate the CodeObjs of a version that was compacted by compact_version()."""
+
+    assert version.compact_code_statuses is not None
+
+    CodeObj.objects.bulk_create(
+        CodeObj(version=version, code=code, status=status)
+        for code, status in unpack_code_statuses(version.compact_code_statuses).items()
+    )
+    version.compact_code_statuses = None
+    version.save()
+
+    logger.info("Expanded Version", version_pk=version.pk)
+
+
+def record_version_diff(*, version, previous_version):
+    """Record the differences between version and previous_version.
+
+    Nothing is recorded if the versions' coding system has no hierarchy, or if the
+    codes of either version can't be determined.
+    """
+
+    coding_system = version.coding_system
+    if not hasattr(coding_system, "ancestor_relationships"):
+        return None
+    if version.codes is None or previous_version.codes is None:
+        return None
+
+    previous_codes = set(previous_version.codes)
+    codes = set(version.codes)
+    diff = compute_diff(previous_codes, codes, coding_system)
+
+    version_diff, _ = VersionDiff.objects.update_or_create(
+        version=version,
+        previous_version=previous_version,
+        defaults={
+            "added": diff["rhs_only"],
+            "removed": diff["lhs_only"],
+            "common": diff["common"],
+            "num_added": len(codes - previous_codes),
+            "num_removed": len(previous_codes - codes),
+        },
+    )
+
+    logger.info(
+        "Recorded VersionDiff",
+        version_pk=version.pk,
+        previous_version_pk=previous_version.pk,
+    )
+
+    return version_diff
+
+
+@transaction.atomic
+def update_code_index(*, version):
+    """Replace the entries in the index of codes for the given version.
+
+    Only versions that are shown on the site are indexed, so a draft that is being
+    edited in the builder has no entries.  Nor do old-style versions whose codes we
+    can't identify.
+    """
+
+    version.indexed_codes.all().delete()
+    if version.draft_owner_id is not None or version.codes is None:
+        return
+
+    IndexedCode.objects.bulk_create(
+        IndexedCode(
+            version=version, coding_system_id=version.coding_system_id, code=code
+        )
+        for code in set(version.codes)
+    )
+
+    logger.info("Updated code index", version_pk=version.pk)
+
+
 @transaction.atomic
 def convert_codelist_to_new_style(*, codelist):
     """Convert codelist to new style.
@@ -288,6 +421,8 @@ def convert_codelist_to_new_style(*, codelist):
         if node in codes
     )
 
+    update_code_index(version=next_clv)
+
     return next_clv
 
 
@@ -297,9 +432,10 @@ def export_to_builder(*, version, owner):
 
     # Create a new CodelistVersion and CodeObjs.
     draft = owner.drafts.create(codelist=version.codelist)
+    code_to_status = version.code_to_status
     CodeObj.objects.bulk_create(
-        CodeObj(version=draft, code=code_obj.code, status=code_obj.status)
-        for code_obj in version.code_objs.all()
+        CodeObj(version=draft, code=code, status=status)
+        for code, status in code_to_status.items()
     )
 
     # Recreate each search.  This creates the SearchResults linked to the new draft.  We
@@ -313,11 +449,14 @@ def export_to_builder(*, version, owner):
         codes = do_search(version.coding_system, term)["all_codes"]
         builder_actions.create_search(draft=draft, term=term, codes=codes)
 
-    # Update each code status.
-    code_to_status = dict(version.code_objs.values_list("code", "status"))
-    status_to_code = invert_dict(code_to_status)
-    for status, codes in status_to_code.items():
-        draft.code_objs.filter(code__in=codes).update(status=status)
+    # Update the status of each code whose status differs from the original version's.
+    draft_code_to_status = dict(draft.code_objs.values_list("code", "status"))
+    changes = {
+        code: status
+        for code, status in code_to_status.items()
+        if draft_code_to_status.get(code) != status
+    }
+    bulk_update_by_key(CodeObj, {"version": draft.pk}, "code", "status", changes)
 
     # This assert will fire if new matching concepts have been imported.  At the moment,
     # the builder frontend cannot deal with a CodeObj with status ?  if any of its
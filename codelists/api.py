@@ -1,9 +1,12 @@
 from rest_framework import status
 from rest_framework.decorators import api_view
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import NotFound, PermissionDenied
 from rest_framework.response import Response
 
 from .actions import create_version_from_ecl_expr
+from .coding_systems import CODING_SYSTEMS
+from .models import IndexedCode
+from .presenters import present_code_usage
 from .views.decorators import load_codelist
 
 
@@ -32,5 +35,23 @@ def versions(request, codelist):
     return Response({"codelist_version": clv.get_absolute_url()})
 
 
+@api_view(["GET"])
+def code_usage(request, coding_system_id, code):
+    if coding_system_id not in CODING_SYSTEMS:
+        raise NotFound
+
+    indexed_codes = IndexedCode.objects.filter(
+        coding_system_id=coding_system_id, code=code
+    ).select_related("version__codelist")
+
+    return Response(
+        {
+            "coding_system_id": coding_system_id,
+            "code": code,
+            "versions": present_code_usage(indexed_codes),
+        }
+    )
+
+
 def error(msg):
     return Response({"error": msg}, status=status.HTTP_400_BAD_REQUEST)
@@ -5,7 +5,13 @@ from . import api
 app_name = "codelists_api"
 
 
-urlpatterns = []
+urlpatterns = [
+    path(
+        "code/<coding_system_id>/<code>/",
+        api.code_usage,
+        name="code_usage",
+    ),
+]
 
 for subpath, view in [
     ("<codelist_slug>/versions/", api.versions),
@@ -0,0 +1,16 @@
+from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+class CodelistsConfig(AppConfig):
+    name = "codelists"
+
+    def ready(self):
+        post_migrate.connect(handle_post_migrate, sender=self)
+
+
+def handle_post_migrate(sender, using, **kwargs):
+    # Imported here, since codelists.search can only be imported once models are loaded
+    from .search import ensure_fts_triggers
+
+    ensure_fts_triggers(using)
@@ -0,0 +1,46 @@
+"""Compact storage for the statuses of the codes in a version.
+
+The codes are sorted and joined with newlines, and are followed by a null byte and
+then by one byte for each code, holding the index of the code's status in STATUSES.
+The whole thing is compressed with zlib, and prefixed with a byte giving the version
+of the format.  Since codes are sorted, codes with long common prefixes sit next to
+each other, which helps the data compress well.
+"""
+
+import zlib
+
+FORMAT_VERSION = 1
+
+# The statuses, in the order in which their indexes are stored.  This is part of the
+# storage format, and is independent of the order in which statuses are sent to the
+# browser (see presenters.STATUSES).  It must never be changed: to store statuses
+# differently, add a new format version.
+STATUSES = ("?", "!", "+", "(+)", "-", "(-)")
+
+STATUS_TO_IX = {status: ix for ix, status in enumerate(STATUSES)}
+
+
+def pack_code_statuses(code_to_status):
+    """Return compact representation of mapping from code to status."""
+
+    codes = sorted(code_to_status)
+    payload = (
+        "\n".join(codes).encode("utf8")
+        + b"\0"
+        + bytes(STATUS_TO_IX[code_to_status[code]] for code in codes)
+    )
+    return bytes([FORMAT_VERSION]) + zlib.compress(payload)
+
+
+def unpack_code_statuses(data):
+    """Return mapping from code to status, ordered by code, from compact
+    representation returned by pack_code_statuses().
+    """
+
+    data = bytes(data)
+    if data[0] != FORMAT_VERSION:
+        raise ValueError(f"Unknown compact code statuses format: {data[0]}")
+
+    codes_data, statuses_data = zlib.decompress(data[1:]).split(b"\0", 1)
+    codes = codes_data.decode("utf8").split("\n") if codes_data else []
+    return {code: STATUSES[ix] for code, ix in zip(codes, statuses_data)}
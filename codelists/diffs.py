@@ -0,0 +1,63 @@
+"""Functions for working out the differences between two collections of codes.
+
+These are used both for recording the differences between versions when they are
+created or published (see actions.record_version_diff()), and for showing the
+differences between versions that weren't recorded.
+"""
+
+from .hierarchy import Hierarchy
+
+
+def compute_diff(lhs_codes, rhs_codes, coding_system):
+    """Return summaries of the codes that are only in lhs_codes, that are only in
+    rhs_codes, and that are in both.
+
+    A single hierarchy and a single mapping from code to term are built for all the
+    codes in either collection, and are shared between the three summaries.  Since the
+    hierarchy contains all the ancestors and descendants of every code, the
+    relationships between codes in any subset are the same as if the hierarchy had been
+    built for just that subset.
+    """
+
+    lhs_codes = set(lhs_codes)
+    rhs_codes = set(rhs_codes)
+    all_codes = lhs_codes | rhs_codes
+    hierarchy = Hierarchy.from_codes(coding_system, all_codes)
+    code_to_term = coding_system.code_to_term(all_codes)
+    for code in all_codes - set(code_to_term):
+        code_to_term[code] = "Unknown code (a TPP Y-code?)"
+
+    return {
+        "lhs_only": summarise_codes(lhs_codes - rhs_codes, hierarchy, code_to_term),
+        "rhs_only": summarise_codes(rhs_codes - lhs_codes, hierarchy, code_to_term),
+        "common": summarise_codes(lhs_codes & rhs_codes, hierarchy, code_to_term),
+    }
+
+
+def summarise_codes(codes, hierarchy, code_to_term):
+    """Return a summary of the given codes, grouped by their ultimate ancestors.
+
+    The summary is a list of dicts, one per ultimate ancestor, each with the
+    ancestor's code and term, and the codes and terms of its descendants that are in
+    codes.  Everything is sorted by term.
+    """
+
+    ancestor_codes = hierarchy.filter_to_ultimate_ancestors(codes)
+    summary = []
+    for ancestor_code in ancestor_codes:
+        descendants = sorted(
+            (
+                {"code": code, "term": code_to_term[code]}
+                for code in hierarchy.descendants(ancestor_code) & codes
+            ),
+            key=lambda d: d["term"],
+        )
+        summary.append(
+            {
+                "code": ancestor_code,
+                "term": code_to_term[ancestor_code],
+                "descendants": descendants,
+            }
+        )
+    summary.sort(key=lambda d: d["term"])
+    return summary
@@ -1,22 +1,91 @@
-from collections import defaultdict
-from functools import lru_cache
+import sys
+from collections import OrderedDict, defaultdict
 from itertools import chain
 
 from django.utils.functional import cached_property
 
+# Upper bound on the approximate size of the sets held in each Hierarchy's traversal
+# cache.
+DEFAULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+
+class TraversalCache:
+    """A least-recently-used cache for the results of traversing a Hierarchy.
+
+    Each Hierarchy has its own cache, so cached results are freed along with the
+    Hierarchy.  The cache is bounded by the approximate size of the cached sets, as
+    reported by sys.getsizeof().  This doesn't include the size of the nodes
+    themselves, which are shared with the Hierarchy.
+
+    Cached values must not be modified by callers.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bytes = 0
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        """Return cached value for key, or None if there is no such value."""
+
+        try:
+            value, _ = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Cache value for key, evicting least recently used values if the cache
+        becomes too big.
+        """
+
+        size = sys.getsizeof(value)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self.bytes -= self._entries.pop(key)[1]
+        self._entries[key] = (value, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.bytes -= evicted_size
+
+    def clear(self):
+        """Remove all cached values."""
+
+        self._entries.clear()
+        self.bytes = 0
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bytes": self.bytes,
+            "entries": len(self._entries),
+        }
+
 
 class Hierarchy:
     """A directed acyclic graph with a single root.  This is used to represent a subset
     of the concepts in a coding system.
     """
 
-    def __init__(self, root, edges):
+    def __init__(self, root, edges, cache_max_bytes=DEFAULT_CACHE_MAX_BYTES):
         """Build a hierarchy with given root and collection of edges.  Edges are
         (parent, child) tuples.
+
+        Results of calling descendants() and ancestors() are cached in a
+        TraversalCache holding no more than roughly cache_max_bytes.
         """
 
         self.root = root
         self.edges = edges
+        self.cache = TraversalCache(cache_max_bytes)
 
     @classmethod
     def from_codes(cls, coding_system, codes):
@@ -56,7 +125,6 @@ class Hierarchy:
             m[child].add(parent)
         return dict(m)
 
-    @lru_cache(maxsize=None)
     def descendants(self, node):
         """Return set of descendants of node.
 
@@ -64,29 +132,56 @@ class Hierarchy:
         descendants.
         """
 
-        descendants = set()
-        for child in self.child_map.get(node, []):
-            descendants.add(child)
-            descendants |= self.descendants(child)
+        key = ("descendants", node)
+        descendants = self.cache.get(key)
+        if descendants is None:
+            descendants = set()
+            for child in self.child_map.get(node, []):
+                descendants.add(child)
+                descendants |= self.descendants(child)
+            self.cache.put(key, descendants)
         return descendants
 
-    @lru_cache(maxsize=None)
     def ancestors(self, node):
         """Return set of ancestors of node.
 
         A node's ancestors are the node's parents, plus all the parents' ancestors.
         """
 
-        ancestors = set()
-        for parent in self.parent_map.get(node, []):
-            ancestors.add(parent)
-            ancestors |= self.ancestors(parent)
+        key = ("ancestors", node)
+        ancestors = self.cache.get(key)
+        if ancestors is None:
+            ancestors = set()
+            for parent in self.parent_map.get(node, []):
+                ancestors.add(parent)
+                ancestors |= self.ancestors(parent)
+            self.cache.put(key, ancestors)
         return ancestors
 
+    def release_cache(self):
+        """Free the memory used by cached results of descendants() and ancestors()."""
+
+        self.cache.clear()
+
     def filter_to_ultimate_ancestors(self, nodes):
-        """Given a set of nodes, return subset which have no ancestors in the set."""
+        """Given a set of nodes, return subset which have no ancestors in the set.
+
+        Rather than computing the ancestors of each node, we walk down the hierarchy
+        from the given nodes once, marking every node that is reachable from one of
+        them.  Any given node that gets marked has an ancestor in the set.  This visits
+        each node and edge below the given nodes at most once.
+        """
+
+        reachable = set()
+        stack = [child for node in nodes for child in self.child_map.get(node, ())]
+        while stack:
+            node = stack.pop()
+            if node in reachable:
+                continue
+            reachable.add(node)
+            stack.extend(self.child_map.get(node, ()))
 
-        return {node for node in nodes if not self.ancestors(node) & nodes}
+        return {node for node in nodes if node not in reachable}
 
     def update_node_to_status(self, node_to_status, updates):
         """Given a mapping from each node to its status and a list of updates, return an
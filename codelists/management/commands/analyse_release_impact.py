@@ -0,0 +1,123 @@
+"""
+Recompute the codes of every new-style codelist version against the current release of
+its coding system, and write a CSV report of the versions whose codes have changed.
+
+For each version, the report lists the codes that its definition now includes but that
+are not in the version ("added"), the codes that its definition no longer includes
+("removed"), and the version's codes that are now inactive ("inactive").
+
+Run this after importing a new release.  If --since is given, versions of coding systems
+that record when concepts change (currently SNOMED CT) are only analysed if they are
+related to a concept that has changed after that date.  Versions are analysed in a pool
+of --processes worker processes.
+"""
+
+import csv
+import datetime
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management import BaseCommand
+from django.db import connections
+
+from codelists.release_impact import (
+    analyse_version,
+    analyse_version_by_id,
+    version_is_affected,
+    versions_to_analyse,
+)
+
+
+class Command(BaseCommand):
+    help = __doc__
+
+    def add_arguments(self, parser):
+        parser.add_argument("out_path")
+        parser.add_argument(
+            "--since",
+            type=datetime.date.fromisoformat,
+            help="Date of the previous release (YYYY-MM-DD)",
+        )
+        parser.add_argument("--coding-system-ids", nargs="+")
+        parser.add_argument("--processes", type=int, default=os.cpu_count())
+
+    def handle(self, out_path, since, coding_system_ids, processes, **kwargs):
+        coding_system_id_to_changed_codes = {}
+        versions = []
+        num_skipped = 0
+
+        for version in versions_to_analyse(coding_system_ids).iterator():
+            coding_system = version.coding_system
+            if not hasattr(coding_system, "ancestor_relationships"):
+                continue
+
+            if since and hasattr(coding_system, "codes_changed_since"):
+                if version.coding_system_id not in coding_system_id_to_changed_codes:
+                    coding_system_id_to_changed_codes[
+                        version.coding_system_id
+                    ] = coding_system.codes_changed_since(since)
+                changed_codes = coding_system_id_to_changed_codes[
+                    version.coding_system_id
+                ]
+                if not version_is_affected(version, changed_codes):
+                    num_skipped += 1
+                    continue
+
+            versions.append(version)
+
+        if processes > 1:
+            # Worker processes are forked from this one, and must not share its
+            # database connections.
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=processes) as executor:
+                results = list(
+                    executor.map(
+                        analyse_version_by_id,
+                        [version.pk for version in versions],
+                        chunksize=8,
+                    )
+                )
+        else:
+            results = [analyse_version(version) for version in versions]
+
+        id_to_version = {version.pk: version for version in versions}
+        num_changed = 0
+
+        with open(out_path, "w") as f:
+            writer = csv.DictWriter(
+                f,
+                [
+                    "version",
+                    "coding_system",
+                    "num_added",
+                    "num_removed",
+                    "num_inactive",
+                    "added",
+                    "removed",
+                    "inactive",
+                ],
+            )
+            writer.writeheader()
+
+            for result in results:
+                if not (result["added"] or result["removed"] or result["inactive"]):
+                    continue
+                num_changed += 1
+                version = id_to_version[result["version_id"]]
+                writer.writerow(
+                    {
+                        "version": version.full_slug(),
+                        "coding_system": version.coding_system_id,
+                        "num_added": len(result["added"]),
+                        "num_removed": len(result["removed"]),
+                        "num_inactive": len(result["inactive"]),
+                        "added": " ".join(result["added"]),
+                        "removed": " ".join(result["removed"]),
+                        "inactive": " ".join(result["inactive"]),
+                    }
+                )
+
+        self.stdout.write(
+            f"Analysed {len(results)} versions ({num_skipped} skipped as unaffected), "
+            f"of which {num_changed} have changed"
+        )
@@ -0,0 +1,76 @@
+"""
+Report how long it takes to write the statuses of many codes in a version, comparing
+db_utils.bulk_update_by_key() with issuing one UPDATE per status.
+
+The benchmark runs against an in-memory database.
+"""
+
+import time
+
+from django.core.management import BaseCommand
+
+from builder.management.commands.generate_builder_fixture import set_up_db
+from codelists.actions import create_codelist
+from codelists.models import CodeObj
+from opencodelists.actions import create_organisation
+from opencodelists.db_utils import bulk_update_by_key
+from opencodelists.dict_utils import invert_dict
+
+DEFAULT_SIZES = [1000, 10000, 50000]
+STATUSES = ["+", "(+)", "-", "(-)"]
+
+
+class Command(BaseCommand):
+    help = __doc__
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+
+    def handle(self, sizes, **kwargs):
+        set_up_db()
+
+        organisation = create_organisation(name="Benchmark", url="https://example.com")
+
+        self.stdout.write(f"{'size':>8} {'per status':>12} {'bulk':>12}")
+        for size in sizes:
+            codelist = create_codelist(
+                owner=organisation,
+                name=f"Benchmark {size}",
+                coding_system_id="snomedct",
+                description="",
+                methodology="",
+                csv_data="code\n",
+            )
+            version = codelist.versions.get()
+            codes = [f"{ix:09}" for ix in range(size)]
+            CodeObj.objects.bulk_create(
+                (CodeObj(version=version, code=code, status="?") for code in codes),
+                batch_size=1000,
+            )
+
+            code_to_status = {
+                code: STATUSES[ix % len(STATUSES)] for ix, code in enumerate(codes)
+            }
+            per_status_time = time_it(
+                lambda: per_status_update(version, code_to_status)
+            )
+
+            version.code_objs.update(status="?")
+            bulk_time = time_it(
+                lambda: bulk_update_by_key(
+                    CodeObj, {"version": version.pk}, "code", "status", code_to_status
+                )
+            )
+
+            self.stdout.write(f"{size:>8} {per_status_time:>12.3f} {bulk_time:>12.3f}")
+
+
+def per_status_update(version, code_to_status):
+    for status, codes in invert_dict(code_to_status).items():
+        version.code_objs.filter(code__in=codes).update(status=status)
+
+
+def time_it(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
@@ -0,0 +1,138 @@
+"""
+Report how long codelists.views.version takes to render versions of increasing size.
+
+A synthetic SNOMED CT hierarchy is built in an in-memory database, and for each size a
+codelist is created from most of the concepts, some of which are inactive.  The
+version page for each codelist is then requested several times, and the fastest time
+is reported.
+"""
+
+import time
+from datetime import date
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import BaseCommand, call_command
+from django.test.client import Client
+
+from builder.management.commands.generate_builder_fixture import set_up_db
+from codelists.actions import create_codelist_with_codes
+from coding_systems.snomedct.models import (
+    FULLY_SPECIFIED_NAME,
+    INFERRED_RELATIONSHIP,
+    IS_A,
+    ROOT_CONCEPT,
+    Concept,
+    Description,
+    Relationship,
+)
+from opencodelists.actions import create_organisation
+
+# These concepts are defined in core-model-components.json
+MODULE = "900000000000207008"
+DEFINITION_STATUS = "900000000000074008"
+CASE_SIGNIFICANCE = "900000000000448009"
+EXISTENTIAL_MODIFIER = "900000000000451002"
+
+DEFAULT_SIZES = [100, 1000, 5000, 10000]
+
+
+class Command(BaseCommand):
+    help = __doc__
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+        parser.add_argument("--repeats", type=int, default=3)
+        parser.add_argument("--branching-factor", type=int, default=10)
+
+    def handle(self, sizes, repeats, branching_factor, **kwargs):
+        set_up_db()
+
+        snomed_fixtures_path = Path(
+            settings.BASE_DIR, "coding_systems", "snomedct", "fixtures"
+        )
+        call_command("loaddata", snomed_fixtures_path / "core-model-components.json")
+
+        organisation = create_organisation(name="Benchmark", url="https://example.com")
+        client = Client()
+
+        self.stdout.write(f"{'size':>8} {'seconds':>10}")
+        for size in sizes:
+            codes = build_synthetic_hierarchy(size, branching_factor)
+            codelist = create_codelist_with_codes(
+                owner=organisation,
+                name=f"Benchmark {size}",
+                coding_system_id="snomedct",
+                codes=codes,
+            )
+            url = codelist.versions.get().get_absolute_url()
+
+            timings = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                rsp = client.get(url)
+                timings.append(time.perf_counter() - start)
+                assert rsp.status_code == 200
+
+            self.stdout.write(f"{size:>8} {min(timings):>10.3f}")
+
+
+def build_synthetic_hierarchy(size, branching_factor):
+    """Add a tree of size concepts below a new child of the root concept, and return
+    the codes that are to be included in a codelist.
+
+    Each concept has branching_factor children.  One in every twenty leaf concepts is
+    inactive, and one in every seven is left out of the codelist, so that the codelist's
+    definition has some excluding rules.
+    """
+
+    prefix = f"9{size}"
+    codes = [f"{prefix}{ix:06}" for ix in range(size)]
+    code_to_parent = {
+        code: codes[(ix - 1) // branching_factor] if ix else ROOT_CONCEPT
+        for ix, code in enumerate(codes)
+    }
+    parents = set(code_to_parent.values())
+    leaves = [code for code in codes if code not in parents]
+    inactive_codes = set(leaves[::20])
+
+    common = {"effective_time": date(2020, 1, 31), "module_id": MODULE}
+    Concept.objects.bulk_create(
+        Concept(
+            id=code,
+            active=code not in inactive_codes,
+            definition_status_id=DEFINITION_STATUS,
+            **common,
+        )
+        for code in codes
+    )
+    Description.objects.bulk_create(
+        Description(
+            id=f"{code}1",
+            active=True,
+            concept_id=code,
+            language_code="en",
+            type_id=FULLY_SPECIFIED_NAME,
+            term=f"Synthetic concept {code} (disorder)",
+            case_significance_id=CASE_SIGNIFICANCE,
+            **common,
+        )
+        for code in codes
+    )
+    Relationship.objects.bulk_create(
+        Relationship(
+            id=f"{code}2",
+            active=True,
+            source_id=code,
+            destination_id=parent,
+            relationship_group="0",
+            type_id=IS_A,
+            characteristic_type_id=INFERRED_RELATIONSHIP,
+            modifier_id=EXISTENTIAL_MODIFIER,
+            **common,
+        )
+        for code, parent in code_to_parent.items()
+    )
+
+    excluded_codes = set(leaves[1::7])
+    return [code for code in codes if code not in excluded_codes]
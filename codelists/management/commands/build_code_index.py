@@ -0,0 +1,18 @@
+"""
+Rebuild the index of which codes are in which versions, for all versions that are
+shown on the site.
+"""
+
+from django.core.management import BaseCommand
+
+from codelists.actions import update_code_index
+from codelists.models import CodelistVersion
+
+
+class Command(BaseCommand):
+    help = __doc__
+
+    def handle(self, **kwargs):
+        versions = CodelistVersion.objects.filter(draft_owner=None).order_by("id")
+        for version in versions.iterator():
+            update_code_index(version=version)
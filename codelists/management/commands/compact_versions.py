@@ -0,0 +1,26 @@
+"""
+Replace the CodeObjs of all published new-style versions without searches with a
+compact representation of their codes' statuses.  See
+codelists.actions.compact_version().
+
+This can be undone with the expand_versions command.
+"""
+
+from django.core.management import BaseCommand
+
+from codelists.actions import compact_version
+from codelists.models import CodelistVersion
+
+
+class Command(BaseCommand):
+    help = __doc__
+
+    def handle(self, **kwargs):
+        versions = CodelistVersion.objects.filter(
+            is_draft=False,
+            csv_data__isnull=True,
+            compact_code_statuses__isnull=True,
+            searches__isnull=True,
+        ).order_by("id")
+        for version in versions.iterator():
+            compact_version(version=version)
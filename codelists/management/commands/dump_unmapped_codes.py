@@ -1,30 +1,133 @@
+"""
+Write a CSV file listing the codes in each CTV3 codelist that do not map to any active
+SNOMED CT concept.
+
+The codes of each codelist's latest version are loaded in a pool of --processes worker
+processes.  The codes are then deduplicated across codelists, so that each code is
+looked up once, and the unmapped codes are written out for each codelist in turn.
+
+Each row has a status.  Rows for unmapped codes have status "unmapped".  Codelists with
+no unmapped codes get a single row with status "all_mapped", and codelists whose codes
+can't be determined (because they have no published version) get a single row with
+status "unknown_codes".  In both cases the row has an empty read_code.
+
+The output file can be resumed: if it already exists, codelists that are already in it
+are skipped, and rows for the remaining codelists are appended.
+"""
+
 import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
 
 from django.core.management import BaseCommand
+from django.db import connections
 
 from codelists.models import Codelist
 from mappings.ctv3sctmap2.mappers import read_code_to_snomedct_concepts
 
+HEADERS = ["codelist", "read_code", "status"]
+
 
 class Command(BaseCommand):
+    help = __doc__
+
     def add_arguments(self, parser):
         parser.add_argument("out_path")
+        parser.add_argument("--processes", type=int, default=os.cpu_count())
+
+    def handle(self, out_path, processes, **kwargs):
+        done_slugs = load_done_slugs(out_path)
+
+        codelists = [
+            codelist
+            for codelist in Codelist.objects.filter(
+                coding_system_id__in=["ctv3", "ctv3tpp"]
+            ).order_by("id")
+            if codelist.full_slug() not in done_slugs
+        ]
+        self.stdout.write(
+            f"{len(done_slugs)} codelists already done, {len(codelists)} to do"
+        )
+        if not codelists:
+            return
+
+        codelist_ids = [codelist.pk for codelist in codelists]
+        if processes > 1:
+            # Worker processes are forked from this one, and must not share its
+            # database connections.
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=processes) as executor:
+                results = executor.map(load_codes, codelist_ids, chunksize=8)
+                codelist_id_to_codes = self.collect(results, len(codelist_ids))
+        else:
+            results = map(load_codes, codelist_ids)
+            codelist_id_to_codes = self.collect(results, len(codelist_ids))
+
+        unique_codes = set().union(*codelist_id_to_codes.values())
+        self.stdout.write(f"Looking up mappings for {len(unique_codes)} unique codes")
+        code_to_snomedct_concepts = read_code_to_snomedct_concepts(unique_codes)
+        unmapped_codes = {
+            code for code, concepts in code_to_snomedct_concepts.items() if not concepts
+        }
+
+        write_header = not os.path.exists(out_path) or os.path.getsize(out_path) == 0
+        with open(out_path, "a", newline="") as f:
+            writer = csv.DictWriter(f, HEADERS)
+            if write_header:
+                writer.writeheader()
+
+            for codelist in codelists:
+                slug = codelist.full_slug()
+                codes = codelist_id_to_codes.get(codelist.pk)
+                if codes is None:
+                    rows = [{"read_code": "", "status": "unknown_codes"}]
+                else:
+                    rows = [
+                        {"read_code": code, "status": "unmapped"}
+                        for code in sorted(set(codes) & unmapped_codes)
+                    ] or [{"read_code": "", "status": "all_mapped"}]
+                writer.writerows(dict(row, codelist=slug) for row in rows)
+                # Flush after each codelist, so that if we're interrupted, the file
+                # contains all the rows for each codelist in it.
+                f.flush()
+
+        self.stdout.write(
+            f"Found {len(unmapped_codes)} unmapped codes in {len(codelists)} codelists"
+        )
+        num_without_codes = len(codelists) - len(codelist_id_to_codes)
+        if num_without_codes:
+            self.stdout.write(
+                f"Could not determine codes of {num_without_codes} codelists"
+            )
+
+    def collect(self, results, total):
+        """Collect codes for each codelist from results of load_codes(), reporting
+        progress as we go."""
+
+        codelist_id_to_codes = {}
+        for ix, (codelist_id, codes) in enumerate(results, start=1):
+            if codes is not None:
+                codelist_id_to_codes[codelist_id] = codes
+            if ix % 100 == 0 or ix == total:
+                self.stdout.write(f"Loaded codes for {ix}/{total} codelists")
+        return codelist_id_to_codes
+
+
+def load_done_slugs(out_path):
+    """Return set of slugs of codelists already written to the output file."""
 
-    def handle(self, out_path, **kwargs):
-        f = open(out_path, "w")
-        writer = csv.DictWriter(f, ["codelist", "read_code"])
-        writer.writeheader()
+    if not os.path.exists(out_path):
+        return set()
+    with open(out_path, newline="") as f:
+        return {row["codelist"] for row in csv.DictReader(f)}
 
-        for cl in Codelist.objects.filter(coding_system_id__in=["ctv3", "ctv3tpp"]):
-            print(cl.slug)
-            code_to_snomed_concepts = read_code_to_snomedct_concepts(cl.codes)
-            unmapped_ctv3_codes = [
-                code
-                for code, concepts in code_to_snomed_concepts.items()
-                if not concepts
-            ]
 
-            for code in sorted(unmapped_ctv3_codes):
-                writer.writerow({"codelist": cl.slug, "read_code": code})
+def load_codes(codelist_id):
+    """Return the ID of the codelist, and the codes of its latest version, or None if
+    the codes can't be determined.  This is run in worker processes."""
 
-        f.close()
+    codelist = Codelist.objects.get(pk=codelist_id)
+    version = codelist.versions.filter(draft_owner__isnull=True).order_by("id").last()
+    if version is None:
+        return codelist_id, None
+    return codelist_id, version.codes
@@ -0,0 +1,20 @@
+"""
+Recreate the CodeObjs of all versions that were compacted by the compact_versions
+command.  See codelists.actions.expand_version().
+"""
+
+from django.core.management import BaseCommand
+
+from codelists.actions import expand_version
+from codelists.models import CodelistVersion
+
+
+class Command(BaseCommand):
+    help = __doc__
+
+    def handle(self, **kwargs):
+        versions = CodelistVersion.objects.filter(
+            compact_code_statuses__isnull=False
+        ).order_by("id")
+        for version in versions.iterator():
+            expand_version(version=version)
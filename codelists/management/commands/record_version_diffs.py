@@ -0,0 +1,40 @@
+"""
+Record the differences between each version of each codelist and the latest published
+version before it, for pairs of versions whose differences have not already been
+recorded.  See codelists.actions.record_version_diff().
+
+Drafts that are being edited in the builder are not included.
+"""
+
+from django.core.management import BaseCommand
+
+from codelists.actions import record_version_diff
+from codelists.models import Codelist, VersionDiff
+
+
+class Command(BaseCommand):
+    help = __doc__
+
+    def handle(self, **kwargs):
+        recorded_pairs = set(
+            VersionDiff.objects.values_list("version_id", "previous_version_id")
+        )
+
+        num_recorded = 0
+        for codelist in Codelist.objects.order_by("id").iterator():
+            previous_version = None
+            for version in codelist.versions.filter(draft_owner__isnull=True).order_by(
+                "id"
+            ):
+                if (
+                    previous_version is not None
+                    and (version.id, previous_version.id) not in recorded_pairs
+                    and record_version_diff(
+                        version=version, previous_version=previous_version
+                    )
+                ):
+                    num_recorded += 1
+                if not version.is_draft:
+                    previous_version = version
+
+        self.stdout.write(f"Recorded {num_recorded} version diffs")
@@ -0,0 +1,53 @@
+# Generated by Django 3.1.6 on 2021-02-08 10:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("codelists", "0028_collaboration"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VersionDiff",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("added", models.JSONField()),
+                ("removed", models.JSONField()),
+                ("common", models.JSONField()),
+                ("num_added", models.IntegerField()),
+                ("num_removed", models.IntegerField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "previous_version",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="codelists.codelistversion",
+                    ),
+                ),
+                (
+                    "version",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="diffs",
+                        to="codelists.codelistversion",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("version", "previous_version")},
+            },
+        ),
+    ]
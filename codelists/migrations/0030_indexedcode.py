@@ -0,0 +1,49 @@
+# Generated by Django 3.1.6 on 2021-02-09 11:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("codelists", "0029_versiondiff"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IndexedCode",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("coding_system_id", models.CharField(max_length=32)),
+                ("code", models.CharField(max_length=18)),
+                (
+                    "version",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="indexed_codes",
+                        to="codelists.codelistversion",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="indexedcode",
+            index=models.Index(
+                fields=["coding_system_id", "code"],
+                name="codelists_i_coding__6666d8_idx",
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="indexedcode",
+            unique_together={("version", "code")},
+        ),
+    ]
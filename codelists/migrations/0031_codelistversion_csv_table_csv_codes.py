@@ -0,0 +1,69 @@
+# Generated by Django 3.1.6 on 2021-02-10 14:25
+
+import csv
+from io import StringIO
+
+from django.db import migrations, models
+
+# The functions below are copies of codelists.models.old_style_codes() and
+# opencodelists.csv_utils.csv_data_to_rows() as they were when this migration was
+# written, so that later changes to those functions don't change what this migration
+# does.
+
+
+def csv_data_to_rows(csv_data):
+    return list(csv.reader(StringIO(csv_data)))
+
+
+def old_style_codes(coding_system_id, codelist_slug, table):
+    if coding_system_id not in ["ctv3", "ctv3tpp", "icd10", "snomedct"]:
+        return None
+
+    headers, *rows = table
+
+    for header in ["CTV3ID", "CTV3Code", "ctv3_id", "snomedct_id", "id"]:
+        if header in headers:
+            ix = headers.index(header)
+            break
+    else:
+        if codelist_slug == "ethnicity":
+            ix = 1
+        else:
+            ix = 0
+
+    return tuple(sorted({row[ix] for row in rows}))
+
+
+def set_csv_table_and_codes(apps, schema_editor):
+    CodelistVersion = apps.get_model("codelists", "CodelistVersion")
+
+    for version in CodelistVersion.objects.filter(csv_data__isnull=False).exclude(
+        csv_data=""
+    ):
+        version.csv_table = csv_data_to_rows(version.csv_data)
+        codes = old_style_codes(
+            version.codelist.coding_system_id, version.codelist.slug, version.csv_table
+        )
+        version.csv_codes = None if codes is None else "\n".join(codes)
+        version.save(update_fields=["csv_table", "csv_codes"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("codelists", "0030_indexedcode"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="codelistversion",
+            name="csv_codes",
+            field=models.TextField(null=True),
+        ),
+        migrations.AddField(
+            model_name="codelistversion",
+            name="csv_table",
+            field=models.JSONField(null=True),
+        ),
+        migrations.RunPython(set_csv_table_and_codes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.1.6 on 2021-02-11 09:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("codelists", "0031_codelistversion_csv_table_csv_codes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="codelistversion",
+            name="compact_code_statuses",
+            field=models.BinaryField(null=True),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 3.1.6 on 2021-02-15 10:34
+
+from django.db import migrations
+
+# An FTS5 index of the name, description, and methodology of each Codelist, which is
+# kept up to date by triggers.  SQLite drops the triggers if a later migration rebuilds
+# the codelists_codelist table, so they are recreated after every migrate by
+# codelists.search.ensure_fts_triggers().
+
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE codelists_codelist_fts USING fts5(
+      name, description, methodology, content='codelists_codelist', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER codelists_codelist_fts_insert AFTER INSERT ON codelists_codelist
+    BEGIN
+      INSERT INTO codelists_codelist_fts (rowid, name, description, methodology)
+      VALUES (new.id, new.name, new.description, new.methodology);
+    END
+    """,
+    """
+    CREATE TRIGGER codelists_codelist_fts_delete AFTER DELETE ON codelists_codelist
+    BEGIN
+      INSERT INTO codelists_codelist_fts (
+        codelists_codelist_fts, rowid, name, description, methodology
+      )
+      VALUES ('delete', old.id, old.name, old.description, old.methodology);
+    END
+    """,
+    """
+    CREATE TRIGGER codelists_codelist_fts_update AFTER UPDATE ON codelists_codelist
+    BEGIN
+      INSERT INTO codelists_codelist_fts (
+        codelists_codelist_fts, rowid, name, description, methodology
+      )
+      VALUES ('delete', old.id, old.name, old.description, old.methodology);
+      INSERT INTO codelists_codelist_fts (rowid, name, description, methodology)
+      VALUES (new.id, new.name, new.description, new.methodology);
+    END
+    """,
+    "INSERT INTO codelists_codelist_fts (codelists_codelist_fts) VALUES ('rebuild')",
+]
+
+DROP_SQL = [
+    "DROP TRIGGER codelists_codelist_fts_update",
+    "DROP TRIGGER codelists_codelist_fts_delete",
+    "DROP TRIGGER codelists_codelist_fts_insert",
+    "DROP TABLE codelists_codelist_fts",
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("codelists", "0032_codelistversion_compact_code_statuses"),
+    ]
+
+    operations = [migrations.RunSQL(CREATE_SQL, DROP_SQL)]
@@ -11,6 +11,7 @@ from opencodelists.csv_utils import (
 from opencodelists.hash_utils import hash, unhash
 
 from .coding_systems import CODING_SYSTEMS
+from .compact import unpack_code_statuses
 from .presenters import present_definition_for_download
 
 
@@ -133,6 +134,15 @@ class CodelistVersion(models.Model):
     )
     tag = models.CharField(max_length=12, null=True)
     csv_data = models.TextField(verbose_name="CSV data", null=True)
+    # For old-style versions, these hold csv_data parsed into rows, and the sorted codes
+    # found in those rows, joined with newlines.  They are set whenever the version is
+    # saved, so that csv_data doesn't have to be parsed each time they are needed.
+    csv_table = models.JSONField(null=True)
+    csv_codes = models.TextField(null=True)
+    # For compacted published new-style versions, this holds the statuses of the
+    # version's codes, packed by compact.pack_code_statuses(), in place of the version's
+    # CodeObjs.  See actions.compact_version().
+    compact_code_statuses = models.BinaryField(null=True)
     # This field indicates whether a CodelistVersion is published or not.  This doesn't
     # have much practical meaning at the moment and should be revisited.
     is_draft = models.BooleanField(default=True)
@@ -157,6 +167,19 @@ class CodelistVersion(models.Model):
     def save(self, *args, **kwargs):
         if self.csv_data:
             self.csv_data = self.csv_data.replace("\r\n", "\n")
+            self.csv_table = csv_data_to_rows(self.csv_data)
+            codes = old_style_codes(
+                self.codelist.coding_system_id, self.codelist.slug, self.csv_table
+            )
+            self.csv_codes = None if codes is None else "\n".join(codes)
+        else:
+            self.csv_table = None
+            self.csv_codes = None
+
+        # Clear any values derived from the version's data that have been cached
+        for attr in ["table", "codes", "all_related_codes", "code_to_status"]:
+            self.__dict__.pop(attr, None)
+
         super().save(*args, **kwargs)
 
     @property
@@ -194,6 +217,11 @@ class CodelistVersion(models.Model):
             kwargs=self.url_kwargs,
         )
 
+    def get_tree_url(self):
+        return reverse(
+            f"codelists:{self.codelist_type}_version_tree", kwargs=self.url_kwargs
+        )
+
     def get_create_url(self):
         return reverse(
             f"codelists:{self.codelist_type}_version_create", kwargs=self.url_kwargs
@@ -207,6 +235,13 @@ class CodelistVersion(models.Model):
         kwargs["other_tag_or_hash"] = other_clv.tag_or_hash
         return reverse(f"codelists:{self.codelist_type}_version_diff", kwargs=kwargs)
 
+    def get_diff_json_url(self, other_clv):
+        kwargs = self.url_kwargs
+        kwargs["other_tag_or_hash"] = other_clv.tag_or_hash
+        return reverse(
+            f"codelists:{self.codelist_type}_version_diff_json", kwargs=kwargs
+        )
+
     @property
     def url_kwargs(self):
         kwargs = self.codelist.url_kwargs
@@ -244,7 +279,7 @@ class CodelistVersion(models.Model):
             return self._new_style_table()
 
     def _old_style_table(self):
-        return csv_data_to_rows(self.csv_data)
+        return self.csv_table
 
     def _new_style_table(self):
         code_to_term = self.coding_system.code_to_term(self.codes)
@@ -257,7 +292,16 @@ class CodelistVersion(models.Model):
         if self.csv_data:
             return self._old_style_codes()
         else:
-            return self.code_objs.values_list("code", flat=True)
+            return tuple(self.code_to_status)
+
+    @cached_property
+    def code_to_status(self):
+        """Mapping from each code related to a new-style version to its status."""
+
+        assert not self.csv_data
+        if self.compact_code_statuses is not None:
+            return unpack_code_statuses(self.compact_code_statuses)
+        return dict(self.code_objs.values_list("code", "status"))
 
     @cached_property
     def codes(self):
@@ -267,26 +311,21 @@ class CodelistVersion(models.Model):
             return self._new_style_codes()
 
     def _old_style_codes(self):
-        if self.coding_system_id in ["ctv3", "ctv3tpp", "icd10", "snomedct"]:
-            headers, *rows = self.table
-
-            for header in ["CTV3ID", "CTV3Code", "ctv3_id", "snomedct_id", "id"]:
-                if header in headers:
-                    ix = headers.index(header)
-                    break
-            else:
-                if self.codelist.slug == "ethnicity":
-                    ix = 1
-                else:
-                    ix = 0
-
-            return tuple(sorted({row[ix] for row in rows}))
+        if self.csv_codes is None:
+            return None
+        return tuple(self.csv_codes.split("\n")) if self.csv_codes else ()
 
     @property
     def in_progress(self):
         return self.draft_owner
 
     def _new_style_codes(self):
+        if self.compact_code_statuses is not None:
+            return tuple(
+                code
+                for code, status in self.code_to_status.items()
+                if status in ["+", "(+)"]
+            )
         return tuple(
             sorted(
                 self.code_objs.filter(status__in=["+", "(+)"]).values_list(
@@ -319,6 +358,31 @@ class CodelistVersion(models.Model):
             )
 
 
+def old_style_codes(coding_system_id, codelist_slug, table):
+    """Return sorted tuple of the codes in the table of an old-style version, or None if
+    we don't know how to find the codes for the version's coding system.
+
+    The column containing the codes is guessed from the table's headers.
+    """
+
+    if coding_system_id not in ["ctv3", "ctv3tpp", "icd10", "snomedct"]:
+        return None
+
+    headers, *rows = table
+
+    for header in ["CTV3ID", "CTV3Code", "ctv3_id", "snomedct_id", "id"]:
+        if header in headers:
+            ix = headers.index(header)
+            break
+    else:
+        if codelist_slug == "ethnicity":
+            ix = 1
+        else:
+            ix = 0
+
+    return tuple(sorted({row[ix] for row in rows}))
+
+
 class CodeObj(models.Model):
     STATUS_CHOICES = [
         ("?", "Undecided"),
@@ -344,6 +408,53 @@ class CodeObj(models.Model):
         return self.status in ["-", "(-)"]
 
 
+class VersionDiff(models.Model):
+    """The differences between a version and an earlier version of the same codelist.
+
+    These are recorded when a version is created or published, so that they don't have
+    to be recomputed each time the two versions are compared.  Each of added, removed
+    and common is a summary of codes grouped by their ultimate ancestors, as returned by
+    diffs.summarise_codes().
+    """
+
+    version = models.ForeignKey(
+        "CodelistVersion", related_name="diffs", on_delete=models.CASCADE
+    )
+    previous_version = models.ForeignKey(
+        "CodelistVersion", related_name="+", on_delete=models.CASCADE
+    )
+    added = models.JSONField()
+    removed = models.JSONField()
+    common = models.JSONField()
+    num_added = models.IntegerField()
+    num_removed = models.IntegerField()
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("version", "previous_version")
+
+
+class IndexedCode(models.Model):
+    """An entry in the index of which codes are in which versions.
+
+    There is one entry for each code in each version that is shown on the site (that
+    is, each version that is not a draft being edited in the builder).  The index is
+    maintained by actions.update_code_index(), and lets us find the versions that
+    contain a code without loading every version.
+    """
+
+    version = models.ForeignKey(
+        "CodelistVersion", related_name="indexed_codes", on_delete=models.CASCADE
+    )
+    coding_system_id = models.CharField(max_length=32)
+    code = models.CharField(max_length=18)
+
+    class Meta:
+        unique_together = ("version", "code")
+        indexes = [models.Index(fields=["coding_system_id", "code"])]
+
+
 class Search(models.Model):
     version = models.ForeignKey(
         "CodelistVersion", related_name="searches", on_delete=models.CASCADE
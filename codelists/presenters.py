@@ -1,8 +1,16 @@
+from itertools import chain
+
 import attr
 
+from .definition import Definition
 from .definition2 import Definition2
+from .diffs import compute_diff
 from .hierarchy import Hierarchy
 
+# Statuses are sent to the browser as indexes into this tuple.  This must be kept in
+# sync with STATUSES in static/src/js/hierarchy.js.
+STATUSES = ("?", "!", "+", "(+)", "-", "(-)")
+
 
 @attr.s
 class DefinitionRow:
@@ -60,8 +68,17 @@ def _iter_rules(hierarchy, rules, name_for_rule, excluded):
         yield attr.asdict(row)
 
 
-def build_definition_rows(coding_system, hierarchy, definition):
-    code_to_name = coding_system.lookup_names([rule.code for rule in definition.rules])
+def build_definition_rows(coding_system, hierarchy, definition, code_to_name=None):
+    """Return rows describing the rules of the given definition.
+
+    code_to_name may be passed in if the names of the rules' codes have already been
+    looked up.
+    """
+
+    if code_to_name is None:
+        code_to_name = coding_system.lookup_names(
+            [rule.code for rule in definition.rules]
+        )
 
     def name_for_rule(rule):
         return code_to_name.get(rule.code, "Unknown code (a TPP Y-code?)")
@@ -72,6 +89,122 @@ def build_definition_rows(coding_system, hierarchy, definition):
     return list(_iter_rules(hierarchy, included_rules, name_for_rule, excluded_rules))
 
 
+def present_version_hierarchy(clv, coding_system):
+    """Return the parts of the context for the version page that depend on the
+    version's hierarchy: the top-level rows of the tree tables, the definition rows
+    (split into active and inactive rows), and a mapping from code to term.
+
+    All the metadata needed about the concepts in the hierarchy is looked up with a
+    single call to coding_system.lookup_concept_metadata(), and membership tests are
+    made against sets, so that the time taken grows linearly with the size of the
+    version.
+    """
+
+    codes = set(clv.codes)
+    all_related_codes = set(clv.all_related_codes)
+    hierarchy = Hierarchy.from_codes(coding_system, all_related_codes)
+    code_to_metadata = coding_system.lookup_concept_metadata(all_related_codes)
+    code_to_term = {
+        code: metadata["term"] for code, metadata in code_to_metadata.items()
+    }
+
+    # Only the top-level rows of the tree are sent with the page.  Further rows are
+    # loaded on demand by the browser from version_tree.
+    ancestor_codes = hierarchy.filter_to_ultimate_ancestors(codes & hierarchy.nodes)
+    tree_tables = sorted(
+        (
+            type.title(),
+            present_tree_rows(
+                hierarchy,
+                type_codes,
+                {code: "+" for code in type_codes},
+                code_to_term,
+            ),
+        )
+        for type, type_codes in coding_system.codes_by_type(
+            ancestor_codes, hierarchy, code_to_metadata=code_to_metadata
+        ).items()
+    )
+
+    definition = Definition.from_codes(codes, hierarchy)
+    code_to_name = {
+        code: metadata["name"] for code, metadata in code_to_metadata.items()
+    }
+    rows = build_definition_rows(
+        coding_system, hierarchy, definition, code_to_name=code_to_name
+    )
+    inactive_codes = {
+        code
+        for code in codes
+        if code in code_to_metadata and not code_to_metadata[code]["active"]
+    }
+    definition_rows = {
+        "active": [row for row in rows if row["code"] not in inactive_codes],
+        "inactive": [row for row in rows if row["code"] in inactive_codes],
+    }
+
+    return {
+        "tree_tables": tree_tables,
+        "definition_rows": definition_rows,
+        "code_to_term": code_to_term,
+    }
+
+
+def present_versions(versions):
+    """Return the given versions, each annotated with a change_summary describing how
+    it differs from the version that follows it in the list, if those differences have
+    been recorded.
+
+    versions should be ordered from most recent to least recent, and should have their
+    diffs prefetched.
+    """
+
+    versions = list(versions)
+    for version, previous_version in zip(versions, versions[1:] + [None]):
+        version.change_summary = None
+        if previous_version is None:
+            continue
+        version_diff = next(
+            (
+                version_diff
+                for version_diff in version.diffs.all()
+                if version_diff.previous_version_id == previous_version.id
+            ),
+            None,
+        )
+        if version_diff is not None:
+            version.change_summary = {
+                "num_added": version_diff.num_added,
+                "num_removed": version_diff.num_removed,
+                "diff_url": previous_version.get_diff_url(version),
+            }
+
+    return versions
+
+
+def present_code_usage(indexed_codes):
+    """Return a row for each version that an entry in the index of codes refers to.
+
+    Rows are sorted by the name of the codelist, and then with the most recent version
+    first.
+    """
+
+    versions = sorted(
+        (indexed_code.version for indexed_code in indexed_codes),
+        key=lambda version: (version.codelist.name, -version.id),
+    )
+    return [
+        {
+            "codelist": version.codelist.name,
+            "codelist_url": version.codelist.get_absolute_url(),
+            "version": version.tag_or_hash,
+            "version_url": version.get_absolute_url(),
+            "published": not version.is_draft,
+        }
+        for version in versions
+    ]
+
+
 def present_search_results(clv, code_to_term):
     results = []
     for search in clv.searches.prefetch_related(
@@ -113,3 +246,74 @@ def present_definition_for_download(clv):
     ]
     headers = ["code", "term", "is_included"]
     return [headers] + rows
+
+
+def present_tree_rows(hierarchy, codes, code_to_status, code_to_term):
+    """Return rows for the given codes, for a tree whose rows are loaded on demand.
+
+    Rows are sorted by term.  Each row includes the number of descendants of its code,
+    so that the browser knows whether the row can be expanded.
+    """
+
+    return [
+        {
+            "code": code,
+            "term": code_to_term[code],
+            "status": code_to_status[code],
+            "num_descendants": len(hierarchy.descendants(code)),
+        }
+        for code in sorted(codes, key=code_to_term.__getitem__)
+    ]
+
+
+def present_version_diff(lhs_clv, rhs_clv):
+    """Return summaries of the codes that are only in lhs_clv, that are only in rhs_clv,
+    and that are in both, as returned by diffs.compute_diff().
+
+    If the differences between the two versions were recorded when one of them was
+    created or published, the recorded differences are used.
+    """
+
+    version_diff = rhs_clv.diffs.filter(previous_version=lhs_clv).first()
+    if version_diff is not None:
+        return {
+            "lhs_only": version_diff.removed,
+            "rhs_only": version_diff.added,
+            "common": version_diff.common,
+        }
+
+    version_diff = lhs_clv.diffs.filter(previous_version=rhs_clv).first()
+    if version_diff is not None:
+        return {
+            "lhs_only": version_diff.added,
+            "rhs_only": version_diff.removed,
+            "common": version_diff.common,
+        }
+
+    return compute_diff(lhs_clv.codes, rhs_clv.codes, lhs_clv.coding_system)
+
+
+def present_compact_hierarchy(hierarchy, code_to_status, code_to_term):
+    """Return a compact representation of a hierarchy, and of the statuses and terms of
+    its codes, for decoding by decodeCompactHierarchy() in static/src/js/hierarchy.js.
+
+    Each code appears once, in "codes", and is elsewhere referred to by its index in
+    "codes".  The codes in code_to_status come first, so that "statuses" is a list of
+    indexes into STATUSES, one for each of those codes.  "edges" is a single flat list
+    of alternating parent and child indexes.  Everything is sorted, so that similar
+    values sit close together, which helps the payload compress well.
+    """
+
+    codes_with_status = sorted(code_to_status)
+    other_codes = sorted(hierarchy.nodes - set(code_to_status))
+    codes = codes_with_status + other_codes
+    code_to_ix = {code: ix for ix, code in enumerate(codes)}
+    status_to_ix = {status: ix for ix, status in enumerate(STATUSES)}
+    edges = sorted((code_to_ix[p], code_to_ix[c]) for p, c in hierarchy.edges)
+
+    return {
+        "codes": codes,
+        "terms": [code_to_term[code] for code in codes],
+        "statuses": [status_to_ix[code_to_status[code]] for code in codes_with_status],
+        "edges": list(chain.from_iterable(edges)),
+    }
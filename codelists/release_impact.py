@@ -0,0 +1,81 @@
+"""Functions for working out how importing a new release of a coding system affects the
+codes of existing new-style codelist versions.
+
+A new-style version records the status of each code related to it.  The codes with
+status "+" and "-" form the version's Definition2, which we can apply to a Hierarchy
+built from the current release to find the codes that the version would now contain.
+"""
+
+from .definition2 import Definition2
+from .hierarchy import Hierarchy
+from .models import CodelistVersion
+
+
+def versions_to_analyse(coding_system_ids=None):
+    """Return QuerySet of new-style versions whose codes can be recomputed.
+
+    Drafts that are being edited in the builder are not included.
+    """
+
+    versions = CodelistVersion.objects.filter(
+        csv_data__isnull=True, draft_owner__isnull=True
+    ).select_related("codelist")
+    if coding_system_ids:
+        versions = versions.filter(codelist__coding_system_id__in=coding_system_ids)
+    return versions.order_by("id")
+
+
+def version_is_affected(version, changed_codes):
+    """Return whether any of the codes related to the version are in changed_codes.
+
+    If none are, then the version's definition covers no concepts that have changed in
+    the new release, and its codes are unchanged.
+    """
+
+    return not changed_codes.isdisjoint(version.code_to_status)
+
+
+def analyse_version(version):
+    """Recompute the codes of a new-style version against the coding system's current
+    release, and return a dict describing how they differ from the version's codes.
+
+    "added" and "removed" are the codes that the version's definition now includes and
+    no longer includes, and "inactive" are the version's codes that are now inactive.
+    """
+
+    coding_system = version.coding_system
+    code_to_status = version.code_to_status
+    explicitly_included = {
+        code for code, status in code_to_status.items() if status == "+"
+    }
+    explicitly_excluded = {
+        code for code, status in code_to_status.items() if status == "-"
+    }
+
+    definition = Definition2(explicitly_included, explicitly_excluded)
+    hierarchy = Hierarchy.from_codes(
+        coding_system, explicitly_included | explicitly_excluded
+    )
+    new_codes = definition.codes(hierarchy)
+    old_codes = set(version.codes)
+
+    code_to_metadata = coding_system.lookup_concept_metadata(old_codes)
+    inactive = {
+        code for code, metadata in code_to_metadata.items() if not metadata["active"]
+    }
+
+    return {
+        "version_id": version.pk,
+        "added": sorted(new_codes - old_codes),
+        "removed": sorted(old_codes - new_codes),
+        "inactive": sorted(inactive),
+    }
+
+
+def analyse_version_by_id(version_id):
+    """Load a version and analyse it.  This is run in worker processes, which are
+    passed the version's id rather than the version itself.
+    """
+
+    version = CodelistVersion.objects.select_related("codelist").get(pk=version_id)
+    return analyse_version(version)
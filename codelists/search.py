@@ -1,3 +1,8 @@
+from django.db import connections
+from django.db.models.expressions import RawSQL
+
+from opencodelists.db_utils import fts_query
+
 from .hierarchy import Hierarchy
 
 
@@ -15,3 +20,105 @@ def do_search(coding_system, term):
         "matching_codes": matching_codes,
         "ancestor_codes": ancestor_codes,
     }
+
+
+def search_codelists(codelists, q):
+    """Return QuerySet of the given codelists whose name, description, or methodology
+    matches q, ordered so that the best matches come first.
+
+    Codelists are indexed for full-text search in the codelists_codelist_fts table,
+    which is kept up to date by triggers.  See migrations/0033_codelist_fts.py and
+    ensure_fts_triggers() below.  Matches
+    in a codelist's name count for more than matches in its description, which count
+    for more than matches in its methodology.
+    """
+
+    match = fts_query(q)
+    if match is None:
+        return codelists.none()
+
+    matching_ids = RawSQL(
+        """
+        SELECT rowid FROM codelists_codelist_fts
+        WHERE codelists_codelist_fts MATCH %s
+        """,
+        [match],
+    )
+    rank = RawSQL(
+        """
+        SELECT bm25(codelists_codelist_fts, 10.0, 5.0, 1.0)
+        FROM codelists_codelist_fts
+        WHERE codelists_codelist_fts MATCH %s
+          AND rowid = codelists_codelist.id
+        """,
+        [match],
+    )
+    return (
+        codelists.filter(id__in=matching_ids)
+        .annotate(search_rank=rank)
+        .order_by("search_rank", "name")
+    )
+
+
+# The triggers that keep codelists_codelist_fts up to date, as created by
+# migrations/0033_codelist_fts.py.
+FTS_TRIGGERS = {
+    "codelists_codelist_fts_insert": """
+    CREATE TRIGGER codelists_codelist_fts_insert AFTER INSERT ON codelists_codelist
+    BEGIN
+      INSERT INTO codelists_codelist_fts (rowid, name, description, methodology)
+      VALUES (new.id, new.name, new.description, new.methodology);
+    END
+    """,
+    "codelists_codelist_fts_delete": """
+    CREATE TRIGGER codelists_codelist_fts_delete AFTER DELETE ON codelists_codelist
+    BEGIN
+      INSERT INTO codelists_codelist_fts (
+        codelists_codelist_fts, rowid, name, description, methodology
+      )
+      VALUES ('delete', old.id, old.name, old.description, old.methodology);
+    END
+    """,
+    "codelists_codelist_fts_update": """
+    CREATE TRIGGER codelists_codelist_fts_update AFTER UPDATE ON codelists_codelist
+    BEGIN
+      INSERT INTO codelists_codelist_fts (
+        codelists_codelist_fts, rowid, name, description, methodology
+      )
+      VALUES ('delete', old.id, old.name, old.description, old.methodology);
+      INSERT INTO codelists_codelist_fts (rowid, name, description, methodology)
+      VALUES (new.id, new.name, new.description, new.methodology);
+    END
+    """,
+}
+
+
+def ensure_fts_triggers(using="default"):
+    """Recreate any missing triggers on codelists_codelist, and rebuild the full-text
+    index if there were any.
+
+    SQLite drops a table's triggers when Django rebuilds the table (as it does for most
+    changes to a table's fields), after which the index would silently stop being
+    updated.  This is called after every migrate.
+    """
+
+    with connections[using].cursor() as c:
+        c.execute(
+            "SELECT name FROM sqlite_master WHERE name LIKE %s",
+            ["codelists_codelist_fts%"],
+        )
+        names = {name for (name,) in c.fetchall()}
+        if "codelists_codelist_fts" not in names:
+            # migrations/0033_codelist_fts.py hasn't been applied
+            return
+
+        missing = FTS_TRIGGERS.keys() - names
+        if not missing:
+            return
+
+        for name in sorted(missing):
+            c.execute(FTS_TRIGGERS[name])
+        c.execute(
+            "INSERT INTO codelists_codelist_fts (codelists_codelist_fts) "
+            "VALUES ('rebuild')"
+        )
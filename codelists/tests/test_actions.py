@@ -2,7 +2,7 @@ import pytest
 from django.db import IntegrityError
 
 from codelists import actions
-from codelists.models import Codelist
+from codelists.models import Codelist, CodelistVersion
 from opencodelists.tests.factories import OrganisationFactory, UserFactory
 
 from . import factories
@@ -116,6 +116,8 @@ def test_create_codelist_from_scratch():
 
 
 def test_create_version_with_codes(new_style_codelist):
+    prev_clv = new_style_codelist.versions.order_by("id").last()
+    actions.publish_version(version=prev_clv)
     clv = actions.create_version_with_codes(
         codelist=new_style_codelist,
         codes={"128133004"},
@@ -124,6 +126,13 @@ def test_create_version_with_codes(new_style_codelist):
     assert clv.codes == ("128133004",)
     assert clv.tag == "test"
 
+    version_diff = clv.diffs.get()
+    assert version_diff.previous_version == prev_clv
+    assert version_diff.num_added == 0
+    assert version_diff.num_removed == len(prev_clv.codes) - 1
+    assert version_diff.added == []
+    assert [record["code"] for record in version_diff.common] == ["128133004"]
+
     with pytest.raises(ValueError):
         actions.create_version_with_codes(
             codelist=new_style_codelist, codes={"128133004"}
@@ -183,6 +192,59 @@ def test_publish_draft_version():
     assert not clv.is_draft
 
 
+def test_publish_version_records_diff(new_style_codelist):
+    first_clv = actions.create_version_with_codes(
+        codelist=new_style_codelist, codes={"128133004", "429554009"}
+    )
+    actions.create_version_with_codes(codelist=new_style_codelist, codes={"128133004"})
+    clv = actions.create_version_from_ecl_expr(
+        codelist=new_style_codelist, expr="<<429554009"
+    )
+
+    actions.publish_version(version=first_clv)
+    actions.publish_version(version=clv)
+
+    version_diff = clv.diffs.get(previous_version=first_clv)
+    assert version_diff.num_added == 2
+    assert version_diff.num_removed == 1
+    assert version_diff.added == [
+        {
+            "code": "439656005",
+            "term": "Arthritis of elbow",
+            "descendants": [{"code": "202855006", "term": "Lateral epicondylitis"}],
+        }
+    ]
+
+
+def test_create_version_with_codes_after_draft(new_style_codelist):
+    # The codelist has no published versions, so there is nothing to compare with
+    clv = actions.create_version_with_codes(
+        codelist=new_style_codelist, codes={"128133004"}
+    )
+    assert not clv.diffs.exists()
+
+
+def test_publish_old_style_bnf_versions(organisation):
+    # We can't determine the codes of old-style BNF versions, so no diff is recorded
+    codelist = actions.create_codelist(
+        owner=organisation,
+        name="BNF Codelist",
+        coding_system_id="bnf",
+        description="What this is",
+        methodology="How we did it",
+        csv_data="code,description\n0301012A0AAABAB,Adrenaline 500micrograms/5ml",
+    )
+    actions.publish_version(version=codelist.versions.get())
+    clv = actions.create_version(
+        codelist=codelist,
+        csv_data="code,description\n0301012A0AAACAC,Adrenaline 1mg/10ml",
+    )
+
+    actions.publish_version(version=clv)
+
+    assert not clv.diffs.exists()
+
+
 def test_publish_published_version():
     clv = factories.create_published_version()
     with pytest.raises(AssertionError):
@@ -210,3 +272,58 @@ def test_export_to_builder(organisation_user, new_style_version):
     assert draft.codes == new_style_version.codes
     assert draft.code_objs.count() == new_style_version.code_objs.count()
     assert draft.searches.count() == new_style_version.searches.count()
+
+
+def test_update_code_index(
+    new_style_codelist, version_with_no_searches, organisation_user
+):
+    assert set(
+        version_with_no_searches.indexed_codes.values_list("code", flat=True)
+    ) == set(version_with_no_searches.codes)
+
+    clv = actions.create_version_with_codes(
+        codelist=new_style_codelist, codes={"128133004"}
+    )
+    assert list(clv.indexed_codes.values_list("coding_system_id", "code")) == [
+        ("snomedct", "128133004")
+    ]
+
+    draft = actions.export_to_builder(version=clv, owner=organisation_user)
+    actions.update_code_index(version=draft)
+    assert not draft.indexed_codes.exists()
+
+
+def test_compact_and_expand_version(version_with_no_searches, organisation_user):
+    clv = version_with_no_searches
+    codes = clv.codes
+    code_to_status = dict(clv.code_objs.values_list("code", "status"))
+    actions.publish_version(version=clv)
+
+    actions.compact_version(version=clv)
+    clv = CodelistVersion.objects.get(pk=clv.pk)
+
+    assert clv.compact_code_statuses is not None
+    assert not clv.code_objs.exists()
+    assert clv.codes == codes
+    assert clv.code_to_status == code_to_status
+    assert set(clv.all_related_codes) == set(code_to_status)
+
+    draft = actions.export_to_builder(version=clv, owner=organisation_user)
+    assert dict(draft.code_objs.values_list("code", "status")) == code_to_status
+
+    actions.expand_version(version=clv)
+    clv = CodelistVersion.objects.get(pk=clv.pk)
+
+    assert clv.compact_code_statuses is None
+    assert dict(clv.code_objs.values_list("code", "status")) == code_to_status
+
+
+def test_compact_version_with_searches(version_with_some_searches):
+    clv = version_with_some_searches
+    num_code_objs = clv.code_objs.count()
+    actions.publish_version(version=clv)
+
+    actions.compact_version(version=clv)
+
+    assert clv.compact_code_statuses is None
+    assert clv.code_objs.count() == num_code_objs
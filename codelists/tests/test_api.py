@@ -65,3 +65,24 @@ def test_versions_post_permission_denied(
         rsp = client.post(user_codelist.get_versions_api_url(), data, **headers)
 
     assert rsp.status_code == 403
+
+
+def test_code_usage(client, user, version_with_no_searches):
+    headers = {"HTTP_AUTHORIZATION": f"Token {user.api_token}"}
+    rsp = client.get("/api/v1/code/snomedct/128133004/", **headers)
+    assert rsp.status_code == 200
+    data = json.loads(rsp.content)
+    assert data["code"] == "128133004"
+    assert {
+        "codelist": "New-style Codelist",
+        "codelist_url": version_with_no_searches.codelist.get_absolute_url(),
+        "version": version_with_no_searches.tag_or_hash,
+        "version_url": version_with_no_searches.get_absolute_url(),
+        "published": False,
+    } in data["versions"]
+
+
+def test_code_usage_unknown_coding_system(client, user):
+    headers = {"HTTP_AUTHORIZATION": f"Token {user.api_token}"}
+    rsp = client.get("/api/v1/code/xyz/128133004/", **headers)
+    assert rsp.status_code == 404
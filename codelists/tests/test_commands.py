@@ -0,0 +1,107 @@
+import csv
+from collections import defaultdict
+from io import StringIO
+
+from django.core.management import call_command
+
+from codelists import actions
+from codelists.models import Codelist, VersionDiff
+
+
+def test_record_version_diffs(new_style_codelist):
+    prev_clv = new_style_codelist.versions.order_by("id").last()
+    actions.publish_version(version=prev_clv)
+    clv = actions.create_version_with_codes(
+        codelist=new_style_codelist, codes={"128133004"}
+    )
+    VersionDiff.objects.all().delete()
+
+    out = StringIO()
+    call_command("record_version_diffs", stdout=out)
+
+    version_diff = clv.diffs.get()
+    assert version_diff.previous_version == prev_clv
+    assert version_diff.num_removed == len(prev_clv.codes) - 1
+    num_diffs = VersionDiff.objects.count()
+    assert f"Recorded {num_diffs} version diffs" in out.getvalue()
+
+    # Diffs that have already been recorded are not recorded again
+    out = StringIO()
+    call_command("record_version_diffs", stdout=out)
+    assert "Recorded 0 version diffs" in out.getvalue()
+    assert VersionDiff.objects.count() == num_diffs
+
+
+def test_dump_unmapped_codes(new_style_codelist, codelist_from_scratch, tmp_path):
+    # codelist_from_scratch has no published version, so its codes can't be determined
+    Codelist.objects.filter(
+        pk__in=[new_style_codelist.pk, codelist_from_scratch.pk]
+    ).update(coding_system_id="ctv3")
+    out_path = tmp_path / "unmapped.csv"
+
+    out = StringIO()
+    call_command("dump_unmapped_codes", out_path, processes=1, stdout=out)
+
+    assert "0 codelists already done, 2 to do" in out.getvalue()
+    assert "Could not determine codes of 1 codelists" in out.getvalue()
+    with open(out_path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    slug_to_rows = defaultdict(set)
+    for row in rows:
+        slug_to_rows[row["codelist"]].add((row["read_code"], row["status"]))
+    new_style_version = new_style_codelist.versions.order_by("id").last()
+    assert slug_to_rows == {
+        new_style_codelist.full_slug(): {
+            (code, "unmapped") for code in new_style_version.codes
+        },
+        codelist_from_scratch.full_slug(): {("", "unknown_codes")},
+    }
+
+    # Both codelists are recorded as done, so nothing is done when resuming
+    out = StringIO()
+    call_command("dump_unmapped_codes", out_path, processes=1, stdout=out)
+    assert "2 codelists already done, 0 to do" in out.getvalue()
+    with open(out_path, newline="") as f:
+        assert list(csv.DictReader(f)) == rows
+
+
+def test_dump_unmapped_codes_to_empty_file(new_style_codelist, tmp_path):
+    Codelist.objects.filter(pk=new_style_codelist.pk).update(coding_system_id="ctv3")
+    out_path = tmp_path / "unmapped.csv"
+    out_path.touch()
+
+    call_command("dump_unmapped_codes", out_path, processes=1, stdout=StringIO())
+
+    with open(out_path, newline="") as f:
+        assert next(csv.reader(f)) == ["codelist", "read_code", "status"]
+
+    # The file can be resumed
+    out = StringIO()
+    call_command("dump_unmapped_codes", out_path, processes=1, stdout=out)
+    assert "1 codelists already done, 0 to do" in out.getvalue()
+
+
+def test_compact_and_expand_versions(
+    version_with_no_searches, version_with_some_searches
+):
+    for version in [version_with_no_searches, version_with_some_searches]:
+        actions.publish_version(version=version)
+    code_to_status = version_with_no_searches.code_to_status
+
+    call_command("compact_versions")
+
+    version_with_no_searches.refresh_from_db()
+    assert version_with_no_searches.compact_code_statuses is not None
+    assert not version_with_no_searches.code_objs.exists()
+    # Versions with searches are not compacted
+    version_with_some_searches.refresh_from_db()
+    assert version_with_some_searches.compact_code_statuses is None
+
+    call_command("expand_versions")
+
+    version_with_no_searches.refresh_from_db()
+    assert version_with_no_searches.compact_code_statuses is None
+    assert (
+        dict(version_with_no_searches.code_objs.values_list("code", "status"))
+        == code_to_status
+    )
@@ -0,0 +1,38 @@
+import zlib
+
+import pytest
+
+from codelists.compact import FORMAT_VERSION, pack_code_statuses, unpack_code_statuses
+
+
+def test_roundtrip():
+    code_to_status = {
+        "b": "+",
+        "a": "?",
+        "c": "(+)",
+        "d": "-",
+        "e": "(-)",
+        "f": "!",
+    }
+    assert unpack_code_statuses(pack_code_statuses(code_to_status)) == code_to_status
+    assert list(unpack_code_statuses(pack_code_statuses(code_to_status))) == [
+        "a",
+        "b",
+        "c",
+        "d",
+        "e",
+        "f",
+    ]
+
+
+def test_roundtrip_empty():
+    assert unpack_code_statuses(pack_code_statuses({})) == {}
+
+
+def test_format_version():
+    assert pack_code_statuses({"a": "+"})[0] == FORMAT_VERSION
+
+
+def test_unpack_unknown_version():
+    with pytest.raises(ValueError):
+        unpack_code_statuses(b"\x63" + zlib.compress(b"a\0\x02"))
@@ -1,7 +1,10 @@
 from django.test import TestCase
 
+from codelists.models import CodeObj
 from opencodelists import db_utils
 
+from .factories import create_draft_version
+
 
 class DBUtilsTest(TestCase):
     def test_query_with_many_params(self):
@@ -12,3 +15,41 @@ class DBUtilsTest(TestCase):
         params = [last_value] + values
         result = db_utils.query(sql, params)
         self.assertEqual(result, [("found",)])
+
+    def test_fts_query(self):
+        self.assertEqual(db_utils.fts_query("Asthma"), '"Asthma"*')
+        self.assertEqual(
+            db_utils.fts_query('type-2 "diabetes" *'), '"type"* "2"* "diabetes"*'
+        )
+        self.assertIsNone(db_utils.fts_query(" () "))
+
+    def test_bulk_update_by_key(self):
+        version = create_draft_version()
+        codes = [str(ix) for ix in range(1000)]
+        CodeObj.objects.bulk_create(
+            CodeObj(version=version, code=code, status="?") for code in codes
+        )
+        other_version = create_draft_version()
+        CodeObj.objects.create(version=other_version, code=codes[1], status="?")
+        code_to_status = {
+            code: ["+", "(+)", "-", "(-)"][ix % 4]
+            for ix, code in enumerate(codes)
+            if ix % 5
+        }
+
+        db_utils.bulk_update_by_key(
+            CodeObj, {"version": version.pk}, "code", "status", code_to_status
+        )
+
+        expected = {code: code_to_status.get(code, "?") for code in codes}
+        self.assertEqual(
+            dict(version.code_objs.values_list("code", "status")), expected
+        )
+        self.assertEqual(other_version.code_objs.get().status, "?")
+
+    def test_bulk_update_by_key_with_no_updates(self):
+        version = create_draft_version()
+        with self.assertNumQueries(0):
+            db_utils.bulk_update_by_key(
+                CodeObj, {"version": version.pk}, "code", "status", {}
+            )
@@ -0,0 +1,18 @@
+from codelists.diffs import compute_diff
+
+
+def test_compute_diff(version_with_no_searches, version_with_some_searches):
+    diff = compute_diff(
+        version_with_some_searches.codes,
+        version_with_no_searches.codes,
+        version_with_no_searches.coding_system,
+    )
+    assert diff["lhs_only"] == [
+        {
+            "code": "439656005",
+            "descendants": [{"code": "202855006", "term": "Lateral epicondylitis"}],
+            "term": "Arthritis of elbow",
+        }
+    ]
+    assert diff["rhs_only"] == []
+    assert [record["code"] for record in diff["common"]] == ["128133004"]
@@ -1,4 +1,11 @@
-from .helpers import build_hierarchy, build_small_hierarchy
+import sys
+
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from codelists.hierarchy import TraversalCache
+
+from .helpers import build_hierarchy, build_small_hierarchy, hierarchies
 
 
 def test_nodes():
@@ -61,6 +68,69 @@ def test_descendants():
         assert hierarchy.descendants(node) == descendants
 
 
+def test_traversal_cache_stats():
+    hierarchy = build_small_hierarchy()
+
+    hierarchy.descendants("a")
+    stats = hierarchy.cache.stats()
+    # descendants() is called once for each of the six nodes, and e's descendants are
+    # looked up a second time via c
+    assert stats["misses"] == 6
+    assert stats["hits"] == 1
+    assert stats["entries"] == 6
+    assert stats["bytes"] > 0
+
+    hierarchy.descendants("a")
+    assert hierarchy.cache.stats()["hits"] == 2
+
+    hierarchy.release_cache()
+    stats = hierarchy.cache.stats()
+    assert stats["entries"] == 0
+    assert stats["bytes"] == 0
+    assert hierarchy.descendants("b") == {"d", "e"}
+
+
+def test_traversal_cache_is_bounded():
+    cache = TraversalCache(max_bytes=sys.getsizeof(set()) * 2)
+
+    cache.put("x", set())
+    cache.put("y", set())
+    assert cache.get("x") == set()  # x is now more recently used than y
+    cache.put("z", set())
+
+    assert cache.stats()["entries"] == 2
+    assert cache.get("y") is None
+    assert cache.get("x") == set()
+    assert cache.get("z") == set()
+
+    # values too big to fit are not cached at all
+    cache.put("big", set(range(100)))
+    assert cache.get("big") is None
+
+
+def test_filter_to_ultimate_ancestors():
+    hierarchy = build_hierarchy()
+
+    for nodes, ultimate_ancestors in [
+        (set(), set()),
+        ({"a"}, {"a"}),
+        ({"a", "e", "j"}, {"a"}),
+        ({"b", "c", "e"}, {"b", "c"}),
+        ({"d", "e", "f"}, {"d", "e", "f"}),
+        ({"b", "f", "h", "i"}, {"b", "f"}),
+        ({"g", "h", "i", "j"}, {"g", "h", "i", "j"}),
+    ]:
+        assert hierarchy.filter_to_ultimate_ancestors(nodes) == ultimate_ancestors
+
+
+@settings(deadline=None)
+@given(hierarchies(24), st.sets(st.sampled_from(range(24))))
+def test_filter_to_ultimate_ancestors_matches_ancestors(hierarchy, nodes):
+    assert hierarchy.filter_to_ultimate_ancestors(nodes) == {
+        node for node in nodes if not hierarchy.ancestors(node) & nodes
+    }
+
+
 def test_update_node_to_status():
     hierarchy = build_hierarchy()
 
@@ -52,6 +52,25 @@ def test_old_style_table(old_style_version):
     ]
 
 
+def test_old_style_codes_are_stored(old_style_version):
+    assert old_style_version.csv_codes.split("\n") == list(old_style_version.codes)
+    assert old_style_version.csv_table == old_style_version.table
+
+
+def test_old_style_codes_updated_on_save(old_style_version):
+    assert "128133004" in old_style_version.codes
+    old_style_version.csv_data = "id,name\n73583000,Epicondylitis (disorder)\n"
+    old_style_version.save()
+    assert old_style_version.codes == ("73583000",)
+    assert old_style_version.table == [
+        ["id", "name"],
+        ["73583000", "Epicondylitis (disorder)"],
+    ]
+
+    old_style_version.refresh_from_db()
+    assert old_style_version.csv_codes == "73583000"
+
+
 def test_new_style_codes(version_with_some_searches):
     assert version_with_some_searches.codes == (
         "128133004",
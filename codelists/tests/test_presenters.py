@@ -1,6 +1,7 @@
 from codelists import presenters
 from codelists.definition import Definition
 from codelists.hierarchy import Hierarchy
+from coding_systems.snomedct.models import Concept
 
 
 class DummyCodingSystem:
@@ -54,3 +55,54 @@ def test_build_definition_rows():
     assert len(row["excluded_descendants"]) == 1
     excluded = row["excluded_descendants"][0]
     assert excluded["code"] == "8"
+
+
+def test_present_compact_hierarchy():
+    #    a
+    #   / \
+    #  b   c
+    #   \ /
+    #    d
+    hierarchy = Hierarchy("a", [("a", "b"), ("a", "c"), ("b", "d"), ("c", "d")])
+    code_to_status = {"d": "!", "b": "+", "c": "-"}
+    code_to_term = {"a": "Ay", "b": "Bee", "c": "Sea", "d": "Dee"}
+
+    assert presenters.present_compact_hierarchy(
+        hierarchy, code_to_status, code_to_term
+    ) == {
+        "codes": ["b", "c", "d", "a"],
+        "terms": ["Bee", "Sea", "Dee", "Ay"],
+        "statuses": [2, 4, 1],
+        "edges": [0, 2, 1, 2, 3, 0, 3, 1],
+    }
+
+
+def test_present_version_hierarchy(version_with_no_searches):
+    coding_system = version_with_no_searches.coding_system
+    ctx = presenters.present_version_hierarchy(version_with_no_searches, coding_system)
+
+    assert ctx["tree_tables"] == [
+        (
+            "Disorder",
+            [
+                {
+                    "code": "128133004",
+                    "term": "Disorder of elbow",
+                    "status": "+",
+                    "num_descendants": 6,
+                }
+            ],
+        )
+    ]
+    assert "128133004" in [row["code"] for row in ctx["definition_rows"]["active"]]
+    assert ctx["definition_rows"]["inactive"] == []
+    assert ctx["code_to_term"]["439656005"] == "Arthritis of elbow"
+
+
+def test_present_version_hierarchy_with_inactive_concept(version_with_no_searches):
+    Concept.objects.filter(id="128133004").update(active=False)
+    coding_system = version_with_no_searches.coding_system
+    ctx = presenters.present_version_hierarchy(version_with_no_searches, coding_system)
+
+    assert "128133004" not in [row["code"] for row in ctx["definition_rows"]["active"]]
+    assert [row["code"] for row in ctx["definition_rows"]["inactive"]] == ["128133004"]
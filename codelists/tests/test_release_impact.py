@@ -0,0 +1,84 @@
+import datetime
+
+from codelists.release_impact import (
+    analyse_version,
+    version_is_affected,
+    versions_to_analyse,
+)
+from coding_systems.snomedct.coding_system import codes_changed_since
+from coding_systems.snomedct.models import IS_A, Concept, Relationship
+
+# 439656005 |Arthritis of elbow (disorder)|
+# 239964003 |Soft tissue lesion of elbow region (disorder)|
+
+
+def add_child_concept(parent_code, code):
+    """Add a new concept with the given code as a child of the concept with
+    parent_code, by copying the parent and one of its is-a relationships."""
+
+    parent = Concept.objects.get(id=parent_code)
+    relationship = Relationship.objects.filter(
+        source_id=parent_code, type_id=IS_A, active=True
+    ).first()
+    effective_time = datetime.date(2030, 1, 31)
+
+    Concept.objects.create(
+        id=code,
+        effective_time=effective_time,
+        active=True,
+        module_id=parent.module_id,
+        definition_status_id=parent.definition_status_id,
+    )
+    relationship.pk = code + "2"
+    relationship.effective_time = effective_time
+    relationship.source_id = code
+    relationship.destination_id = parent_code
+    relationship.save()
+
+
+def test_versions_to_analyse(version_with_no_searches, old_style_version):
+    versions = versions_to_analyse()
+    assert version_with_no_searches in versions
+    assert old_style_version not in versions
+
+
+def test_analyse_version_unchanged(version_with_no_searches):
+    assert analyse_version(version_with_no_searches) == {
+        "version_id": version_with_no_searches.pk,
+        "added": [],
+        "removed": [],
+        "inactive": [],
+    }
+
+
+def test_analyse_version_new_descendant(version_with_no_searches):
+    add_child_concept("239964003", "999999999999")
+    add_child_concept("439656005", "999999999998")
+
+    result = analyse_version(version_with_no_searches)
+
+    # The new child of an excluded concept is not added
+    assert result["added"] == ["999999999999"]
+    assert result["removed"] == []
+
+
+def test_analyse_version_inactive_concept(version_with_no_searches):
+    Concept.objects.filter(id="239964003").update(active=False)
+    Relationship.objects.filter(source_id="239964003").update(active=False)
+
+    result = analyse_version(version_with_no_searches)
+
+    assert result["added"] == []
+    assert "239964003" in result["removed"]
+    assert result["inactive"] == ["239964003"]
+
+
+def test_version_is_affected(version_with_no_searches):
+    since = datetime.date(2029, 12, 31)
+    assert not version_is_affected(version_with_no_searches, codes_changed_since(since))
+
+    add_child_concept("239964003", "999999999999")
+    changed_codes = codes_changed_since(since)
+
+    assert changed_codes == {"999999999999", "239964003"}
+    assert version_is_affected(version_with_no_searches, changed_codes)
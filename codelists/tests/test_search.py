@@ -1,5 +1,15 @@
 from codelists.coding_systems import CODING_SYSTEMS
-from codelists.search import do_search
+from codelists.models import Codelist
+from codelists.search import (
+    FTS_TRIGGERS,
+    do_search,
+    ensure_fts_triggers,
+    search_codelists,
+)
+from opencodelists.db_utils import query
+from opencodelists.tests.factories import OrganisationFactory
+
+from .factories import CodelistFactory
 
 
 def test_do_search(tennis_elbow):
@@ -34,3 +44,79 @@ def test_do_search(tennis_elbow):
     }
 
     assert search_results["ancestor_codes"] == {"116309007"}  # Finding of elbow region
+
+
+def test_search_codelists():
+    organisation = OrganisationFactory()
+    CodelistFactory(
+        owner=organisation,
+        name="Asthma diagnosis",
+        description="Codes for asthma",
+        methodology="We searched for asthma",
+    )
+    CodelistFactory(
+        owner=organisation,
+        name="Respiratory disease",
+        description="Includes asthmatic conditions",
+        methodology="We searched for lung diseases",
+    )
+    CodelistFactory(
+        owner=organisation,
+        name="Inhalers",
+        description="Inhaled medication",
+        methodology="Includes asthma inhalers",
+    )
+    CodelistFactory(owner=organisation, name="Diabetes")
+
+    codelists = Codelist.objects.filter(organisation=organisation)
+
+    # Matches in names rank above matches in descriptions, which rank above matches in
+    # methodologies, and words match the start of longer words
+    assert [cl.name for cl in search_codelists(codelists, "asthma")] == [
+        "Asthma diagnosis",
+        "Respiratory disease",
+        "Inhalers",
+    ]
+    assert [cl.name for cl in search_codelists(codelists, "ASTHMA inhal")] == [
+        "Inhalers"
+    ]
+    assert [cl.name for cl in search_codelists(codelists, '"lung" (')] == [
+        "Respiratory disease"
+    ]
+    assert list(search_codelists(codelists, "!!")) == []
+
+    # Changes to codelists are indexed
+    Codelist.objects.filter(name="Diabetes").update(description="Not asthma")
+    assert len(search_codelists(codelists, "asthma")) == 4
+    Codelist.objects.filter(name="Inhalers").delete()
+    assert len(search_codelists(codelists, "asthma")) == 3
+
+
+def test_ensure_fts_triggers():
+    organisation = OrganisationFactory()
+    CodelistFactory(owner=organisation, name="Asthma diagnosis")
+    codelists = Codelist.objects.filter(organisation=organisation)
+
+    # Simulate Django rebuilding the codelists_codelist table, which drops its triggers
+    query("DROP TRIGGER codelists_codelist_fts_insert")
+    query("DROP TRIGGER codelists_codelist_fts_update")
+    CodelistFactory(owner=organisation, name="Asthma medication")
+    Codelist.objects.filter(name="Asthma diagnosis").update(name="Diabetes")
+    assert [cl.name for cl in search_codelists(codelists, "asthma")] == ["Diabetes"]
+
+    ensure_fts_triggers()
+
+    assert [cl.name for cl in search_codelists(codelists, "asthma")] == [
+        "Asthma medication"
+    ]
+    Codelist.objects.filter(name="Diabetes").update(name="Asthma review")
+    assert len(search_codelists(codelists, "asthma")) == 2
+
+
+def test_fts_triggers_exist_after_migrate():
+    # If this fails, a migration has dropped the triggers on codelists_codelist, and
+    # ensure_fts_triggers() hasn't run after it
+    triggers = {
+        name for (name,) in query("SELECT name FROM sqlite_master WHERE type='trigger'")
+    }
+    assert FTS_TRIGGERS.keys() <= triggers
@@ -0,0 +1,18 @@
+def test_get(client, version_with_no_searches):
+    rsp = client.get("/code/snomedct/128133004/")
+    assert rsp.status_code == 200
+    assert rsp.context["term"] == "Disorder of elbow (disorder)"
+    assert {row["version_url"] for row in rsp.context["rows"]} >= {
+        version_with_no_searches.get_absolute_url()
+    }
+
+
+def test_get_code_in_no_codelists(client, version_with_no_searches):
+    rsp = client.get("/code/snomedct/999999999/")
+    assert rsp.status_code == 200
+    assert rsp.context["rows"] == []
+
+
+def test_get_unknown_coding_system(client):
+    rsp = client.get("/code/xyz/128133004/")
+    assert rsp.status_code == 404
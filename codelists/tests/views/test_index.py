@@ -0,0 +1,65 @@
+import html
+import importlib
+import re
+
+from opencodelists.tests.factories import OrganisationFactory
+
+from ..factories import CodelistFactory
+
+
+def test_search(client):
+    organisation = OrganisationFactory()
+    CodelistFactory(owner=organisation, name="Asthma diagnosis")
+    CodelistFactory(owner=organisation, name="Asthma medication")
+    CodelistFactory(owner=organisation, name="Diabetes")
+    CodelistFactory(owner=OrganisationFactory(), name="Asthma annual review")
+
+    rsp = client.get(f"/codelist/{organisation.slug}/", {"q": "asthma"})
+
+    assert rsp.status_code == 200
+    assert {cl.name for cl in rsp.context["codelists"]} == {
+        "Asthma diagnosis",
+        "Asthma medication",
+    }
+
+
+def test_pagination(client, monkeypatch):
+    index_module = importlib.import_module("codelists.views.index")
+    monkeypatch.setattr(index_module, "PAGE_SIZE", 2)
+    organisation = OrganisationFactory()
+    for name in ["Asthma", "Diabetes", "Epilepsy", "Frailty", "Gout"]:
+        CodelistFactory(owner=organisation, name=name)
+
+    rsp = client.get(f"/codelist/{organisation.slug}/", {"page": 3})
+
+    assert rsp.status_code == 200
+    assert [cl.name for cl in rsp.context["codelists"]] == ["Gout"]
+    assert rsp.context["page_obj"].paginator.num_pages == 3
+
+
+def test_follow_page_links(client, monkeypatch):
+    index_module = importlib.import_module("codelists.views.index")
+    monkeypatch.setattr(index_module, "PAGE_SIZE", 2)
+    organisation = OrganisationFactory()
+    for name in ["Asthma", "Diabetes", "Epilepsy", "Frailty", "Gout"]:
+        CodelistFactory(owner=organisation, name=name)
+    url = f"/codelist/{organisation.slug}/"
+
+    # Without a query, the page links don't include one
+    rsp = client.get(url)
+    next_link = re.search(r'href="(\?[^"]*)">Next', rsp.content.decode()).group(1)
+    assert next_link == "?page=2"
+
+    rsp = client.get(url + html.unescape(next_link))
+    assert [cl.name for cl in rsp.context["codelists"]] == ["Epilepsy", "Frailty"]
+
+    # With a query, the page links include it
+    CodelistFactory(owner=organisation, name="Asthma medication")
+    CodelistFactory(owner=organisation, name="Asthma diagnosis")
+    rsp = client.get(url, {"q": "asthma"})
+    next_link = re.search(r'href="(\?[^"]*)">Next', rsp.content.decode()).group(1)
+    assert html.unescape(next_link) == "?q=asthma&page=2"
+
+    rsp = client.get(url + html.unescape(next_link))
+    assert len(rsp.context["codelists"]) == 1
+    assert "Asthma" in rsp.context["codelists"][0].name
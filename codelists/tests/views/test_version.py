@@ -1,3 +1,6 @@
+from codelists.actions import create_version_with_codes, publish_version
+
+
 def test_get_old_style_version(client, old_style_version):
     rsp = client.get(old_style_version.get_absolute_url())
     assert rsp.status_code == 200
@@ -21,3 +24,34 @@ def test_get_version_with_complete_searches(client, version_with_complete_search
 def test_get_user_version(client, user_version):
     rsp = client.get(user_version.get_absolute_url())
     assert rsp.status_code == 200
+
+
+def test_get_version_tree_tables(client, version_with_no_searches):
+    rsp = client.get(version_with_no_searches.get_absolute_url())
+    assert rsp.context["tree_tables"] == [
+        (
+            "Disorder",
+            [
+                {
+                    "code": "128133004",
+                    "term": "Disorder of elbow",
+                    "status": "+",
+                    "num_descendants": 6,
+                }
+            ],
+        )
+    ]
+
+
+def test_get_version_change_summary(client, new_style_codelist):
+    prev_clv = new_style_codelist.versions.filter(draft_owner=None).last()
+    publish_version(version=prev_clv)
+    clv = create_version_with_codes(codelist=new_style_codelist, codes={"128133004"})
+    rsp = client.get(clv.get_absolute_url())
+    [version, *_] = rsp.context["versions"]
+    assert version == clv
+    assert version.change_summary == {
+        "num_added": 0,
+        "num_removed": len(prev_clv.codes) - 1,
+        "diff_url": prev_clv.get_diff_url(clv),
+    }
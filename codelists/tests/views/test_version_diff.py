@@ -1,4 +1,4 @@
-from codelists.views.version_diff import summarise
+from codelists.actions import create_version_with_codes, publish_version
 
 
 def test_get(client, version_with_no_searches, version_with_some_searches):
@@ -7,16 +7,23 @@ def test_get(client, version_with_no_searches, version_with_some_searches):
 
     rsp = client.get(version_with_some_searches.get_diff_url(version_with_no_searches))
     assert rsp.status_code == 200
-
-
-def test_summarise(version_with_no_searches, version_with_some_searches):
-    lhs_codes = set(version_with_no_searches.codes)
-    rhs_codes = set(version_with_some_searches.codes)
-    rhs_only_codes = rhs_codes - lhs_codes
-    assert summarise(rhs_only_codes, version_with_no_searches.coding_system) == [
+    assert rsp.context["lhs_only_summary"] == [
         {
             "code": "439656005",
             "descendants": [{"code": "202855006", "term": "Lateral epicondylitis"}],
             "term": "Arthritis of elbow",
         }
     ]
+    assert rsp.context["rhs_only_summary"] == []
+
+
+def test_get_uses_recorded_diff(client, new_style_codelist):
+    prev_clv = new_style_codelist.versions.order_by("id").last()
+    publish_version(version=prev_clv)
+    clv = create_version_with_codes(codelist=new_style_codelist, codes={"128133004"})
+    clv.diffs.update(removed=[{"code": "x", "term": "Recorded", "descendants": []}])
+
+    rsp = client.get(clv.get_diff_url(prev_clv))
+    assert rsp.context["rhs_only_summary"] == [
+        {"code": "x", "term": "Recorded", "descendants": []}
+    ]
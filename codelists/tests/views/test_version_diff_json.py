@@ -0,0 +1,26 @@
+def test_get(client, version_with_no_searches, version_with_some_searches):
+    rsp = client.get(
+        version_with_some_searches.get_diff_json_url(version_with_no_searches)
+    )
+    data = rsp.json()
+    assert data["lhs"] == version_with_some_searches.get_absolute_url()
+    assert data["rhs"] == version_with_no_searches.get_absolute_url()
+    assert data["num_lhs_only_codes"] == 2
+    assert data["num_rhs_only_codes"] == 0
+    assert data["lhs_only_summary"] == [
+        {
+            "code": "439656005",
+            "descendants": [{"code": "202855006", "term": "Lateral epicondylitis"}],
+            "term": "Arthritis of elbow",
+        }
+    ]
+    assert data["rhs_only_summary"] == []
+    assert [record["code"] for record in data["common_summary"]] == ["128133004"]
+
+
+def test_get_unknown_version(client, version_with_no_searches):
+    url = version_with_no_searches.get_diff_json_url(version_with_no_searches)
+    rsp = client.get(
+        url.replace(version_with_no_searches.tag_or_hash + "/json", "xyz/json")
+    )
+    assert rsp.status_code == 404
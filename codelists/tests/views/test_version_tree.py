@@ -0,0 +1,43 @@
+def test_get(client, version_with_no_searches):
+    rsp = client.get(
+        version_with_no_searches.get_tree_url(),
+        {"code": "429554009"},  # Arthropathy of elbow
+    )
+    assert rsp.status_code == 200
+    assert rsp.json() == {
+        "code": "429554009",
+        "children": [
+            {
+                "code": "439656005",
+                "term": "Arthritis of elbow",
+                "status": "-",
+                "num_descendants": 1,
+            },
+        ],
+    }
+
+
+def test_get_leaf(client, version_with_no_searches):
+    rsp = client.get(
+        version_with_no_searches.get_tree_url(),
+        {"code": "239964003"},  # Soft tissue lesion of elbow region
+    )
+    assert rsp.status_code == 200
+    assert rsp.json() == {"code": "239964003", "children": []}
+
+
+def test_get_unknown_code(client, version_with_no_searches):
+    rsp = client.get(version_with_no_searches.get_tree_url(), {"code": "1234"})
+    assert rsp.status_code == 404
+
+
+def test_get_no_code(client, version_with_no_searches):
+    rsp = client.get(version_with_no_searches.get_tree_url())
+    assert rsp.status_code == 400
+
+
+def test_get_code_above_tree(client, version_with_no_searches):
+    # Finding of elbow region is an ancestor of the version's codes, but is not in the
+    # version's tree
+    rsp = client.get(version_with_no_searches.get_tree_url(), {"code": "116309007"})
+    assert rsp.status_code == 404
@@ -37,6 +37,11 @@ urlpatterns = [
     # ~~~
     path("", views.index, name="index"),
     path("codelist/<organisation_slug>/", views.index, name="organisation_index"),
+    path(
+        "code/<coding_system_id>/<code>/",
+        views.code_usage,
+        name="code_usage",
+    ),
 ]
 
 for subpath, view in [
@@ -48,9 +53,14 @@ for subpath, view in [
     ("<codelist_slug>/<tag_or_hash>/create-new-version/", views.version_create),
     ("<codelist_slug>/<tag_or_hash>/publish/", views.version_publish),
     ("<codelist_slug>/<tag_or_hash>/diff/<other_tag_or_hash>", views.version_diff),
+    (
+        "<codelist_slug>/<tag_or_hash>/diff/<other_tag_or_hash>/json/",
+        views.version_diff_json,
+    ),
     ("<codelist_slug>/<tag_or_hash>/download.csv", views.version_download),
     ("<codelist_slug>/<tag_or_hash>/definition.csv", views.version_download_definition),
     ("<codelist_slug>/<tag_or_hash>/dmd-download.csv", views.version_dmd_download),
+    ("<codelist_slug>/<tag_or_hash>/tree/", views.version_tree),
 ]:
     urlpatterns.append(
         path(
@@ -1,3 +1,4 @@
+from .code_usage import code_usage
 from .codelist import codelist
 from .codelist_create import codelist_create
 from .codelist_update import codelist_update
@@ -5,8 +6,10 @@ from .index import index
 from .version import version
 from .version_create import version_create
 from .version_diff import version_diff
+from .version_diff_json import version_diff_json
 from .version_dmd_download import version_dmd_download
 from .version_download import version_download
 from .version_download_definition import version_download_definition
 from .version_publish import version_publish
+from .version_tree import version_tree
 from .version_upload import version_upload
@@ -0,0 +1,30 @@
+from django.http import Http404
+from django.shortcuts import render
+
+from ..coding_systems import CODING_SYSTEMS
+from ..models import IndexedCode
+from ..presenters import present_code_usage
+
+
+def code_usage(request, coding_system_id, code):
+    """List the versions of codelists that contain the given code."""
+
+    if coding_system_id not in CODING_SYSTEMS:
+        raise Http404
+
+    coding_system = CODING_SYSTEMS[coding_system_id]
+    indexed_codes = IndexedCode.objects.filter(
+        coding_system_id=coding_system_id, code=code
+    ).select_related("version__codelist")
+
+    term = None
+    if hasattr(coding_system, "lookup_names"):
+        term = coding_system.lookup_names([code]).get(code)
+
+    ctx = {
+        "coding_system": coding_system,
+        "code": code,
+        "term": term,
+        "rows": present_code_usage(indexed_codes),
+    }
+    return render(request, "codelists/code_usage.html", ctx)
@@ -1,18 +1,17 @@
-from django.db.models import Q
+from django.core.paginator import Paginator
 from django.shortcuts import get_object_or_404, render
 
 from opencodelists.models import Organisation
 
 from ..models import Codelist
+from ..search import search_codelists
+
+PAGE_SIZE = 50
 
 
 def index(request, organisation_slug=None):
     codelists = Codelist.objects.all()
 
-    q = request.GET.get("q")
-    if q:
-        codelists = codelists.filter(Q(name__contains=q) | Q(description__contains=q))
-
     if organisation_slug:
         organisation = get_object_or_404(Organisation, slug=organisation_slug)
         codelists = codelists.filter(organisation=organisation)
@@ -22,6 +21,20 @@ def index(request, organisation_slug=None):
         # OpenSAFELY organisation.
         codelists = codelists.filter(organisation_id="opensafely")
 
-    codelists = codelists.order_by("name")
-    ctx = {"codelists": codelists, "organisation": organisation, "q": q}
+    q = request.GET.get("q")
+    if q:
+        codelists = search_codelists(codelists, q)
+    else:
+        codelists = codelists.order_by("name")
+
+    page_obj = Paginator(codelists.select_related("organisation"), PAGE_SIZE).get_page(
+        request.GET.get("page")
+    )
+
+    ctx = {
+        "codelists": page_obj.object_list,
+        "page_obj": page_obj,
+        "organisation": organisation,
+        "q": q,
+    }
     return render(request, "codelists/index.html", ctx)
@@ -0,0 +1,31 @@
+from django.http import JsonResponse
+
+from ..presenters import present_version_diff
+from .decorators import load_version
+from .version_diff import load_other_version
+
+
+@load_version
+def version_diff_json(request, clv, other_tag_or_hash):
+    """Return the same diff as version_diff, as JSON."""
+
+    other_clv = load_other_version(clv, other_tag_or_hash)
+
+    lhs_codes = set(clv.codes)
+    rhs_codes = set(other_clv.codes)
+    diff = present_version_diff(clv, other_clv)
+
+    return JsonResponse(
+        {
+            "lhs": clv.get_absolute_url(),
+            "rhs": other_clv.get_absolute_url(),
+            "num_lhs_codes": len(lhs_codes),
+            "num_rhs_codes": len(rhs_codes),
+            "num_lhs_only_codes": len(lhs_codes - rhs_codes),
+            "num_rhs_only_codes": len(rhs_codes - lhs_codes),
+            "num_common_codes": len(lhs_codes & rhs_codes),
+            "lhs_only_summary": diff["lhs_only"],
+            "rhs_only_summary": diff["rhs_only"],
+            "common_summary": diff["common"],
+        }
+    )
@@ -0,0 +1,48 @@
+from django.http import Http404, HttpResponseBadRequest, JsonResponse
+
+from ..hierarchy import Hierarchy
+from ..presenters import present_tree_rows
+from .decorators import load_version
+from .version import get_tree_coding_system
+
+
+@load_version
+def version_tree(request, clv):
+    """Return rows for the children of a node in the version's tree, for loading the
+    tree on demand as the user expands it.
+    """
+
+    code = request.GET.get("code")
+    if code is None:
+        return HttpResponseBadRequest("No code given")
+
+    coding_system = get_tree_coding_system(clv)
+    if coding_system is None:
+        raise Http404
+
+    # The tree's top-level rows are the version's codes that have no ancestors in the
+    # version, so any row that can be expanded is one of the version's codes or one of
+    # their descendants.  Every descendant of such a row is in the version's
+    # hierarchy, so we only need to load the part of the coding system's hierarchy
+    # below the row, rather than the whole of the version's hierarchy.
+    codes = set(clv.codes)
+    if code not in codes:
+        ancestor_codes = {
+            ancestor for ancestor, _ in coding_system.ancestor_relationships([code])
+        }
+        if ancestor_codes.isdisjoint(codes):
+            raise Http404
+
+    hierarchy = Hierarchy(code, coding_system.descendant_relationships([code]))
+    child_codes = hierarchy.child_map.get(code, set())
+    code_to_term = coding_system.code_to_term(child_codes)
+    code_to_status = {c: "+" if c in codes else "-" for c in child_codes}
+
+    return JsonResponse(
+        {
+            "code": code,
+            "children": present_tree_rows(
+                hierarchy, child_codes, code_to_status, code_to_term
+            ),
+        }
+    )
@@ -93,7 +93,20 @@ def code_to_term(codes):
     return lookup_names(codes)
 
 
-def codes_by_type(codes, hierarchy):
+def lookup_concept_metadata(codes):
+    """Return mapping from code to a dict of the concept's name, term, type, and whether
+    it is active.
+
+    CTV3 concepts have no type, and are treated as always being active.
+    """
+
+    return {
+        code: {"name": term, "term": term, "type": None, "active": True}
+        for code, term in code_to_term(codes).items()
+    }
+
+
+def codes_by_type(codes, hierarchy, code_to_metadata=None):
     """
     Group codes by their Concept "types"
 
@@ -0,0 +1,58 @@
+# Generated by Django 3.1.6 on 2021-02-15 10:21
+
+from django.db import migrations
+
+# An FTS5 index of the names of each RawTerm, which is kept up to date by triggers.  If a
+# later migration rebuilds the ctv3_rawterm table, the triggers must be recreated.
+#
+# The index stores each term's term_id in an UNINDEXED column, along with its own copy
+# of the names, rather than referring to terms by the implicit rowid of ctv3_rawterm.
+# Since ctv3_rawterm's primary key is not an integer, VACUUM may renumber its rowids,
+# which would leave the index pointing at the wrong terms.
+
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE ctv3_rawterm_fts USING fts5(
+      term_id UNINDEXED, name_1, name_2, name_3
+    )
+    """,
+    """
+    CREATE TRIGGER ctv3_rawterm_fts_insert AFTER INSERT ON ctv3_rawterm BEGIN
+      INSERT INTO ctv3_rawterm_fts (term_id, name_1, name_2, name_3)
+      VALUES (new.term_id, new.name_1, new.name_2, new.name_3);
+    END
+    """,
+    """
+    CREATE TRIGGER ctv3_rawterm_fts_delete AFTER DELETE ON ctv3_rawterm BEGIN
+      DELETE FROM ctv3_rawterm_fts WHERE term_id = old.term_id;
+    END
+    """,
+    """
+    CREATE TRIGGER ctv3_rawterm_fts_update AFTER UPDATE ON ctv3_rawterm BEGIN
+      UPDATE ctv3_rawterm_fts
+      SET term_id = new.term_id, name_1 = new.name_1, name_2 = new.name_2,
+        name_3 = new.name_3
+      WHERE term_id = old.term_id;
+    END
+    """,
+    """
+    INSERT INTO ctv3_rawterm_fts (term_id, name_1, name_2, name_3)
+    SELECT term_id, name_1, name_2, name_3 FROM ctv3_rawterm
+    """,
+]
+
+DROP_SQL = [
+    "DROP TRIGGER ctv3_rawterm_fts_update",
+    "DROP TRIGGER ctv3_rawterm_fts_delete",
+    "DROP TRIGGER ctv3_rawterm_fts_insert",
+    "DROP TABLE ctv3_rawterm_fts",
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ctv3", "0001_initial"),
+    ]
+
+    operations = [migrations.RunSQL(CREATE_SQL, DROP_SQL)]
@@ -2,6 +2,8 @@ from django.db import models
 
 
 class RawConcept(models.Model):
+    _terms = None
+
     STATUS_C = "C"
     STATUS_E = "E"
     STATUS_O = "O"
@@ -40,21 +42,38 @@ class RawConcept(models.Model):
         return self.terms.all()
 
     def preferred_term(self):
-        return (
-            self.terms.filter(
-                rawconcepttermmapping__term_type=RawConceptTermMapping.PREFERRED
+        """Return the name of the concept's preferred term.
+
+        Raises RawTerm.DoesNotExist if the concept has no preferred term, whether or not
+        its terms have been recorded by set_terms().
+        """
+
+        if self._terms is None:
+            return (
+                self.terms.filter(
+                    rawconcepttermmapping__term_type=RawConceptTermMapping.PREFERRED
+                )
+                .get()
+                .name()
             )
-            .get()
-            .name()
-        )
+        if self._terms[0] is None:
+            raise RawTerm.DoesNotExist(f"{self.read_code} has no preferred term")
+        return self._terms[0]
 
     def synonyms(self):
-        return sorted(
-            term.name()
-            for term in self.terms.exclude(
-                rawconcepttermmapping__term_type=RawConceptTermMapping.PREFERRED
+        if self._terms is None:
+            return sorted(
+                term.name()
+                for term in self.terms.exclude(
+                    rawconcepttermmapping__term_type=RawConceptTermMapping.PREFERRED
+                )
             )
-        )
+        return self._terms[1]
+
+    def set_terms(self, preferred_term, synonyms):
+        """Record the concept's terms, as looked up by terms.attach_terms()."""
+
+        self._terms = (preferred_term, synonyms)
 
 
 class RawConceptHierarchy(models.Model):
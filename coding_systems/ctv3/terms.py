@@ -0,0 +1,121 @@
+"""Functions for looking up the terms of many RawConcepts at once, and for searching
+concepts by their terms.
+
+RawConcept.preferred_term() and RawConcept.synonyms() each need a query when called on
+a single concept, so pages that list many concepts should use attach_terms() to load
+the terms of all the concepts first.
+
+Terms are indexed for full-text search in the ctv3_rawterm_fts table, which is kept up
+to date by triggers.  See migrations/0002_rawterm_fts.py.
+"""
+
+from collections import defaultdict
+
+from opencodelists.db_utils import fts_query, query
+
+from .models import RawConceptTermMapping
+
+
+def lookup_terms(read_codes):
+    """Return mapping from each of the given read codes to a pair of the concept's
+    preferred term (or None if it has none) and sorted list of synonyms.
+
+    The terms are looked up in a single query.
+    """
+
+    read_codes = set(read_codes)
+    preferred_terms = {}
+    synonyms = defaultdict(list)
+
+    records = RawConceptTermMapping.objects.filter(
+        concept_id__in=read_codes
+    ).values_list(
+        "concept_id", "term_type", "term__name_1", "term__name_2", "term__name_3"
+    )
+    for read_code, term_type, name_1, name_2, name_3 in records:
+        name = name_3 or name_2 or name_1
+        if term_type == RawConceptTermMapping.PREFERRED:
+            preferred_terms[read_code] = name
+        else:
+            synonyms[read_code].append(name)
+
+    return {
+        read_code: (preferred_terms.get(read_code), sorted(synonyms[read_code]))
+        for read_code in read_codes
+    }
+
+
+def attach_terms(concepts):
+    """Look up the terms of the given concepts, and record them on each concept, so
+    that calling preferred_term() or synonyms() doesn't need a query.
+
+    Returns the concepts as a list.
+    """
+
+    concepts = list(concepts)
+    read_code_to_terms = lookup_terms(concept.read_code for concept in concepts)
+    for concept in concepts:
+        concept.set_terms(*read_code_to_terms[concept.read_code])
+    return concepts
+
+
+def search_read_codes(q, offset=0, limit=None):
+    """Return list of the read codes of concepts with a term that matches q, ordered so
+    that the concepts with the best matching terms come first.
+
+    If limit is given, at most limit read codes are returned, starting at offset.
+    """
+
+    match = fts_query(q)
+    if match is None:
+        return []
+
+    sql = """
+    SELECT m.concept_id
+    FROM ctv3_rawterm_fts f
+    INNER JOIN ctv3_rawconcepttermmapping m ON m.term_id = f.term_id
+    WHERE ctv3_rawterm_fts MATCH %s
+    GROUP BY m.concept_id
+    ORDER BY MIN(f.rank), m.concept_id
+    LIMIT %s OFFSET %s
+    """
+    # In SQLite, a negative limit means that there is no limit
+    params = [match, -1 if limit is None else limit, offset]
+    return [read_code for (read_code,) in query(sql, params)]
+
+
+def count_read_codes(q):
+    """Return the number of concepts with a term that matches q."""
+
+    match = fts_query(q)
+    if match is None:
+        return 0
+
+    sql = """
+    SELECT COUNT(DISTINCT m.concept_id)
+    FROM ctv3_rawterm_fts f
+    INNER JOIN ctv3_rawconcepttermmapping m ON m.term_id = f.term_id
+    WHERE ctv3_rawterm_fts MATCH %s
+    """
+    return query(sql, [match])[0][0]
+
+
+class ReadCodeSearch:
+    """The read codes of concepts with a term that matches q, ordered as by
+    search_read_codes(), which can be passed to a Paginator.
+
+    The Paginator counts the results with count(), and loads each page by slicing, so
+    only the read codes on the page are loaded.
+    """
+
+    def __init__(self, q):
+        self.q = q
+
+    def count(self):
+        return count_read_codes(self.q)
+
+    def __getitem__(self, key):
+        assert isinstance(key, slice) and key.step is None
+        start = key.start or 0
+        limit = None if key.stop is None else max(key.stop - start, 0)
+        return search_read_codes(self.q, offset=start, limit=limit)
@@ -1,9 +1,25 @@
+import pytest
+
 from coding_systems.ctv3.coding_system import (
     ancestor_relationships,
     descendant_relationships,
     lookup_names,
 )
-from coding_systems.ctv3.models import TPPConcept, TPPRelationship
+from coding_systems.ctv3.models import (
+    RawConcept,
+    RawConceptHierarchy,
+    RawConceptTermMapping,
+    RawTerm,
+    TPPConcept,
+    TPPRelationship,
+)
+from coding_systems.ctv3.terms import (
+    attach_terms,
+    count_read_codes,
+    lookup_terms,
+    search_read_codes,
+)
+from opencodelists.db_utils import query
 
 
 def test_lookup_names():
@@ -77,3 +93,143 @@ def test_relationships():
     }
 
     assert set(descendant_relationships(["33333", "55555"])) == set()
+
+
+def create_raw_concept(read_code, preferred_term, synonyms=(), parent=None):
+    concept = RawConcept.objects.create(
+        read_code=read_code, status="C", unknown_field_2="A", another_concept_id="....."
+    )
+    names = [(preferred_term, RawConceptTermMapping.PREFERRED)] + [
+        (synonym, RawConceptTermMapping.SYNONYM) for synonym in synonyms
+    ]
+    for name, term_type in names:
+        term = RawTerm.objects.create(
+            term_id=f"Y{RawTerm.objects.count():04}", status="C", name_1=name
+        )
+        RawConceptTermMapping.objects.create(
+            concept=concept, term=term, term_type=term_type
+        )
+    if parent is not None:
+        RawConceptHierarchy.objects.create(parent=parent, child=concept, list_order="1")
+    return concept
+
+
+def create_raw_concepts():
+    root = create_raw_concept(".....", "Read thesaurus")
+    parent = create_raw_concept("XaBVJ", "Clinical findings", parent=root)
+    for ix, name in enumerate(["Zinc deficiency", "Anaemia", "Mumps", "Burn"]):
+        create_raw_concept(
+            f"X000{ix}", name, synonyms=[f"{name} (b)", f"{name} (a)"], parent=parent
+        )
+
+
+def test_lookup_terms():
+    create_raw_concepts()
+
+    assert lookup_terms(["X0001", "XaBVJ", "Y9999"]) == {
+        "X0001": ("Anaemia", ["Anaemia (a)", "Anaemia (b)"]),
+        "XaBVJ": ("Clinical findings", []),
+        "Y9999": (None, []),
+    }
+
+
+def test_attach_terms(django_assert_num_queries):
+    create_raw_concepts()
+    concepts = list(RawConcept.objects.filter(read_code__startswith="X000"))
+
+    with django_assert_num_queries(1):
+        attach_terms(concepts)
+        assert [c.preferred_term() for c in concepts] == [
+            "Zinc deficiency",
+            "Anaemia",
+            "Mumps",
+            "Burn",
+        ]
+        assert concepts[2].synonyms() == ["Mumps (a)", "Mumps (b)"]
+
+    # Terms are still looked up for concepts without attached terms
+    concept = RawConcept.objects.get(read_code="X0003")
+    assert concept.preferred_term() == "Burn"
+    assert concept.synonyms() == ["Burn (a)", "Burn (b)"]
+
+
+def test_preferred_term_missing():
+    concept = RawConcept.objects.create(
+        read_code="X0009", status="C", unknown_field_2="A", another_concept_id="X0009"
+    )
+
+    # The behaviour is the same whether or not terms have been attached
+    with pytest.raises(RawTerm.DoesNotExist):
+        concept.preferred_term()
+
+    attach_terms([concept])
+    with pytest.raises(RawTerm.DoesNotExist):
+        concept.preferred_term()
+    assert concept.synonyms() == []
+
+
+def test_concept_view(client, django_assert_num_queries):
+    create_raw_concepts()
+
+    # One query each for the concept, its parents, its children, and their terms
+    with django_assert_num_queries(4):
+        rsp = client.get("/ctv3/concept/XaBVJ/")
+
+    assert rsp.status_code == 200
+    assert [c.read_code for c in rsp.context["parents"]] == ["....."]
+    assert [c.preferred_term() for c in rsp.context["children"]] == [
+        "Anaemia",
+        "Burn",
+        "Mumps",
+        "Zinc deficiency",
+    ]
+
+
+def test_search_read_codes():
+    create_raw_concepts()
+    create_raw_concept("X0004", "Mumps orchitis", synonyms=["Orchitis due to mumps"])
+
+    # Concepts with terms that are closer matches come first
+    assert search_read_codes("mumps") == ["X0002", "X0004"]
+    assert search_read_codes("orchi mump") == ["X0004"]
+    assert search_read_codes("Zinc (b)") == ["X0000"]
+    assert search_read_codes("-") == []
+
+    assert search_read_codes("mumps", limit=1) == ["X0002"]
+    assert search_read_codes("mumps", offset=1, limit=1) == ["X0004"]
+    assert search_read_codes("mumps", offset=2) == []
+    assert count_read_codes("mumps") == 2
+    assert count_read_codes("-") == 0
+
+
+def test_search_read_codes_after_terms_change():
+    create_raw_concepts()
+
+    terms = RawTerm.objects.filter(name_1__startswith="Zinc")
+    for term in terms:
+        term.name_1 = term.name_1.replace("deficiency", "shortage")
+        term.save()
+    assert search_read_codes("deficiency") == []
+    assert search_read_codes("shortage") == ["X0000"]
+
+    RawConceptTermMapping.objects.filter(concept_id="X0000").delete()
+    terms.delete()
+    assert search_read_codes("shortage") == []
+    assert not query("SELECT * FROM ctv3_rawterm_fts WHERE name_1 LIKE 'Zinc%'")
+
+
+def test_index_view(client, django_assert_num_queries, monkeypatch):
+    monkeypatch.setattr("coding_systems.ctv3.views.PAGE_SIZE", 3)
+    create_raw_concepts()
+
+    # One query each to check for a matching read code, to count the matching
+    # concepts, to search for those on the page, to load them, and to load their terms
+    with django_assert_num_queries(5):
+        rsp = client.get("/ctv3/", {"q": "deficiency"})
+
+    assert rsp.status_code == 200
+    assert [c.preferred_term() for c in rsp.context["concepts"]] == ["Zinc deficiency"]
+
+    rsp = client.get("/ctv3/", {"q": "a", "page": 2})
+    assert rsp.context["page_obj"].paginator.count == 4
+    assert [c.read_code for c in rsp.context["concepts"]] == search_read_codes("a")[3:]
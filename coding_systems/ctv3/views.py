@@ -1,8 +1,11 @@
-from django.db.models import Q
+from django.core.paginator import Paginator
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 
 from .models import RawConcept, RawTerm
+from .terms import ReadCodeSearch, attach_terms
+
+PAGE_SIZE = 50
 
 
 def index(request):
@@ -11,36 +14,37 @@ def index(request):
         if RawConcept.objects.filter(read_code=q).exists():
             return redirect(reverse("ctv3:concept", args=[q]))
 
-        concepts = (
-            RawConcept.objects.filter(
-                Q(terms__name_1__icontains=q)
-                | Q(terms__name_2__icontains=q)
-                | Q(terms__name_3__icontains=q)
-            )
-            .prefetch_related("terms")
-            .distinct()
+        # We count the matching read codes, and only load the read codes and concepts
+        # on the current page
+        page_obj = Paginator(ReadCodeSearch(q), PAGE_SIZE).get_page(
+            request.GET.get("page")
+        )
+        read_code_to_concept = RawConcept.objects.in_bulk(page_obj.object_list)
+        concepts = attach_terms(
+            read_code_to_concept[read_code] for read_code in page_obj.object_list
         )
 
     else:
         q = None
+        page_obj = None
         concepts = None
 
-    ctx = {"q": q, "concepts": concepts}
+    ctx = {"q": q, "page_obj": page_obj, "concepts": concepts}
     return render(request, "ctv3/index.html", ctx)
 
 
 def concept(request, read_code):
-    concept = get_object_or_404(
-        RawConcept.objects.prefetch_related("terms"), read_code=read_code
-    )
+    concept = get_object_or_404(RawConcept, read_code=read_code)
+    parents = list(concept.parents.all())
+    children = list(concept.children.all())
+
+    # Look up the terms of the concept and all its neighbours in one go
+    attach_terms([concept] + parents + children)
+
     ctx = {
         "concept": concept,
-        "parents": sorted(
-            concept.parents.prefetch_related("terms"), key=lambda c: c.preferred_term()
-        ),
-        "children": sorted(
-            concept.children.prefetch_related("terms"), key=lambda c: c.preferred_term()
-        ),
+        "parents": sorted(parents, key=lambda c: c.preferred_term()),
+        "children": sorted(children, key=lambda c: c.preferred_term()),
     }
     return render(request, "ctv3/concept.html", ctx)
 
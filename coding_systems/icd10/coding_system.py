@@ -75,7 +75,20 @@ def code_to_term(codes):
 lookup_names = code_to_term
 
 
-def codes_by_type(codes, hierarchy):
+def lookup_concept_metadata(codes):
+    """Return mapping from code to a dict of the concept's name, term, type, and whether
+    it is active.
+
+    ICD-10 concepts have no type, and are treated as always being active.
+    """
+
+    return {
+        code: {"name": term, "term": term, "type": None, "active": True}
+        for code, term in code_to_term(codes).items()
+    }
+
+
+def codes_by_type(codes, hierarchy, code_to_metadata=None):
     """Return mapping from a chapter name (ICD-10 types) to those codes in that chapter.
 
     Each concept belongs exactly one chapter.
@@ -1,2 +1,18 @@
+from .models import Concept
+
 name = "Read V2"
 short_name = "Read V2"
+
+
+def lookup_names(codes):
+    """Return mapping from code to the longest of the concept's names.  Read V2
+    concepts have names of up to 30, 60, and 198 characters, and the longer names are
+    only given when the shorter ones have had to be abbreviated.
+    """
+
+    return {
+        read_code: name_3 or name_2 or name_1
+        for read_code, name_1, name_2, name_3 in Concept.objects.filter(
+            read_code__in=codes
+        ).values_list("read_code", "name_1", "name_2", "name_3")
+    }
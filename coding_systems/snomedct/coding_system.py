@@ -5,7 +5,7 @@ from django.db.models import Q
 
 from opencodelists.db_utils import query
 
-from .models import FULLY_SPECIFIED_NAME, IS_A, Concept, Description
+from .models import FULLY_SPECIFIED_NAME, IS_A, Concept, Description, Relationship
 
 name = "SNOMED CT"
 short_name = "SNOMED CT"
@@ -97,12 +97,14 @@ def descendant_relationships(codes):
     return query(sql, codes)
 
 
-def _iter_code_to_term_and_type(codes: set):
-    for code, term in lookup_names(codes).items():
-        match = term_and_type_pat.match(term)
-        term_and_type = match.groups() if match else (term, "unknown")
+def _split_term_and_type(name):
+    match = term_and_type_pat.match(name)
+    return match.groups() if match else (name, "unknown")
+
 
-        yield code, term_and_type
+def _iter_code_to_term_and_type(codes: set):
+    for code, name in lookup_names(codes).items():
+        yield code, _split_term_and_type(name)
 
 
 def code_to_term_and_type(codes):
@@ -114,12 +116,35 @@ def code_to_term(codes):
     return {code: term for code, (term, _) in code_to_term_and_type(codes).items()}
 
 
-def codes_by_type(codes, hierarchy):
-    """Group codes by their Type"""
+def lookup_concept_metadata(codes):
+    """Return mapping from code to a dict of the concept's name, term, type, and whether
+    it is active.
+
+    This is looked up with a single query, so that callers that need several of these
+    don't have to make a query for each.
+    """
+
+    metadata = {}
+    for code, name, active in Description.objects.filter(
+        concept__in=codes, type=FULLY_SPECIFIED_NAME
+    ).values_list("concept_id", "term", "concept__active"):
+        term, type = _split_term_and_type(name)
+        metadata[code] = {"name": name, "term": term, "type": type, "active": active}
+    return metadata
+
+
+def codes_by_type(codes, hierarchy, code_to_metadata=None):
+    """Group codes by their Type
+
+    code_to_metadata, as returned by lookup_concept_metadata(), may be passed in if it
+    has already been looked up.
+    """
+
+    if code_to_metadata is None:
+        code_to_metadata = lookup_concept_metadata(codes)
+
     # create a lookup of code -> type
-    code_to_type = {
-        code: type.title() for code, (_, type) in code_to_term_and_type(codes).items()
-    }
+    code_to_type = {code: code_to_metadata[code]["type"].title() for code in codes}
 
     lookup = collections.defaultdict(list)
 
@@ -128,3 +153,22 @@ def codes_by_type(codes, hierarchy):
         lookup[type].append(code)
 
     return dict(lookup)
+
+
+def codes_changed_since(date):
+    """Return set of codes of concepts that have changed after the given date, along
+    with the codes at either end of any is-a relationship that has changed.
+
+    A codelist version whose related codes include none of these codes is defined by the
+    same codes as before the change.
+    """
+
+    codes = set(
+        Concept.objects.filter(effective_time__gt=date).values_list("id", flat=True)
+    )
+    for source_id, destination_id in Relationship.objects.filter(
+        effective_time__gt=date, type_id=IS_A
+    ).values_list("source_id", "destination_id"):
+        codes.add(source_id)
+        codes.add(destination_id)
+    return codes
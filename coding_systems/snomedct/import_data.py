@@ -7,6 +7,7 @@ import sqlite3
 from django.db import connection as django_connection
 
 from .models import Concept, Description, Relationship
+from .neighbourhood import clear_cache
 
 
 def import_data(release_dir):
@@ -35,6 +36,8 @@ def import_data(release_dir):
     connection.commit()
     connection.close()
 
+    clear_cache()
+
 
 def parse_date(datestr):
     return datetime.date(int(datestr[:4]), int(datestr[4:6]), int(datestr[6:]))
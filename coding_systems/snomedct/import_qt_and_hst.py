@@ -6,6 +6,7 @@ import sqlite3
 from django.db import connection as django_connection
 
 from .models import HistorySubstitution, QueryTableRecord
+from .substitutions import clear_cache
 
 
 def import_data(release_dir):
@@ -38,14 +39,35 @@ def import_data(release_dir):
                 r[13] = r[13] == "1"  # fsn_tag_identical_flag
                 yield r
 
-    connection_params = django_connection.get_connection_params()
-    connection = sqlite3.connect(**connection_params)
-    connection.executemany(build_sql(QueryTableRecord), load_query_table_records())
-    connection.executemany(
-        build_sql(HistorySubstitution), load_history_substitution_table_recods()
-    )
-    connection.commit()
-    connection.close()
+    # It's quicker to load the tables without the composite indexes, and to build the
+    # indexes once all the records are loaded.  The indexes are rebuilt even if loading
+    # fails, so that a failed import doesn't leave the tables without them.
+    models = [QueryTableRecord, HistorySubstitution]
+    with django_connection.schema_editor() as schema_editor:
+        for model in models:
+            for index in model._meta.indexes:
+                schema_editor.remove_index(model, index)
+
+    try:
+        connection_params = django_connection.get_connection_params()
+        connection = sqlite3.connect(**connection_params)
+        try:
+            connection.executemany(
+                build_sql(QueryTableRecord), load_query_table_records()
+            )
+            connection.executemany(
+                build_sql(HistorySubstitution), load_history_substitution_table_recods()
+            )
+            connection.commit()
+        finally:
+            connection.close()
+    finally:
+        with django_connection.schema_editor() as schema_editor:
+            for model in models:
+                for index in model._meta.indexes:
+                    schema_editor.add_index(model, index)
+
+    clear_cache()
 
 
 def build_sql(model):
@@ -0,0 +1,39 @@
+# Generated by Django 3.1.6 on 2021-02-12 14:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("snomedct", "0003_auto_20200806_1428"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="historysubstitution",
+            index=models.Index(
+                fields=["old_concept", "new_concept"],
+                name="snomedct_hi_old_con_39ab8b_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="historysubstitution",
+            index=models.Index(
+                fields=["new_concept", "old_concept"],
+                name="snomedct_hi_new_con_b8a252_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="querytablerecord",
+            index=models.Index(
+                fields=["supertype", "subtype"], name="snomedct_qu_superty_9db54c_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="querytablerecord",
+            index=models.Index(
+                fields=["subtype", "supertype"], name="snomedct_qu_subtype_970c41_idx"
+            ),
+        ),
+    ]
@@ -207,6 +207,14 @@ class HistorySubstitution(models.Model):
     fsn_tagless_identical_flag = models.BooleanField()
     fsn_tag_identical_flag = models.BooleanField()
 
+    class Meta:
+        # These indexes are dropped while the table is being loaded, and are rebuilt
+        # afterwards.  See import_qt_and_hst.py.
+        indexes = [
+            models.Index(fields=["old_concept", "new_concept"]),
+            models.Index(fields=["new_concept", "old_concept"]),
+        ]
+
 
 class QueryTableRecord(models.Model):
     supertype = models.ForeignKey(
@@ -216,3 +224,11 @@ class QueryTableRecord(models.Model):
         "Concept", on_delete=models.CASCADE, related_name="+", db_constraint=False
     )
     provenance = models.IntegerField()
+
+    class Meta:
+        # These indexes are dropped while the table is being loaded, and are rebuilt
+        # afterwards.  See import_qt_and_hst.py.
+        indexes = [
+            models.Index(fields=["supertype", "subtype"]),
+            models.Index(fields=["subtype", "supertype"]),
+        ]
@@ -0,0 +1,145 @@
+"""Look up what is needed to show a concept on its page in the browser: the concept's
+fully specified name, synonyms, and whether it is mapped to CTV3, and the fully
+specified names of its parents and children, and whether they are mapped to CTV3.
+
+The neighbourhoods of many concepts are looked up with a fixed number of queries, and
+are cached in each process, keyed by concept ID, in a ReleaseCache (see
+opencodelists/release_cache.py).  The release that the cache checks for covers both
+SNOMED CT and the CTV3 mappings, and the cache is emptied after SNOMED CT is imported.
+"""
+
+from collections import defaultdict
+
+from django.db.models import Count, Max, Q
+
+from mappings.ctv3sctmap2 import index as mapping_index
+from mappings.ctv3sctmap2.models import Mapping
+from opencodelists.release_cache import ReleaseCache
+
+from .models import (
+    FULLY_SPECIFIED_NAME,
+    IS_A,
+    SYNONYM,
+    Concept,
+    Description,
+    Relationship,
+)
+
+# Maximum number of concepts whose neighbourhoods are cached.  When the cache is full,
+# it is emptied.
+MAX_CACHE_SIZE = 10000
+
+
+def lookup_neighbourhoods(concept_ids):
+    """Return dict mapping each of the given concept IDs to its neighbourhood, or to
+    None if there is no such concept.
+
+    A neighbourhood is a dict with keys "concept", "parents", and "children".  Each
+    concept is a dict with keys "id", "fully_specified_name", and "in_ctv3", and the
+    concept itself also has "synonyms".  Parents and children are ordered by their
+    fully specified names.
+
+    Concepts that are not cached are looked up with four queries.  The returned
+    neighbourhoods are shared with the cache, and must not be modified.
+    """
+
+    return cache.get_many(concept_ids)
+
+
+def lookup_neighbourhood(concept_id):
+    """Return the neighbourhood of a single concept, or None if there is no such
+    concept.  See lookup_neighbourhoods()."""
+
+    return lookup_neighbourhoods([concept_id])[concept_id]
+
+
+def clear_cache():
+    """Empty the cache, so that neighbourhoods are looked up again."""
+
+    cache.clear()
+
+
+def current_release():
+    """Return a value identifying the releases of SNOMED CT and of the CTV3 mappings in
+    the database.
+
+    Each release of SNOMED CT adds concepts or changes existing ones, and changed
+    concepts get a new effective time, so the number of concepts and their latest
+    effective time change with each release.
+    """
+
+    release = Concept.objects.aggregate(
+        num_concepts=Count("id"), effective_time=Max("effective_time")
+    )
+    return (
+        release["num_concepts"],
+        release["effective_time"],
+        mapping_index.current_release(),
+    )
+
+
+def _load_neighbourhoods(concept_ids):
+    found_ids = set(
+        Concept.objects.filter(id__in=concept_ids).values_list("id", flat=True)
+    )
+
+    parent_ids = defaultdict(set)
+    child_ids = defaultdict(set)
+    for source_id, destination_id in Relationship.objects.filter(
+        Q(source_id__in=found_ids) | Q(destination_id__in=found_ids),
+        active=True,
+        type_id=IS_A,
+    ).values_list("source_id", "destination_id"):
+        parent_ids[source_id].add(destination_id)
+        child_ids[destination_id].add(source_id)
+
+    related_ids = set(found_ids)
+    for concept_id in found_ids:
+        related_ids |= parent_ids[concept_id] | child_ids[concept_id]
+
+    fully_specified_names = {}
+    synonyms = defaultdict(list)
+    for concept_id, type_id, term in (
+        Description.objects.filter(
+            Q(concept_id__in=related_ids, type_id=FULLY_SPECIFIED_NAME)
+            | Q(concept_id__in=found_ids, type_id=SYNONYM),
+            active=True,
+        )
+        .order_by("term")
+        .values_list("concept_id", "type_id", "term")
+    ):
+        if type_id == FULLY_SPECIFIED_NAME:
+            fully_specified_names[concept_id] = term
+        else:
+            synonyms[concept_id].append(term)
+
+    mapped_ids = set(
+        Mapping.objects.filter(sct_concept_id__in=related_ids)
+        .values_list("sct_concept_id", flat=True)
+        .distinct()
+    )
+
+    def build_concept(concept_id):
+        return {
+            "id": concept_id,
+            "fully_specified_name": fully_specified_names.get(concept_id),
+            "in_ctv3": concept_id in mapped_ids,
+        }
+
+    def build_concepts(concept_ids):
+        return sorted(
+            (build_concept(concept_id) for concept_id in concept_ids),
+            key=lambda c: (c["fully_specified_name"] or "", c["id"]),
+        )
+
+    neighbourhoods = {concept_id: None for concept_id in concept_ids}
+    for concept_id in found_ids:
+        neighbourhoods[concept_id] = {
+            "concept": dict(build_concept(concept_id), synonyms=synonyms[concept_id]),
+            "parents": build_concepts(parent_ids[concept_id]),
+            "children": build_concepts(child_ids[concept_id]),
+        }
+    return neighbourhoods
+
+
+cache = ReleaseCache(current_release, _load_neighbourhoods, max_size=MAX_CACHE_SIZE)
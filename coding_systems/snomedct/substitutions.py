@@ -0,0 +1,68 @@
+"""Look up the concepts that inactive concepts have been substituted by, according to
+the History Substitution Table.
+
+Substitutions are cached in each process, keyed by the ID of the inactive concept, in
+a ReleaseCache (see opencodelists/release_cache.py) that is emptied when a new release
+of the History Substitution Table is imported.
+"""
+
+from django.db.models import Count, Max
+
+from opencodelists.release_cache import ReleaseCache
+
+from .models import HistorySubstitution
+
+# Maximum number of concepts whose substitutions are cached.  When the cache is full,
+# it is emptied.
+MAX_CACHE_SIZE = 100000
+
+
+def lookup_substitutions(concept_ids):
+    """Return dict mapping each of the given concept IDs to a list of the concepts that
+    it has been substituted by, ordered by the new concepts' FSNs.
+
+    Concepts that are not cached are looked up with a single query.  The returned lists
+    are shared with the cache, and must not be modified.
+    """
+
+    return cache.get_many(concept_ids)
+
+
+def clear_cache():
+    """Empty the cache, so that substitutions are looked up again."""
+
+    cache.clear()
+
+
+def current_release():
+    """Return a value identifying the release of the History Substitution Table in the
+    database.  Records are only ever added by importing a release, so the number of
+    records and the largest ID change with each release.
+    """
+
+    release = HistorySubstitution.objects.aggregate(
+        num_records=Count("id"), max_id=Max("id")
+    )
+    return (release["num_records"], release["max_id"])
+
+
+def _load_substitutions(concept_ids):
+    substitutions = {concept_id: [] for concept_id in concept_ids}
+    for record in (
+        HistorySubstitution.objects.filter(old_concept_id__in=concept_ids)
+        .order_by("new_concept_fsn")
+        .values(
+            "old_concept_id",
+            "new_concept_id",
+            "new_concept_status",
+            "new_concept_fsn",
+            "path",
+            "is_ambiguous",
+        )
+    ):
+        old_concept_id = record.pop("old_concept_id")
+        substitutions[old_concept_id].append(record)
+    return substitutions
+
+
+cache = ReleaseCache(current_release, _load_substitutions, max_size=MAX_CACHE_SIZE)
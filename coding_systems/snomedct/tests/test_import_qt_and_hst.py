@@ -0,0 +1,30 @@
+import pytest
+from django.db import connection
+
+from coding_systems.snomedct.import_qt_and_hst import import_data
+from coding_systems.snomedct.models import HistorySubstitution, QueryTableRecord
+
+
+def index_names(model):
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(
+            cursor, model._meta.db_table
+        )
+    return {name for name, constraint in constraints.items() if constraint["index"]}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_indexes_are_rebuilt_after_failed_import(tmp_path):
+    models = [QueryTableRecord, HistorySubstitution]
+    indexes = {model: index_names(model) for model in models}
+    assert all(
+        index.name in indexes[model]
+        for model in models
+        for index in model._meta.indexes
+    )
+
+    # The release directory contains no files, so the import fails when loading records
+    with pytest.raises(AssertionError):
+        import_data(tmp_path)
+
+    assert {model: index_names(model) for model in models} == indexes
@@ -0,0 +1,103 @@
+import datetime
+import uuid
+
+from coding_systems.snomedct import neighbourhood
+from coding_systems.snomedct.models import Concept
+from coding_systems.snomedct.neighbourhood import (
+    clear_cache,
+    lookup_neighbourhood,
+    lookup_neighbourhoods,
+)
+from mappings.ctv3sctmap2.models import Mapping
+
+
+def create_mapping(snomedct_id):
+    Mapping.objects.create(
+        id=uuid.uuid4(),
+        ctv3_concept_id="XE0Ik",
+        ctv3_term_id="Y0000",
+        ctv3_term_type="P",
+        sct_concept_id=snomedct_id,
+        map_status=True,
+        effective_date=datetime.date(2020, 1, 1),
+        is_assured=True,
+    )
+
+
+def test_lookup_neighbourhood(tennis_elbow):
+    create_mapping("35185008")
+
+    result = lookup_neighbourhood("128133004")
+
+    assert result["concept"] == {
+        "id": "128133004",
+        "fully_specified_name": "Disorder of elbow (disorder)",
+        "in_ctv3": False,
+        "synonyms": ["Disorder of elbow"],
+    }
+    assert result["parents"] == [
+        {
+            "id": "118947000",
+            "fully_specified_name": "Disorder of upper extremity (disorder)",
+            "in_ctv3": False,
+        },
+        {
+            "id": "116309007",
+            "fully_specified_name": "Finding of elbow region (finding)",
+            "in_ctv3": False,
+        },
+    ]
+    assert [(c["id"], c["in_ctv3"]) for c in result["children"]] == [
+        ("429554009", False),  # Arthropathy of elbow
+        ("35185008", True),  # Enthesopathy of elbow region
+        ("239964003", False),  # Soft tissue lesion of elbow region
+    ]
+
+
+def test_lookup_neighbourhoods_is_cached(django_assert_num_queries, tennis_elbow):
+    # Two queries to check the release, and four to look up the neighbourhoods
+    with django_assert_num_queries(6):
+        result = lookup_neighbourhoods(["128133004", "35185008", "99999999"])
+    assert result["99999999"] is None
+    assert "128133004" in [c["id"] for c in result["35185008"]["parents"]]
+
+    with django_assert_num_queries(0):
+        lookup_neighbourhoods(["128133004", "35185008", "99999999"])
+
+    # Only the concept that isn't cached is looked up
+    with django_assert_num_queries(4):
+        lookup_neighbourhoods(["128133004", "239964003"])
+
+    clear_cache()
+    with django_assert_num_queries(6):
+        lookup_neighbourhoods(["128133004"])
+
+
+def test_lookup_neighbourhood_new_release(monkeypatch, tennis_elbow):
+    assert not lookup_neighbourhood("128133004")["concept"]["in_ctv3"]
+
+    create_mapping("128133004")
+    assert not lookup_neighbourhood("128133004")["concept"]["in_ctv3"]
+
+    monkeypatch.setattr(neighbourhood.cache, "check_interval", 0)
+    assert lookup_neighbourhood("128133004")["concept"]["in_ctv3"]
+
+    Concept.objects.filter(id="35185008").update(effective_time=datetime.date.today())
+    assert lookup_neighbourhood("35185008") is not None
+
+
+def test_concept_view(client, tennis_elbow):
+    rsp = client.get("/snomedct/concept/128133004/")
+
+    assert rsp.status_code == 200
+    assert rsp.context["concept"]["fully_specified_name"] == (
+        "Disorder of elbow (disorder)"
+    )
+    assert [c["id"] for c in rsp.context["parents"]] == ["118947000", "116309007"]
+    assert b"Soft tissue lesion of elbow region (disorder)" in rsp.content
+
+
+def test_concept_view_unknown_concept(client, tennis_elbow):
+    rsp = client.get("/snomedct/concept/99999999/")
+
+    assert rsp.status_code == 404
@@ -0,0 +1,101 @@
+import pytest
+
+from coding_systems.snomedct import substitutions
+from coding_systems.snomedct.models import HistorySubstitution
+from coding_systems.snomedct.substitutions import clear_cache, lookup_substitutions
+
+
+def create_substitution(old_concept_id, new_concept_id, new_concept_fsn):
+    HistorySubstitution.objects.create(
+        old_concept_id=old_concept_id,
+        old_concept_status="Inactive",
+        new_concept_id=new_concept_id,
+        new_concept_status="Current",
+        path="SAME_AS",
+        is_ambiguous=False,
+        iterations=1,
+        old_concept_fsn=f"Old {old_concept_id}",
+        old_concept_fsn_tagcount=1,
+        new_concept_fsn=new_concept_fsn,
+        new_concept_fsn_tagcount=1,
+        tlh_identical_flag=False,
+        fsn_tagless_identical_flag=False,
+        fsn_tag_identical_flag=False,
+    )
+
+
+@pytest.fixture
+def history_substitutions():
+    create_substitution("1001", "2002", "Zebra (disorder)")
+    create_substitution("1001", "2001", "Aardvark (disorder)")
+    create_substitution("1002", "2003", "Badger (disorder)")
+
+
+def test_lookup_substitutions(history_substitutions):
+    result = lookup_substitutions(["1001", "1003"])
+
+    assert [r["new_concept_id"] for r in result["1001"]] == ["2001", "2002"]
+    assert result["1001"][0] == {
+        "new_concept_id": "2001",
+        "new_concept_status": "Current",
+        "new_concept_fsn": "Aardvark (disorder)",
+        "path": "SAME_AS",
+        "is_ambiguous": False,
+    }
+    assert result["1003"] == []
+
+
+def test_lookup_substitutions_is_cached(
+    django_assert_num_queries, history_substitutions
+):
+    # One query to check the release, and one to look up the substitutions
+    with django_assert_num_queries(2):
+        lookup_substitutions(["1001", "1003"])
+
+    with django_assert_num_queries(0):
+        result = lookup_substitutions(["1001", "1003"])
+    assert len(result["1001"]) == 2
+
+    # Only the concept that isn't cached is looked up
+    with django_assert_num_queries(1):
+        result = lookup_substitutions(["1001", "1002"])
+    assert [r["new_concept_id"] for r in result["1002"]] == ["2003"]
+
+    clear_cache()
+    with django_assert_num_queries(2):
+        lookup_substitutions(["1001"])
+
+
+def test_lookup_substitutions_new_release(monkeypatch, history_substitutions):
+    assert len(lookup_substitutions(["1002"])["1002"]) == 1
+
+    create_substitution("1002", "2004", "Cat (disorder)")
+    assert len(lookup_substitutions(["1002"])["1002"]) == 1
+
+    monkeypatch.setattr(substitutions.cache, "check_interval", 0)
+    assert len(lookup_substitutions(["1002"])["1002"]) == 2
+
+
+def test_history_substitutions_json(client, history_substitutions):
+    rsp = client.get("/snomedct/history-substitutions/json/?ids=1001,1002,")
+
+    assert rsp.status_code == 200
+    data = rsp.json()["substitutions"]
+    assert sorted(data) == ["1001", "1002"]
+    assert [r["new_concept_id"] for r in data["1002"]] == ["2003"]
+
+
+def test_history_substitutions_json_no_ids(client):
+    rsp = client.get("/snomedct/history-substitutions/json/")
+
+    assert rsp.status_code == 400
+
+
+def test_history_substitutions(client, history_substitutions):
+    rsp = client.get("/snomedct/history-substitutions/?old=1001")
+
+    assert rsp.status_code == 200
+    assert [s.new_concept_id for s in rsp.context["substitutions"]] == [
+        "2001",
+        "2002",
+    ]
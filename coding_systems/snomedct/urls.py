@@ -11,4 +11,9 @@ urlpatterns = [
         views.history_substitutions,
         name="history_substitutions",
     ),
+    path(
+        "history-substitutions/json/",
+        views.history_substitutions_json,
+        name="history_substitutions_json",
+    ),
 ]
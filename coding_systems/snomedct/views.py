@@ -1,25 +1,28 @@
-from django.shortcuts import get_object_or_404, render
+from django.http import Http404, JsonResponse
+from django.shortcuts import render
 
-from .models import Concept, HistorySubstitution
+from .models import HistorySubstitution
+from .neighbourhood import lookup_neighbourhood
+from .substitutions import lookup_substitutions
 
 
 def concept(request, id):
-    concept = get_object_or_404(
-        Concept.objects.filter(pk=id).prefetch_related("descriptions")
-    )
+    neighbourhood = lookup_neighbourhood(id)
+    if neighbourhood is None:
+        raise Http404
 
     ctx = {
-        "concept": concept,
-        "parents": concept.parents.order_by("fully_specified_name"),
-        "children": concept.children.order_by("fully_specified_name"),
+        "concept": neighbourhood["concept"],
+        "parents": neighbourhood["parents"],
+        "children": neighbourhood["children"],
     }
 
     return render(request, "snomedct/concept.html", ctx)
 
 
 def history_substitutions(request):
-    old_codes = request.GET.get("old", "").split(",")
-    new_codes = request.GET.get("new", "").split(",")
+    old_codes = _parse_codes(request.GET.get("old")) or None
+    new_codes = _parse_codes(request.GET.get("new")) or None
 
     if old_codes is None:
         if new_codes is None:
@@ -43,3 +46,20 @@ def history_substitutions(request):
 
     ctx = {"substitutions": substitutions}
     return render(request, "snomedct/history_substitutions.html", ctx)
+
+
+def history_substitutions_json(request):
+    """Return the substitutions for each of the inactive concepts whose IDs are given
+    in the comma-separated `ids` parameter."""
+
+    ids = _parse_codes(request.GET.get("ids"))
+    if not ids:
+        return JsonResponse({"error": "Missing `ids` parameter"}, status=400)
+
+    return JsonResponse({"substitutions": lookup_substitutions(ids)})
+
+
+def _parse_codes(param):
+    if not param:
+        return []
+    return [code.strip() for code in param.split(",") if code.strip()]
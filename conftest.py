@@ -6,6 +6,8 @@ from django.core.management import call_command
 
 from codelists import actions
 from codelists.tests.factories import CodelistFactory
+from coding_systems.snomedct import neighbourhood, substitutions
+from mappings.ctv3sctmap2 import index as mapping_index
 from opencodelists.tests.fixtures import *  # noqa
 
 pytest.register_assert_rewrite("codelists.tests.views.assertions")
@@ -17,6 +19,17 @@ def enable_db_access_for_all_tests(db):
     pass
 
 
+@pytest.fixture(autouse=True)
+def clear_process_caches():
+    """Make sure that no test sees data that was cached in-process during an earlier
+    test, and which has since been rolled back."""
+
+    yield
+    mapping_index.clear_index()
+    substitutions.clear_cache()
+    neighbourhood.clear_cache()
+
+
 @pytest.fixture(scope="function")
 def tennis_elbow():
     fixtures_path = Path(settings.BASE_DIR, "coding_systems", "snomedct", "fixtures")
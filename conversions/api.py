@@ -0,0 +1,72 @@
+import tempfile
+
+from django.http import FileResponse
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+
+from .batch import (
+    CONVERSIONS,
+    TYPES,
+    iter_codes_from_csv,
+    iter_converted_files,
+    load_codelist_sources,
+    write_zip,
+)
+
+# Zip files larger than this are spooled to disk while they are being built.
+MAX_IN_MEMORY_ZIP_SIZE = 10 * 1024 * 1024
+
+
+@api_view(["POST"])
+def convert(request):
+    """Convert codelists and uploaded CSV files, and return a zip file with one CSV
+    file for each.
+
+    Codelists are given by their full slugs in `codelists`, and CSV files are uploaded
+    as `csv_data`.  Both may be repeated.
+    """
+
+    from_coding_system_id = request.data.get("from_coding_system_id")
+    to_coding_system_id = request.data.get("to_coding_system_id")
+    type = request.data.get("type", "full")
+    codelists = request.data.getlist("codelists")
+    uploaded_files = request.FILES.getlist("csv_data")
+
+    if (from_coding_system_id, to_coding_system_id) not in CONVERSIONS:
+        return error(
+            f"Cannot convert from {from_coding_system_id} to {to_coding_system_id}"
+        )
+    if type not in TYPES:
+        return error(f"Unknown type: {type}")
+    if not (codelists or uploaded_files):
+        return error("Missing `codelists` or `csv_data`")
+
+    def iter_sources():
+        yield from load_codelist_sources(codelists, from_coding_system_id)
+        for uploaded_file in uploaded_files:
+            name = uploaded_file.name.rsplit(".", 1)[0]
+            yield name, list(iter_codes_from_csv(uploaded_file))
+
+    files = iter_converted_files(
+        iter_sources(), from_coding_system_id, to_coding_system_id, type
+    )
+
+    f = tempfile.SpooledTemporaryFile(max_size=MAX_IN_MEMORY_ZIP_SIZE)
+    try:
+        write_zip(files, f)
+    except ValueError as e:
+        f.close()
+        return error(str(e))
+    f.seek(0)
+
+    return FileResponse(
+        f,
+        as_attachment=True,
+        filename=f"{from_coding_system_id}-to-{to_coding_system_id}.zip",
+        content_type="application/zip",
+    )
+
+
+def error(msg):
+    return Response({"error": msg}, status=status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,9 @@
+from django.urls import path
+
+from . import api
+
+app_name = "conversions_api"
+
+urlpatterns = [
+    path("", api.convert, name="convert"),
+]
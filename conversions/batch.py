@@ -0,0 +1,247 @@
+"""Convert lists of codes between CTV3 and SNOMED CT, and between Read V2 and CTV3.
+
+This is used both by ConvertView, which converts a single uploaded CSV file, and by
+the convert_codelists command and the batch conversion API, which convert many
+codelists and CSV files at once.  Each list of codes is converted and written out in
+turn, and the names of the codes are looked up through a TermCache that is shared by
+all the lists in a batch.
+"""
+
+import codecs
+import csv
+import os
+import zipfile
+from io import StringIO
+
+from codelists.coding_systems import CODING_SYSTEMS
+from codelists.models import Codelist
+from mappings.ctv3sctmap2 import mappers as ctv3sctmap2
+from mappings.rctctv3map import mappers as rctctv3map
+
+# Maps each supported (from_coding_system_id, to_coding_system_id) pair to the function
+# that returns mappings between the two coding systems.
+CONVERSIONS = {
+    ("snomedct", "ctv3"): ctv3sctmap2.get_mappings,
+    ("ctv3", "snomedct"): ctv3sctmap2.get_mappings,
+    ("readv2", "ctv3"): rctctv3map.get_mappings,
+    ("ctv3", "readv2"): rctctv3map.get_mappings,
+}
+
+TYPES = ["full", "to-codes-only"]
+
+
+class TermCache:
+    """Cache of the names of codes, looked up by coding system.
+
+    Names are looked up in batches, and each code's name is only looked up once.  Codes
+    that are not found are given the name "Unknown".
+    """
+
+    def __init__(self):
+        self._coding_system_id_to_names = {}
+
+    def lookup_names(self, coding_system, codes):
+        """Return mapping from each of the given codes to its name."""
+
+        names = self._coding_system_id_to_names.setdefault(coding_system.id, {})
+        missing = set(codes) - names.keys()
+        if missing:
+            found = coding_system.lookup_names(missing)
+            for code in missing:
+                names[code] = found.get(code, "Unknown")
+        return {code: names[code] for code in codes}
+
+
+def convert_codes(codes, from_coding_system_id, to_coding_system_id):
+    """Return list of assured, active mappings from the given codes to codes in another
+    coding system.  Each mapping is a dict keyed by coding system ID.
+    """
+
+    if (from_coding_system_id, to_coding_system_id) not in CONVERSIONS:
+        raise ValueError(
+            f"Cannot convert from {from_coding_system_id} to {to_coding_system_id}"
+        )
+
+    get_mappings = CONVERSIONS[(from_coding_system_id, to_coding_system_id)]
+    codes = set(codes)
+    if not codes:
+        return []
+    return get_mappings(**{f"{from_coding_system_id}_ids": codes})
+
+
+def build_conversion_table(mappings, from_coding_system, to_coding_system, type, cache):
+    """Return headers and sorted rows of a CSV file describing the given mappings.
+
+    If type is "full", there is a row for each mapping, giving the codes and names on
+    both sides.  Otherwise, there is a row for each converted code.
+    """
+
+    to_codes = {m[to_coding_system.id] for m in mappings}
+    to_names = cache.lookup_names(to_coding_system, to_codes)
+
+    if type == "full":
+        from_codes = {m[from_coding_system.id] for m in mappings}
+        from_names = cache.lookup_names(from_coding_system, from_codes)
+        headers = [
+            f"{from_coding_system.id}_id",
+            f"{from_coding_system.id}_name",
+            f"{to_coding_system.id}_id",
+            f"{to_coding_system.id}_name",
+        ]
+        rows = [
+            [
+                m[from_coding_system.id],
+                from_names[m[from_coding_system.id]],
+                m[to_coding_system.id],
+                to_names[m[to_coding_system.id]],
+            ]
+            for m in mappings
+        ]
+    else:
+        headers = [f"{to_coding_system.id}_id", f"{to_coding_system.id}_name"]
+        rows = [[code, to_names[code]] for code in to_codes]
+
+    return headers, sorted(rows)
+
+
+def build_filename(base_filename, to_coding_system_id, type):
+    if type == "full":
+        return f"{base_filename}-mapping.csv"
+    else:
+        return f"{base_filename}-{to_coding_system_id}.csv"
+
+
+def iter_codes_from_csv(f):
+    """Yield the codes in the first column of a CSV file with a header row.
+
+    f may be a file opened in binary mode (such as an uploaded file), which is decoded
+    as it is read, or any iterable of lines of text.
+    """
+
+    if isinstance(f, (str, bytes)):
+        raise TypeError("Expected a file or an iterable of lines")
+    lines = iter(f)
+    first_line = next(lines, None)
+    if first_line is None:
+        return
+    if isinstance(first_line, bytes):
+        decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        lines = (decoder.decode(line) for line in _prepend(first_line, lines))
+    else:
+        lines = _prepend(first_line.lstrip("\ufeff"), lines)
+
+    reader = csv.reader(lines)
+    next(reader, None)
+    for row in reader:
+        if row and row[0].strip():
+            yield row[0].strip()
+
+
+def _prepend(item, iterator):
+    yield item
+    yield from iterator
+
+
+def load_codelist_sources(full_slugs, from_coding_system_id):
+    """Yield (name, codes) for the latest version of each codelist with the given full
+    slug, in the form organisation_slug/codelist_slug or user/username/codelist_slug.
+
+    Raises ValueError if a codelist can't be found, or is not in the given coding
+    system.
+    """
+
+    for full_slug in full_slugs:
+        parts = full_slug.strip("/").split("/")
+        if len(parts) == 2:
+            kwargs = {"organisation_id": parts[0], "slug": parts[1]}
+        elif len(parts) == 3 and parts[0] == "user":
+            kwargs = {"user_id": parts[1], "slug": parts[2]}
+        else:
+            raise ValueError(f"Invalid codelist: {full_slug}")
+
+        try:
+            codelist = Codelist.objects.get(**kwargs)
+        except Codelist.DoesNotExist:
+            raise ValueError(f"Unknown codelist: {full_slug}")
+
+        if codelist.coding_system_id != from_coding_system_id:
+            raise ValueError(
+                f"Codelist {full_slug} uses {codelist.coding_system_id}, "
+                f"not {from_coding_system_id}"
+            )
+
+        version = (
+            codelist.versions.filter(draft_owner__isnull=True).order_by("id").last()
+        )
+        if version is None or version.codes is None:
+            raise ValueError(f"Codelist {full_slug} has no codes")
+
+        yield "-".join(parts), version.codes
+
+
+def load_csv_sources(paths):
+    """Yield (name, codes) for each CSV file at the given paths."""
+
+    for path in paths:
+        name, _ = os.path.splitext(os.path.basename(path))
+        with open(path, "rb") as f:
+            yield name, list(iter_codes_from_csv(f))
+
+
+def iter_converted_files(sources, from_coding_system_id, to_coding_system_id, type):
+    """Convert the codes from each source, and yield (filename, csv_data) for each.
+
+    sources is an iterable of (name, codes) pairs, and is consumed lazily, so that only
+    one list of codes need be held in memory at a time.  If two sources have the same
+    name, a number is added to the later one's filename.
+    """
+
+    from_coding_system = CODING_SYSTEMS[from_coding_system_id]
+    to_coding_system = CODING_SYSTEMS[to_coding_system_id]
+    cache = TermCache()
+    seen_names = set()
+
+    for name, codes in sources:
+        base_name = name
+        suffix = 1
+        while name in seen_names:
+            suffix += 1
+            name = f"{base_name}-{suffix}"
+        seen_names.add(name)
+
+        mappings = convert_codes(codes, from_coding_system_id, to_coding_system_id)
+        headers, rows = build_conversion_table(
+            mappings, from_coding_system, to_coding_system, type, cache
+        )
+        buf = StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(headers)
+        writer.writerows(rows)
+        yield build_filename(name, to_coding_system_id, type), buf.getvalue()
+
+
+def write_zip(files, f):
+    """Write (filename, csv_data) pairs to a zip file, which may be a path or a file
+    object.  Returns the number of files written.
+    """
+
+    num_files = 0
+    with zipfile.ZipFile(f, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for filename, csv_data in files:
+            zf.writestr(filename, csv_data)
+            num_files += 1
+    return num_files
+
+
+def write_directory(files, dir_path):
+    """Write (filename, csv_data) pairs to files in a directory, creating it if
+    necessary.  Returns the number of files written.
+    """
+
+    os.makedirs(dir_path, exist_ok=True)
+    num_files = 0
+    for filename, csv_data in files:
+        with open(os.path.join(dir_path, filename), "w", newline="") as f:
+            f.write(csv_data)
+        num_files += 1
+    return num_files
@@ -0,0 +1,70 @@
+"""
+Convert many codelists and CSV files between CTV3 and SNOMED CT, or between Read V2 and
+CTV3, in one go.
+
+Codelists are given by their full slug (organisation_slug/codelist_slug or
+user/username/codelist_slug), and the codes of their latest version are converted.  CSV
+files should have a header row, and codes in the first column.
+
+One CSV file is written for each codelist and input file.  If the output path ends in
+.zip, these are written to a zip file, and otherwise they are written to a directory.
+"""
+
+from django.core.management import BaseCommand, CommandError
+
+from conversions.batch import (
+    CONVERSIONS,
+    TYPES,
+    iter_converted_files,
+    load_codelist_sources,
+    load_csv_sources,
+    write_directory,
+    write_zip,
+)
+
+
+class Command(BaseCommand):
+    help = __doc__
+
+    def add_arguments(self, parser):
+        parser.add_argument("from_coding_system_id")
+        parser.add_argument("to_coding_system_id")
+        parser.add_argument("out_path")
+        parser.add_argument("--codelists", nargs="+", default=[])
+        parser.add_argument("--csv-paths", nargs="+", default=[])
+        parser.add_argument("--type", choices=TYPES, default="full")
+
+    def handle(
+        self,
+        from_coding_system_id,
+        to_coding_system_id,
+        out_path,
+        codelists,
+        csv_paths,
+        type,
+        **kwargs,
+    ):
+        if (from_coding_system_id, to_coding_system_id) not in CONVERSIONS:
+            raise CommandError(
+                f"Cannot convert from {from_coding_system_id} to {to_coding_system_id}"
+            )
+        if not (codelists or csv_paths):
+            raise CommandError("Provide --codelists or --csv-paths")
+
+        def iter_sources():
+            yield from load_codelist_sources(codelists, from_coding_system_id)
+            yield from load_csv_sources(csv_paths)
+
+        files = iter_converted_files(
+            iter_sources(), from_coding_system_id, to_coding_system_id, type
+        )
+
+        try:
+            if out_path.endswith(".zip"):
+                num_files = write_zip(files, out_path)
+            else:
+                num_files = write_directory(files, out_path)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(f"Wrote {num_files} files to {out_path}")
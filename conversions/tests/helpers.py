@@ -0,0 +1,69 @@
+import datetime
+import uuid
+
+from coding_systems.ctv3.models import TPPConcept
+from coding_systems.readv2.models import Concept as ReadV2Concept
+from mappings.ctv3sctmap2.models import Mapping
+from mappings.rctctv3map.models import Mapping as ReadV2Mapping
+
+# 128133004 |Disorder of elbow (disorder)|
+# 439656005 |Arthritis of elbow (disorder)|
+# 202855006 |Lateral epicondylitis (disorder)|
+CTV3_ID_TO_SNOMEDCT_IDS = {
+    "XE0Xa": ["128133004"],
+    "N0330": ["439656005"],
+    "N2350": ["202855006", "439656005"],
+}
+
+
+def create_mappings():
+    """Create CTV3 concepts, and mappings from them to SNOMED CT concepts in the
+    fixtures."""
+
+    for ctv3_id, snomedct_ids in CTV3_ID_TO_SNOMEDCT_IDS.items():
+        TPPConcept.objects.create(read_code=ctv3_id, description=f"Concept {ctv3_id}")
+        for snomedct_id in snomedct_ids:
+            Mapping.objects.create(
+                id=uuid.uuid4(),
+                ctv3_concept_id=ctv3_id,
+                ctv3_term_id="Y0000",
+                ctv3_term_type="P",
+                sct_concept_id=snomedct_id,
+                map_status=True,
+                effective_date=datetime.date(2020, 1, 1),
+                is_assured=True,
+            )
+
+
+def create_readv2_mappings():
+    """Create a Read V2 concept, and a mapping from it to a CTV3 concept."""
+
+    ReadV2Concept.objects.create(
+        read_code="G30..",
+        name_1="Acute myocardial infarction",
+        name_2="",
+        name_3="",
+        unknown_field_4="",
+        unknown_field_5="",
+        unknown_field_6="",
+        unknown_field_7="",
+        unknown_field_8="",
+        unknown_field_9="",
+        speciality_flags="",
+        status="",
+        language="EN",
+    )
+    ReadV2Mapping.objects.create(
+        id=uuid.uuid4(),
+        v2_concept_id="G30..",
+        v2_term_id="00",
+        ctv3_term_id="Y0000",
+        ctv3_termtyp="P",
+        ctv3_concept_id="X200E",
+        use_ctv3_term_id="",
+        stat="C",
+        map_typ="A",
+        map_status=True,
+        effective_date=datetime.date(2020, 1, 1),
+        is_assured=True,
+    )
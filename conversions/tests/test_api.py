@@ -0,0 +1,71 @@
+import io
+import json
+import zipfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from .helpers import create_mappings
+
+
+def test_convert(client, user, new_style_codelist, version_with_no_searches):
+    create_mappings()
+    headers = {"HTTP_AUTHORIZATION": f"Token {user.api_token}"}
+    data = {
+        "from_coding_system_id": "snomedct",
+        "to_coding_system_id": "ctv3",
+        "type": "to-codes-only",
+        "codelists": [new_style_codelist.full_slug()],
+        "csv_data": [
+            SimpleUploadedFile("elbow.csv", b"code\n128133004\n"),
+            SimpleUploadedFile("arthritis.csv", b"code\n439656005\n"),
+        ],
+    }
+
+    rsp = client.post("/api/v1/conversions/", data, **headers)
+
+    assert rsp.status_code == 200
+    assert rsp["Content-Type"] == "application/zip"
+    with zipfile.ZipFile(io.BytesIO(b"".join(rsp.streaming_content))) as zf:
+        assert zf.namelist() == [
+            "test-university-new-style-codelist-ctv3.csv",
+            "elbow-ctv3.csv",
+            "arthritis-ctv3.csv",
+        ]
+        assert (
+            zf.read("elbow-ctv3.csv") == b"ctv3_id,ctv3_name\r\nXE0Xa,Concept XE0Xa\r\n"
+        )
+
+
+def test_convert_unsupported_conversion(client, user):
+    headers = {"HTTP_AUTHORIZATION": f"Token {user.api_token}"}
+    data = {
+        "from_coding_system_id": "snomedct",
+        "to_coding_system_id": "icd10",
+        "csv_data": [SimpleUploadedFile("elbow.csv", b"code\n128133004\n")],
+    }
+
+    rsp = client.post("/api/v1/conversions/", data, **headers)
+
+    assert rsp.status_code == 400
+    assert json.loads(rsp.content) == {"error": "Cannot convert from snomedct to icd10"}
+
+
+def test_convert_unknown_codelist(client, user):
+    headers = {"HTTP_AUTHORIZATION": f"Token {user.api_token}"}
+    data = {
+        "from_coding_system_id": "snomedct",
+        "to_coding_system_id": "ctv3",
+        "codelists": ["test-university/unknown"],
+    }
+
+    rsp = client.post("/api/v1/conversions/", data, **headers)
+
+    assert rsp.status_code == 400
+    assert json.loads(rsp.content) == {
+        "error": "Unknown codelist: test-university/unknown"
+    }
+
+
+def test_convert_no_auth(client):
+    rsp = client.post("/api/v1/conversions/", {})
+    assert rsp.status_code == 401
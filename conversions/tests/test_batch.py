@@ -0,0 +1,128 @@
+import io
+import zipfile
+
+import pytest
+
+from codelists.coding_systems import CODING_SYSTEMS
+from conversions.batch import (
+    TermCache,
+    iter_codes_from_csv,
+    iter_converted_files,
+    load_codelist_sources,
+    write_zip,
+)
+
+from .helpers import create_mappings, create_readv2_mappings
+
+
+def test_iter_codes_from_csv_binary():
+    f = io.BytesIO(
+        "\ufeffcode,term\r\n128133004,Elbow\r\n\r\n439656005,Arthritis\r\n".encode(
+            "utf8"
+        )
+    )
+    assert list(iter_codes_from_csv(f)) == ["128133004", "439656005"]
+
+
+def test_iter_codes_from_csv_text():
+    lines = ["code,term\n", "128133004,Elbow\n", " 439656005 ,Arthritis\n"]
+    assert list(iter_codes_from_csv(lines)) == ["128133004", "439656005"]
+
+
+def test_iter_codes_from_csv_empty():
+    assert list(iter_codes_from_csv(io.BytesIO(b""))) == []
+
+
+def test_term_cache(django_assert_num_queries, version_with_no_searches):
+    coding_system = CODING_SYSTEMS["snomedct"]
+    cache = TermCache()
+
+    with django_assert_num_queries(1):
+        assert cache.lookup_names(coding_system, ["128133004", "99999"]) == {
+            "128133004": "Disorder of elbow (disorder)",
+            "99999": "Unknown",
+        }
+    with django_assert_num_queries(1):
+        cache.lookup_names(coding_system, ["128133004", "439656005"])
+    with django_assert_num_queries(0):
+        cache.lookup_names(coding_system, ["439656005", "99999"])
+
+
+def test_iter_converted_files_snomedct_to_ctv3(version_with_no_searches):
+    create_mappings()
+    sources = [("a", ["128133004"]), ("a", ["439656005", "202855006"])]
+
+    files = list(iter_converted_files(sources, "snomedct", "ctv3", "to-codes-only"))
+
+    assert files == [
+        ("a-ctv3.csv", "ctv3_id,ctv3_name\r\nXE0Xa,Concept XE0Xa\r\n"),
+        (
+            "a-2-ctv3.csv",
+            "ctv3_id,ctv3_name\r\nN0330,Concept N0330\r\nN2350,Concept N2350\r\n",
+        ),
+    ]
+
+
+def test_iter_converted_files_ctv3_to_snomedct(version_with_no_searches):
+    create_mappings()
+    sources = [("b", ["N2350", "XXXXX"])]
+
+    files = list(iter_converted_files(sources, "ctv3", "snomedct", "full"))
+
+    assert files == [
+        (
+            "b-mapping.csv",
+            "ctv3_id,ctv3_name,snomedct_id,snomedct_name\r\n"
+            "N2350,Concept N2350,202855006,Lateral epicondylitis (disorder)\r\n"
+            "N2350,Concept N2350,439656005,Arthritis of elbow (disorder)\r\n",
+        )
+    ]
+
+
+def test_iter_converted_files_readv2_to_ctv3():
+    create_readv2_mappings()
+    sources = [("c", ["G30..", "G3..."])]
+
+    files = list(iter_converted_files(sources, "readv2", "ctv3", "full"))
+
+    assert files == [
+        (
+            "c-mapping.csv",
+            "readv2_id,readv2_name,ctv3_id,ctv3_name\r\n"
+            "G30..,Acute myocardial infarction,X200E,Unknown\r\n",
+        )
+    ]
+
+
+def test_iter_converted_files_unsupported_conversion():
+    with pytest.raises(ValueError):
+        list(iter_converted_files([("a", ["1"])], "snomedct", "icd10", "full"))
+
+
+def test_load_codelist_sources(new_style_codelist):
+    full_slug = new_style_codelist.full_slug()
+    latest_version = new_style_codelist.versions.order_by("id").last()
+
+    [(name, codes)] = load_codelist_sources([full_slug], "snomedct")
+
+    assert name == "test-university-new-style-codelist"
+    assert codes == latest_version.codes
+
+
+def test_load_codelist_sources_wrong_coding_system(new_style_codelist):
+    with pytest.raises(ValueError):
+        list(load_codelist_sources([new_style_codelist.full_slug()], "ctv3"))
+
+
+def test_load_codelist_sources_unknown_codelist():
+    with pytest.raises(ValueError):
+        list(load_codelist_sources(["test-university/unknown"], "snomedct"))
+
+
+def test_write_zip():
+    f = io.BytesIO()
+    assert write_zip([("a.csv", "x\r\n"), ("b.csv", "y\r\n")], f) == 2
+
+    with zipfile.ZipFile(f) as zf:
+        assert zf.namelist() == ["a.csv", "b.csv"]
+        assert zf.read("b.csv") == b"y\r\n"
@@ -1,6 +1,9 @@
+from django.db import transaction
 from openpyxl import load_workbook
 
-from .models import Mapping
+from coding_systems.dmd.models import AMP, VMP
+
+from .models import DMDProduct, Mapping
 
 
 def import_data(filename):
@@ -33,3 +36,39 @@ def import_data(filename):
         Mapping(dmd_code=r[0], dmd_type=r[1], bnf_concept_id=r[2])
         for r in load_records()
     )
+
+    build_dmd_products()
+
+
+@transaction.atomic
+def build_dmd_products():
+    """Replace the contents of the DMDProduct table with the products that each BNF
+    code maps to.
+
+    This is also run by the build_dmd_products command, which should be run after a new
+    dm+d release is imported, so that the names of new products are picked up.
+    """
+
+    DMDProduct.objects.all().delete()
+
+    for dmd_type, model in [("VMP", VMP), ("AMP", AMP)]:
+        mappings = Mapping.objects.filter(dmd_type=dmd_type)
+        dmd_id_to_bnf_code = dict(mappings.values_list("dmd_code", "bnf_concept_id"))
+        DMDProduct.objects.bulk_create(
+            (
+                DMDProduct(
+                    bnf_code=dmd_id_to_bnf_code[dmd_id],
+                    dmd_type=dmd_type,
+                    dmd_id=dmd_id,
+                    dmd_name=name,
+                )
+                # We filter with a subquery, rather than passing all the mapped IDs
+                # as query parameters, since there can be hundreds of thousands
+                for dmd_id, name in model.objects.filter(
+                    id__in=mappings.values("dmd_code")
+                )
+                .order_by()
+                .values_list("id", "nm")
+            ),
+            batch_size=10000,
+        )
@@ -0,0 +1,16 @@
+"""
+Rebuild the table of dm+d products that each BNF code maps to.  This is done when BNF to
+dm+d mappings are imported, and should be done again after importing a new dm+d
+release.
+"""
+
+from django.core.management import BaseCommand
+
+from mappings.bnfdmd.import_data import build_dmd_products
+
+
+class Command(BaseCommand):
+    help = __doc__
+
+    def handle(self, **kwargs):
+        build_dmd_products()
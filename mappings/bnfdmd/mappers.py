@@ -1,46 +1,61 @@
-from coding_systems.dmd.models import AMP, VMP
+from functools import reduce
+from operator import or_
 
-from .models import Mapping
+from django.db.models import Q
+
+from .models import DMDProduct
+
+# BNF presentation codes are 15 characters long.  Shorter codes identify chapters,
+# sections, and so on, and are prefixes of the codes of the presentations below them.
+PRESENTATION_CODE_LENGTH = 15
 
 
 def bnf_to_dmd(bnf_codes):
-    vmp_id_to_bnf_code = dict(
-        Mapping.objects.filter(
-            bnf_concept_id__in=bnf_codes, dmd_type="VMP"
-        ).values_list("dmd_code", "bnf_concept_id")
-    )
-    amp_id_to_bnf_code = dict(
-        Mapping.objects.filter(
-            bnf_concept_id__in=bnf_codes, dmd_type="AMP"
-        ).values_list("dmd_code", "bnf_concept_id")
-    )
+    """Return the dm+d products that the given BNF codes map to, ordered by BNF code,
+    with VMPs before AMPs.
+
+    The codes are reduced to the shortest prefixes that cover them, and products are
+    fetched with one query, using a range over the index on BNF code for each prefix
+    that isn't a presentation code.
+    """
+
+    bnf_codes = set(bnf_codes)
+    prefixes = shortest_prefixes(bnf_codes)
+    presentation_codes = [p for p in prefixes if len(p) >= PRESENTATION_CODE_LENGTH]
+    other_prefixes = [p for p in prefixes if len(p) < PRESENTATION_CODE_LENGTH]
+
+    clauses = [Q(bnf_code__in=presentation_codes)] if presentation_codes else []
+    clauses.extend(prefix_range(prefix) for prefix in other_prefixes)
+    if not clauses:
+        return []
 
-    rows = []
-
-    for vmp in VMP.objects.filter(id__in=list(vmp_id_to_bnf_code)):
-        rows.append(
-            {
-                "dmd_type": "VMP",
-                "dmd_id": vmp.id,
-                "dmd_name": vmp.nm,
-                "bnf_code": vmp_id_to_bnf_code[vmp.id],
-            }
-        )
-
-    for amp in AMP.objects.filter(id__in=list(amp_id_to_bnf_code)):
-        rows.append(
-            {
-                "dmd_type": "AMP",
-                "dmd_id": amp.id,
-                "dmd_name": amp.nm,
-                "bnf_code": amp_id_to_bnf_code[amp.id],
-            }
-        )
-
-    return sorted(
-        rows,
-        key=lambda row: (
-            row["bnf_code"],
-            ["VMP", "AMP"].index(row["dmd_type"]),
-        ),
+    rows = (
+        DMDProduct.objects.filter(reduce(or_, clauses))
+        .order_by("bnf_code", "-dmd_type", "dmd_id")
+        .values("dmd_type", "dmd_id", "dmd_name", "bnf_code")
     )
+    return [row for row in rows if row["bnf_code"] in bnf_codes]
+
+
+def shortest_prefixes(codes):
+    """Return the codes that don't have any other of the codes as a prefix."""
+
+    prefixes = []
+    for code in sorted(codes):
+        # In sorted order, any code that is a prefix of this one comes before it, and
+        # is followed only by other codes that it is a prefix of.
+        if prefixes and code.startswith(prefixes[-1]):
+            continue
+        prefixes.append(code)
+    return prefixes
+
+
+def prefix_range(prefix):
+    """Return a Q object matching BNF codes that start with the given prefix.
+
+    We don't use bnf_code__startswith, since SQLite can't use an index for the LIKE
+    query that this generates.  BNF codes are alphanumeric, so all codes with the prefix
+    sort before the prefix followed by "~".
+    """
+
+    return Q(bnf_code__gte=prefix, bnf_code__lt=prefix + "~")
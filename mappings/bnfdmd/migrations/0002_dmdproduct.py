@@ -0,0 +1,67 @@
+# Generated by Django 3.1.6 on 2021-02-12 10:15
+
+from django.db import migrations, models
+
+
+def build_dmd_products(apps, schema_editor):
+    DMDProduct = apps.get_model("bnfdmd", "DMDProduct")
+    Mapping = apps.get_model("bnfdmd", "Mapping")
+
+    for dmd_type in ["VMP", "AMP"]:
+        model = apps.get_model("dmd", dmd_type)
+        mappings = Mapping.objects.filter(dmd_type=dmd_type)
+        dmd_id_to_bnf_code = dict(mappings.values_list("dmd_code", "bnf_concept_id"))
+        DMDProduct.objects.bulk_create(
+            (
+                DMDProduct(
+                    bnf_code=dmd_id_to_bnf_code[dmd_id],
+                    dmd_type=dmd_type,
+                    dmd_id=dmd_id,
+                    dmd_name=name,
+                )
+                # We filter with a subquery, rather than passing all the mapped IDs
+                # as query parameters, since there can be hundreds of thousands
+                for dmd_id, name in model.objects.filter(
+                    id__in=mappings.values("dmd_code")
+                )
+                .order_by()
+                .values_list("id", "nm")
+            ),
+            batch_size=10000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bnfdmd", "0001_initial"),
+        ("dmd", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DMDProduct",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("bnf_code", models.CharField(max_length=15)),
+                ("dmd_type", models.CharField(max_length=4)),
+                ("dmd_id", models.CharField(max_length=18)),
+                ("dmd_name", models.CharField(max_length=255)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="dmdproduct",
+            index=models.Index(
+                fields=["bnf_code", "dmd_type"], name="bnfdmd_dmdp_bnf_cod_9a5354_idx"
+            ),
+        ),
+        migrations.RunPython(build_dmd_products, migrations.RunPython.noop),
+    ]
@@ -10,3 +10,21 @@ class Mapping(models.Model):
         on_delete=models.PROTECT,
         related_name="bnf_mappings",
     )
+
+
+class DMDProduct(models.Model):
+    """A dm+d product that a BNF code maps to, along with the product's name.
+
+    This is a denormalised copy of Mapping, joined to the VMP and AMP tables, and is
+    rebuilt by build_dmd_products() whenever mappings are imported.  Rows are indexed
+    by BNF code, so that the products for all BNF codes with a given prefix (such as a
+    whole chapter) can be found with a single range query.
+    """
+
+    bnf_code = models.CharField(max_length=15)
+    dmd_type = models.CharField(max_length=4)
+    dmd_id = models.CharField(max_length=18)
+    dmd_name = models.CharField(max_length=255)
+
+    class Meta:
+        indexes = [models.Index(fields=["bnf_code", "dmd_type"])]
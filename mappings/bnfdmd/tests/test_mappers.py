@@ -0,0 +1,62 @@
+from mappings.bnfdmd.mappers import bnf_to_dmd, shortest_prefixes
+from mappings.bnfdmd.models import DMDProduct
+
+
+def create_products():
+    for bnf_code, dmd_type, dmd_id in [
+        ("0101010C0AAAAAA", "AMP", "3"),
+        ("0101010C0AAAAAA", "VMP", "2"),
+        ("0101010C0AAAAAA", "VMP", "1"),
+        ("0101010C0AAABAB", "VMP", "4"),
+        ("0101010F0AAAMAM", "VMP", "5"),
+        ("0201010F0AAAAAA", "VMP", "6"),
+    ]:
+        DMDProduct.objects.create(
+            bnf_code=bnf_code,
+            dmd_type=dmd_type,
+            dmd_id=dmd_id,
+            dmd_name=f"Product {dmd_id}",
+        )
+
+
+def test_shortest_prefixes():
+    assert shortest_prefixes(
+        ["0101010C0AAAAAA", "01", "0101", "0201010F0AAAAAA", "020101"]
+    ) == ["01", "020101"]
+
+
+def test_bnf_to_dmd():
+    create_products()
+
+    rows = bnf_to_dmd(["0101010C0", "0101010C0AAAAAA", "0201010F0AAAAAA"])
+
+    assert rows == [
+        {
+            "dmd_type": "VMP",
+            "dmd_id": "1",
+            "dmd_name": "Product 1",
+            "bnf_code": "0101010C0AAAAAA",
+        },
+        {
+            "dmd_type": "VMP",
+            "dmd_id": "2",
+            "dmd_name": "Product 2",
+            "bnf_code": "0101010C0AAAAAA",
+        },
+        {
+            "dmd_type": "AMP",
+            "dmd_id": "3",
+            "dmd_name": "Product 3",
+            "bnf_code": "0101010C0AAAAAA",
+        },
+        {
+            "dmd_type": "VMP",
+            "dmd_id": "6",
+            "dmd_name": "Product 6",
+            "bnf_code": "0201010F0AAAAAA",
+        },
+    ]
+
+
+def test_bnf_to_dmd_no_codes():
+    assert bnf_to_dmd([]) == []
@@ -5,6 +5,8 @@ import sqlite3
 
 from django.db import connection as django_connection
 
+from .index import build_index
+
 
 def import_data(release_dir):
     """
@@ -54,6 +56,8 @@ def import_data(release_dir):
     connection.commit()
     connection.close()
 
+    build_index()
+
 
 def iter_values(rows):
     """
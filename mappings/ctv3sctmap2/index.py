@@ -0,0 +1,125 @@
+"""An in-memory index of the assured, active mappings between CTV3 and SNOMED CT
+concepts.
+
+The index is shared by everything in a process, and is loaded from the database the
+first time it is needed.  It is held in a ReleaseCache (see
+opencodelists/release_cache.py), so it is reloaded when a new release of the mappings
+is found in the database.  The index is also reloaded after import_data() runs, and
+after mappings are saved or deleted through the ORM.
+"""
+
+from bisect import bisect_left, bisect_right
+
+from django.db.models import Count, Max
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from opencodelists.release_cache import ReleaseCache
+
+from .models import Mapping
+
+# The cache holds a single value, the index, under this key.
+INDEX_KEY = "index"
+
+
+class MappingIndex:
+    """Pairs of (ctv3_id, snomedct_id), held in two pairs of parallel lists: one sorted
+    by CTV3 ID, and one sorted by SNOMED CT ID.  Looking up the mappings for a code is
+    a binary search of the relevant list of keys.
+    """
+
+    def __init__(self, pairs):
+        by_ctv3 = sorted(set(pairs))
+        self._ctv3_keys = [ctv3_id for ctv3_id, _ in by_ctv3]
+        self._ctv3_values = [snomedct_id for _, snomedct_id in by_ctv3]
+
+        by_snomedct = sorted((snomedct_id, ctv3_id) for ctv3_id, snomedct_id in by_ctv3)
+        self._snomedct_keys = [snomedct_id for snomedct_id, _ in by_snomedct]
+        self._snomedct_values = [ctv3_id for _, ctv3_id in by_snomedct]
+
+    def __len__(self):
+        return len(self._ctv3_keys)
+
+    def snomedct_ids_for_ctv3_id(self, ctv3_id):
+        """Return list of SNOMED CT IDs that the given CTV3 ID maps to."""
+
+        return _lookup(self._ctv3_keys, self._ctv3_values, ctv3_id)
+
+    def ctv3_ids_for_snomedct_id(self, snomedct_id):
+        """Return list of CTV3 IDs that map to the given SNOMED CT ID."""
+
+        return _lookup(self._snomedct_keys, self._snomedct_values, snomedct_id)
+
+    def pairs_for_ctv3_ids(self, ctv3_ids):
+        """Return list of (ctv3_id, snomedct_id) pairs for the given CTV3 IDs."""
+
+        return [
+            (ctv3_id, snomedct_id)
+            for ctv3_id in sorted(set(ctv3_ids))
+            for snomedct_id in self.snomedct_ids_for_ctv3_id(ctv3_id)
+        ]
+
+    def pairs_for_snomedct_ids(self, snomedct_ids):
+        """Return list of (ctv3_id, snomedct_id) pairs for the given SNOMED CT IDs."""
+
+        return [
+            (ctv3_id, snomedct_id)
+            for snomedct_id in sorted(set(snomedct_ids))
+            for ctv3_id in self.ctv3_ids_for_snomedct_id(snomedct_id)
+        ]
+
+
+def _lookup(keys, values, key):
+    start = bisect_left(keys, key)
+    end = bisect_right(keys, key, lo=start)
+    return values[start:end]
+
+
+def get_index():
+    """Return the index for the release of the mappings that is in the database."""
+
+    return cache.get(INDEX_KEY)
+
+
+def build_index():
+    """Load the index from the database, replacing any existing index."""
+
+    cache.clear()
+    return get_index()
+
+
+def clear_index():
+    """Discard the index, so that it is loaded again when it is next needed."""
+
+    cache.clear()
+
+
+def current_release():
+    """Return a value identifying the release of the mappings in the database.
+
+    Mappings are only ever added or updated by a new release, and updated mappings get
+    a new effective date, so the number of mappings and their latest effective date
+    change with each release.
+    """
+
+    release = Mapping.objects.aggregate(
+        num_mappings=Count("id"), effective_date=Max("effective_date")
+    )
+    return (release["num_mappings"], release["effective_date"])
+
+
+def _load_index(keys):
+    pairs = Mapping.objects.filter(
+        is_assured=True, map_status=True, sct_concept_id__isnull=False
+    ).values_list("ctv3_concept_id", "sct_concept_id")
+    index = MappingIndex(pairs)
+    return {key: index for key in keys}
+
+
+cache = ReleaseCache(current_release, _load_index)
+
+
+@receiver(post_save, sender=Mapping)
+@receiver(post_delete, sender=Mapping)
+def _clear_index_on_change(**kwargs):
+    clear_index()
@@ -1,12 +1,26 @@
 from collections import defaultdict
 
+from codelists.hierarchy import Hierarchy
 from coding_systems.ctv3 import coding_system as ctv3
 from coding_systems.ctv3.models import RawConcept as CTV3Concept
 from coding_systems.snomedct import coding_system as snomedct
 from coding_systems.snomedct.models import Concept as SCTConcept
 from coding_systems.snomedct.models import QueryTableRecord
 
-from .models import Mapping
+from .index import get_index
+
+# Maximum number of IDs passed to each query that looks up many concepts at once.
+# SQLite's limit on the number of query parameters can be as low as 999.
+QUERY_BATCH_SIZE = 900
+
+
+def batched(ids):
+    """Yield lists of at most QUERY_BATCH_SIZE of the given IDs, in sorted order."""
+
+    ids = sorted(ids)
+    for start in range(0, len(ids), QUERY_BATCH_SIZE):
+        end = start + QUERY_BATCH_SIZE
+        yield ids[start:end]
 
 
 def get_mappings(ctv3_ids=None, snomedct_ids=None):
@@ -16,79 +30,95 @@ def get_mappings(ctv3_ids=None, snomedct_ids=None):
 
     assert ctv3_ids or snomedct_ids
 
-    mappings = Mapping.objects.filter(is_assured=True, map_status=True)
+    index = get_index()
     if ctv3_ids:
-        mappings = mappings.filter(ctv3_concept_id__in=ctv3_ids)
-    if snomedct_ids:
-        mappings = mappings.filter(sct_concept_id__in=snomedct_ids)
+        pairs = index.pairs_for_ctv3_ids(ctv3_ids)
+        if snomedct_ids:
+            snomedct_ids = set(snomedct_ids)
+            pairs = [pair for pair in pairs if pair[1] in snomedct_ids]
+    else:
+        pairs = index.pairs_for_snomedct_ids(snomedct_ids)
 
     return [
-        {"ctv3": m[0], "snomedct": m[1]}
-        for m in mappings.values_list("ctv3_concept_id", "sct_concept_id")
+        {"ctv3": ctv3_id, "snomedct": snomedct_id} for ctv3_id, snomedct_id in pairs
     ]
 
 
 def ctv3_to_snomedct(ctv3_ids):
+    """Convert CTV3 concept IDs to SNOMED CT concepts.
+
+    The result includes active SNOMED CT concepts with assured mappings from the CTV3
+    concepts, active descendants of those concepts that are mapped from leaf CTV3
+    concepts, and inactive concepts that are subtypes of any of these in the Query
+    Table.
+
+    Each dataset is fetched with one query for each QUERY_BATCH_SIZE concepts, so that
+    thousands of CTV3 concepts can be converted at once:
+
+    * the CTV3 concepts with no children
+    * the SNOMED CT hierarchy below concepts mapped from leaf CTV3 concepts
+    * the Query Table records for the concepts found so far
+    * the name and active flag of every concept in the result
+
+    Mappings are looked up in the mapping index.
+    """
+
+    ctv3_ids = set(ctv3_ids)
+    index = get_index()
+
+    mapped_ids = {snomedct_id for _, snomedct_id in index.pairs_for_ctv3_ids(ctv3_ids)}
+
+    leaf_ctv3_ids = set()
+    for batch in batched(ctv3_ids):
+        leaf_ctv3_ids.update(
+            CTV3Concept.objects.filter(read_code__in=batch, children=None).values_list(
+                "read_code", flat=True
+            )
+        )
+    leaf_mapped_ids = {
+        snomedct_id for _, snomedct_id in index.pairs_for_ctv3_ids(leaf_ctv3_ids)
+    }
+
+    relationships = set()
+    for batch in batched(leaf_mapped_ids):
+        relationships.update(snomedct.descendant_relationships(batch))
+    hierarchy = Hierarchy(snomedct.root, relationships)
+    candidate_ids = mapped_ids | hierarchy.nodes
+
+    supertype_id_to_subtype_ids = defaultdict(set)
+    for batch in batched(candidate_ids):
+        for supertype_id, subtype_id in QueryTableRecord.objects.filter(
+            supertype_id__in=batch
+        ).values_list("supertype_id", "subtype_id"):
+            supertype_id_to_subtype_ids[supertype_id].add(subtype_id)
+
+    code_to_metadata = {}
+    for batch in batched(candidate_ids.union(*supertype_id_to_subtype_ids.values())):
+        code_to_metadata.update(snomedct.lookup_concept_metadata(batch))
+
     # Find all active SNOMED CT concepts with assured mappings from CTV3
     # concepts.
-    snomedct_ids = set(
-        SCTConcept.objects.filter(
-            active=True,
-            ctv3_mappings__ctv3_concept_id__in=ctv3_ids,
-            ctv3_mappings__map_status=True,
-            ctv3_mappings__is_assured=True,
-        ).values_list("id", flat=True)
-    )
-
-    # Find all active SNOMED CT concepts with assured mappings from leaf CTV3
-    # concepts.
-    leaf_ctv3_ids = CTV3Concept.objects.filter(
-        read_code__in=ctv3_ids, children=None
-    ).values_list("read_code", flat=True)
-
-    ctv3_leaf_snomedct_ids = set(
-        SCTConcept.objects.filter(
-            active=True,
-            ctv3_mappings__ctv3_concept_id__in=leaf_ctv3_ids,
-            ctv3_mappings__map_status=True,
-            ctv3_mappings__is_assured=True,
-        ).values_list("id", flat=True)
-    )
+    snomedct_ids = {
+        snomedct_id
+        for snomedct_id in mapped_ids
+        if snomedct_id in code_to_metadata and code_to_metadata[snomedct_id]["active"]
+    }
 
     # Find all SNOMED CT concepts that are descendants of those with assured
     # mappings from leaf CTV3 concepts.
-    descendant_ids = {
-        child_id
-        for (parent_id, child_id) in snomedct.descendant_relationships(
-            list(ctv3_leaf_snomedct_ids)
-        )
-    } - snomedct_ids
+    descendant_ids = set()
+    for snomedct_id in leaf_mapped_ids & snomedct_ids:
+        descendant_ids |= hierarchy.descendants(snomedct_id)
+    descendant_ids -= snomedct_ids
 
     active_ids = snomedct_ids | descendant_ids
 
     # Find all inactive SNOMED CT concepts that map to these active concepts
     # via the Query Table.
-    query_table_subtype_ids = set(
-        QueryTableRecord.objects.filter(supertype_id__in=active_ids)
-        .values_list("subtype_id", flat=True)
-        .distinct()
-    )
-    inactive_ids = query_table_subtype_ids - active_ids
-
-    # Build mapping from SNOMED CT ID to CTV3 ID.
-    all_ids = snomedct_ids | ctv3_leaf_snomedct_ids | descendant_ids | inactive_ids
-
-    snomedct_id_to_ctv3_id = defaultdict(list)
-    for mapping in Mapping.objects.filter(
-        sct_concept_id__in=all_ids, map_status=True, is_assured=True
-    ):
-        snomedct_id_to_ctv3_id[mapping.sct_concept_id].append(mapping.ctv3_concept_id)
-
-    snomedct_id_to_name = snomedct.lookup_names(all_ids)
-    snomedct_id_to_active = {
-        concept.id: concept.active
-        for concept in SCTConcept.objects.filter(id__in=all_ids)
-    }
+    inactive_ids = set()
+    for snomedct_id in active_ids:
+        inactive_ids |= supertype_id_to_subtype_ids.get(snomedct_id, set())
+    inactive_ids -= active_ids
 
     records = []
     for ids, notes in [
@@ -97,12 +127,13 @@ def ctv3_to_snomedct(ctv3_ids):
         (inactive_ids, "via Query Table"),
     ]:
         for snomedct_id in ids:
+            metadata = code_to_metadata[snomedct_id]
             records.append(
                 {
                     "id": snomedct_id,
-                    "name": snomedct_id_to_name[snomedct_id],
-                    "active": snomedct_id_to_active[snomedct_id],
-                    "ctv3_ids": snomedct_id_to_ctv3_id[snomedct_id],
+                    "name": metadata["name"],
+                    "active": metadata["active"],
+                    "ctv3_ids": index.ctv3_ids_for_snomedct_id(snomedct_id),
                     "notes": notes,
                 }
             )
@@ -112,23 +143,16 @@ def ctv3_to_snomedct(ctv3_ids):
 
 def snomedct_to_ctv3(snomedct_ids):
     """Convert SNOMED CT Concept codes to CTV3 Concepts IDs."""
-    ctv3_ids = set(
-        CTV3Concept.objects.filter(
-            snomedct_mappings__sct_concept_id__in=snomedct_ids,
-            snomedct_mappings__map_status=True,
-            snomedct_mappings__is_assured=True,
-        ).values_list("pk", flat=True)
-    )
-
-    ctv3_id_to_snomedct_id = defaultdict(list)
-    for mapping in Mapping.objects.filter(
-        ctv3_concept_id__in=ctv3_ids, map_status=True, is_assured=True
-    ).select_related("ctv3_concept"):
-        ctv3_id_to_snomedct_id[mapping.ctv3_concept.read_code].append(
-            mapping.sct_concept_id
-        )
+    index = get_index()
+    ctv3_ids = {ctv3_id for ctv3_id, _ in index.pairs_for_snomedct_ids(snomedct_ids)}
+
+    ctv3_id_to_snomedct_id = {
+        ctv3_id: index.snomedct_ids_for_ctv3_id(ctv3_id) for ctv3_id in ctv3_ids
+    }
 
-    code_to_name = ctv3.lookup_names(ctv3_ids)
+    code_to_name = {}
+    for batch in batched(ctv3_ids):
+        code_to_name.update(ctv3.lookup_names(batch))
 
     records = []
     for ctv3_id in ctv3_ids:
@@ -142,3 +166,30 @@ def snomedct_to_ctv3(snomedct_ids):
         )
 
     return records
+
+
+def read_code_to_snomedct_concepts(ctv3_ids):
+    """Return dict mapping each of the given CTV3 IDs to a sorted list of the IDs of the
+    active SNOMED CT concepts that it has assured, active mappings to.
+
+    Mappings are looked up in the mapping index, and the active flags of the mapped
+    concepts are fetched with one query for each QUERY_BATCH_SIZE concepts.
+    """
+
+    index = get_index()
+    ctv3_id_to_snomedct_ids = {
+        ctv3_id: index.snomedct_ids_for_ctv3_id(ctv3_id) for ctv3_id in set(ctv3_ids)
+    }
+    active_ids = set()
+    for batch in batched(set().union(*ctv3_id_to_snomedct_ids.values())):
+        active_ids.update(
+            SCTConcept.objects.filter(id__in=batch, active=True).values_list(
+                "id", flat=True
+            )
+        )
+    return {
+        ctv3_id: [
+            snomedct_id for snomedct_id in snomedct_ids if snomedct_id in active_ids
+        ]
+        for ctv3_id, snomedct_ids in ctv3_id_to_snomedct_ids.items()
+    }
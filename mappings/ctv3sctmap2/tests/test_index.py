@@ -0,0 +1,73 @@
+import datetime
+import uuid
+
+from mappings.ctv3sctmap2 import index as mapping_index
+from mappings.ctv3sctmap2.index import MappingIndex, build_index, get_index
+from mappings.ctv3sctmap2.models import Mapping
+
+
+def create_mapping(ctv3_id, snomedct_id, is_assured=True, map_status=True):
+    return Mapping.objects.create(
+        id=uuid.uuid4(),
+        ctv3_concept_id=ctv3_id,
+        ctv3_term_id="Y0000",
+        ctv3_term_type="P",
+        sct_concept_id=snomedct_id,
+        map_status=map_status,
+        effective_date=datetime.date(2020, 1, 1),
+        is_assured=is_assured,
+    )
+
+
+def test_mapping_index():
+    index = MappingIndex([("X0001", "1001"), ("X0001", "1002"), ("X0002", "1002")])
+
+    assert len(index) == 3
+    assert index.snomedct_ids_for_ctv3_id("X0001") == ["1001", "1002"]
+    assert index.snomedct_ids_for_ctv3_id("X0003") == []
+    assert index.ctv3_ids_for_snomedct_id("1002") == ["X0001", "X0002"]
+    assert index.pairs_for_ctv3_ids(["X0002", "X0003"]) == [("X0002", "1002")]
+    assert index.pairs_for_snomedct_ids(["1001", "1002"]) == [
+        ("X0001", "1001"),
+        ("X0001", "1002"),
+        ("X0002", "1002"),
+    ]
+
+
+def test_get_index_only_includes_assured_active_mappings():
+    create_mapping("X0001", "1001")
+    create_mapping("X0002", "1002", is_assured=False)
+    create_mapping("X0003", "1003", map_status=False)
+    create_mapping("X0004", None)
+
+    assert get_index().pairs_for_ctv3_ids(["X0001", "X0002", "X0003", "X0004"]) == [
+        ("X0001", "1001")
+    ]
+
+
+def test_get_index_is_reloaded_when_mappings_change():
+    create_mapping("X0001", "1001")
+    index = get_index()
+    assert get_index() is index
+
+    create_mapping("X0002", "1001")
+
+    assert get_index() is not index
+    assert get_index().ctv3_ids_for_snomedct_id("1001") == ["X0001", "X0002"]
+
+
+def test_get_index_is_reloaded_for_new_release(monkeypatch):
+    create_mapping("X0001", "1001")
+    index = build_index()
+
+    # Simulate importing a release in another process, which doesn't trigger any
+    # signals in this one.
+    Mapping.objects.filter(ctv3_concept_id="X0001").update(
+        map_status=False, effective_date=datetime.date(2021, 1, 1)
+    )
+
+    # The database isn't checked for a new release until the cache's check_interval
+    # has passed.
+    assert get_index() is index
+    monkeypatch.setattr(mapping_index.cache, "check_interval", 0)
+    assert get_index().pairs_for_ctv3_ids(["X0001"]) == []
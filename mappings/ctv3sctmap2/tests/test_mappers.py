@@ -2,11 +2,18 @@ import datetime
 import uuid
 from unittest.mock import patch
 
+import pytest
+
 from coding_systems.ctv3.models import RawConcept as CTV3Concept
-from coding_systems.ctv3.models import RawTerm
+from coding_systems.ctv3.models import RawConceptHierarchy, RawTerm
 from coding_systems.snomedct.models import Concept as SCTConcept
-from coding_systems.snomedct.models import Description
-from mappings.ctv3sctmap2.mappers import snomedct_to_ctv3
+from coding_systems.snomedct.models import Description, QueryTableRecord
+from mappings.ctv3sctmap2 import mappers
+from mappings.ctv3sctmap2.mappers import (
+    ctv3_to_snomedct,
+    read_code_to_snomedct_concepts,
+    snomedct_to_ctv3,
+)
 from mappings.ctv3sctmap2.models import Mapping
 
 
@@ -73,3 +80,105 @@ def test_snomedct_to_ctv3():
         }
     ]
     assert ctv3_ids == expected
+
+
+@pytest.mark.parametrize("batch_size", [1, 900])
+def test_ctv3_to_snomedct(tennis_elbow, monkeypatch, batch_size):
+    monkeypatch.setattr(mappers, "QUERY_BATCH_SIZE", batch_size)
+
+    # X0001 is a leaf, and X0002 has a child, X0003
+    for read_code in ["X0001", "X0002", "X0003"]:
+        ctv3_concept = CTV3Concept(read_code=read_code)
+        ctv3_concept.another_concept = ctv3_concept
+        ctv3_concept.save()
+    RawConceptHierarchy.objects.create(
+        parent_id="X0002", child_id="X0003", list_order="01"
+    )
+
+    for ctv3_id, snomedct_id in [
+        # 439656005 |Arthritis of elbow (disorder)|, which has child 202855006
+        # |Lateral epicondylitis (disorder)|
+        ("X0001", "439656005"),
+        # 8316001 |Arthropathy (disorder)|, which is inactive
+        ("X0001", "8316001"),
+        # 128133004 |Disorder of elbow (disorder)|
+        ("X0002", "128133004"),
+        ("X0003", "128133004"),
+    ]:
+        Mapping.objects.create(
+            id=uuid.uuid4(),
+            ctv3_concept_id=ctv3_id,
+            ctv3_term_id="Y0000",
+            ctv3_term_type="P",
+            sct_concept_id=snomedct_id,
+            is_assured=True,
+            map_status=True,
+            effective_date=datetime.date(2020, 1, 1),
+        )
+
+    # 29913006 |Rheumatism (disorder)| is inactive
+    QueryTableRecord.objects.create(
+        supertype_id="202855006", subtype_id="29913006", provenance=0
+    )
+
+    records = sorted(ctv3_to_snomedct(["X0001", "X0002"]), key=lambda r: r["id"])
+
+    assert records == [
+        {
+            "id": "128133004",
+            "name": "Disorder of elbow (disorder)",
+            "active": True,
+            "ctv3_ids": ["X0002", "X0003"],
+            "notes": "direct mapping",
+        },
+        {
+            "id": "202855006",
+            "name": "Lateral epicondylitis (disorder)",
+            "active": True,
+            "ctv3_ids": [],
+            "notes": "descendant of concept mapped from leaf",
+        },
+        {
+            "id": "29913006",
+            "name": "Rheumatism (disorder)",
+            "active": False,
+            "ctv3_ids": [],
+            "notes": "via Query Table",
+        },
+        {
+            "id": "439656005",
+            "name": "Arthritis of elbow (disorder)",
+            "active": True,
+            "ctv3_ids": ["X0001"],
+            "notes": "direct mapping",
+        },
+    ]
+
+
+@pytest.mark.parametrize("batch_size", [1, 900])
+def test_read_code_to_snomedct_concepts(tennis_elbow, monkeypatch, batch_size):
+    monkeypatch.setattr(mappers, "QUERY_BATCH_SIZE", batch_size)
+
+    for ctv3_id, snomedct_id in [
+        # 128133004 |Disorder of elbow (disorder)|
+        ("X0001", "128133004"),
+        # 8316001 |Arthropathy (disorder)|, which is inactive
+        ("X0001", "8316001"),
+        ("X0002", "8316001"),
+    ]:
+        Mapping.objects.create(
+            id=uuid.uuid4(),
+            ctv3_concept_id=ctv3_id,
+            ctv3_term_id="Y0000",
+            ctv3_term_type="P",
+            sct_concept_id=snomedct_id,
+            is_assured=True,
+            map_status=True,
+            effective_date=datetime.date(2020, 1, 1),
+        )
+
+    assert read_code_to_snomedct_concepts(["X0001", "X0002", "X0003"]) == {
+        "X0001": ["128133004"],
+        "X0002": [],
+        "X0003": [],
+    }
@@ -0,0 +1,29 @@
+from .models import Mapping
+
+
+def get_mappings(readv2_ids=None, ctv3_ids=None):
+    """Return mappings between Read V2 and CTV3 concepts that are assured and have
+    map_status=True (which means that the mapping is active).
+
+    The map has a row for each pair of terms, so there may be several rows for a pair
+    of concepts.  Each pair of concepts is returned once.  All the mappings for a batch
+    of codes are fetched with a single query, which uses the indexes on the concept ID
+    columns.
+    """
+
+    assert readv2_ids or ctv3_ids
+
+    mappings = Mapping.objects.filter(is_assured=True, map_status=True)
+    if readv2_ids:
+        mappings = mappings.filter(v2_concept_id__in=set(readv2_ids))
+    if ctv3_ids:
+        mappings = mappings.filter(ctv3_concept_id__in=set(ctv3_ids))
+
+    return [
+        {"readv2": readv2_id, "ctv3": ctv3_id}
+        for readv2_id, ctv3_id in mappings.values_list(
+            "v2_concept_id", "ctv3_concept_id"
+        )
+        .order_by("v2_concept_id", "ctv3_concept_id")
+        .distinct()
+    ]
@@ -0,0 +1,47 @@
+import datetime
+import uuid
+
+from mappings.rctctv3map.mappers import get_mappings
+from mappings.rctctv3map.models import Mapping
+
+
+def create_mapping(readv2_id, ctv3_id, v2_term_id="00", is_assured=True):
+    Mapping.objects.create(
+        id=uuid.uuid4(),
+        v2_concept_id=readv2_id,
+        v2_term_id=v2_term_id,
+        ctv3_term_id="Y0000",
+        ctv3_termtyp="P",
+        ctv3_concept_id=ctv3_id,
+        use_ctv3_term_id="",
+        stat="C",
+        map_typ="A",
+        map_status=True,
+        effective_date=datetime.date(2020, 1, 1),
+        is_assured=is_assured,
+    )
+
+
+def create_mappings():
+    create_mapping("G30..", "X200E")
+    # A second term for the same pair of concepts
+    create_mapping("G30..", "X200E", v2_term_id="11")
+    create_mapping("G30..", "G30..")
+    create_mapping("G300.", "X200E")
+    create_mapping("H33..", "H33..", is_assured=False)
+
+
+def test_get_mappings(django_assert_num_queries):
+    create_mappings()
+
+    with django_assert_num_queries(1):
+        get_mappings(readv2_ids=["G30..", "H33.."])
+
+    assert get_mappings(readv2_ids=["G30..", "H33.."]) == [
+        {"readv2": "G30..", "ctv3": "G30.."},
+        {"readv2": "G30..", "ctv3": "X200E"},
+    ]
+    assert get_mappings(ctv3_ids=["X200E"]) == [
+        {"readv2": "G30..", "ctv3": "X200E"},
+        {"readv2": "G300.", "ctv3": "X200E"},
+    ]
@@ -1,7 +1,81 @@
-from django.db import connection
+import re
+
+from django.db import connection, transaction
 
 
 def query(sql, params=None):
     with connection.cursor() as c:
         c.execute(sql, params)
         return c.fetchall()
+
+
+def fts_query(q):
+    """Return an FTS5 query that matches text containing each of the words in q, either
+    as a whole word or as the start of a word, or None if q contains no words.
+
+    Each word is quoted, so that characters in q that have a special meaning in FTS5
+    queries are ignored, and so that a user's search can't cause a syntax error.
+    """
+
+    words = re.findall(r"\w+", q)
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def bulk_update_by_key(model, filters, key_field, value_field, key_to_value):
+    """For each instance of model that matches filters and whose key_field is in
+    key_to_value, set value_field to the corresponding value.
+
+    filters is a dict mapping field names to values, which instances must be equal to.
+
+    The keys and values are loaded into a temporary table, and then all instances are
+    updated with a single UPDATE statement that looks up each new value in the
+    temporary table.  This means that the number of query parameters in any statement
+    does not grow with the number of updates, so we don't run into SQLite's limit on the
+    number of query parameters (which can be as low as 999), and the database doesn't
+    have to parse a statement with a huge IN clause or CASE expression.
+    """
+
+    if not key_to_value:
+        return
+
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
+    key_field = model._meta.get_field(key_field)
+    value_field = model._meta.get_field(value_field)
+    key_column = qn(key_field.column)
+    value_column = qn(value_field.column)
+    tmp_table = qn(f"tmp_{model._meta.db_table}_updates")
+
+    filter_sql = "".join(
+        f" AND {table}.{qn(model._meta.get_field(field).column)} = %s"
+        for field in filters
+    )
+
+    with transaction.atomic(), connection.cursor() as c:
+        c.execute(
+            f"""
+            CREATE TEMPORARY TABLE {tmp_table} (
+              k {key_field.db_type(connection)} PRIMARY KEY,
+              v {value_field.db_type(connection)}
+            )
+            """
+        )
+        try:
+            c.executemany(
+                f"INSERT INTO {tmp_table} (k, v) VALUES (%s, %s)",
+                list(key_to_value.items()),
+            )
+            c.execute(
+                f"""
+                UPDATE {table}
+                SET {value_column} = (
+                  SELECT v FROM {tmp_table} WHERE k = {table}.{key_column}
+                )
+                WHERE {table}.{key_column} IN (SELECT k FROM {tmp_table}){filter_sql}
+                """,
+                list(filters.values()),
+            )
+        finally:
+            c.execute(f"DROP TABLE {tmp_table}")
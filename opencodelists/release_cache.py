@@ -0,0 +1,106 @@
+"""A process-wide cache of values that are loaded from data that only changes when a new
+release of that data is imported.
+
+The cache records the release of the data that it was filled from, and is emptied when
+a different release is found in the database.  Since checking which release is in the
+database usually needs a query over a whole table, we do this at most once every
+check_interval seconds.  Modules that import new releases should also call clear() once
+they have done so, so that the current process doesn't wait for the next check.
+"""
+
+import threading
+import time
+
+RELEASE_CHECK_INTERVAL = 60
+
+
+class ReleaseCache:
+    """Values, keyed by ID, that are loaded on demand.
+
+    current_release is a function that returns a value identifying the release in the
+    database.  load is a function that takes a set of keys, and returns a dict mapping
+    each of them to its value.  When the cache holds more than max_size values, it is
+    emptied.
+    """
+
+    def __init__(
+        self,
+        current_release,
+        load,
+        max_size=None,
+        check_interval=RELEASE_CHECK_INTERVAL,
+    ):
+        self.current_release = current_release
+        self.load = load
+        self.max_size = max_size
+        self.check_interval = check_interval
+
+        self._lock = threading.Lock()
+        self._values = {}
+        self._release = None
+        self._release_checked_at = None
+        # Incremented whenever the cache is emptied, so that values loaded before then
+        # aren't added to it afterwards.
+        self._generation = 0
+
+    def get_many(self, keys):
+        """Return dict mapping each of the given keys to its value.
+
+        Keys that are not cached are loaded with a single call to load().  The returned
+        values are shared with the cache, and must not be modified.
+        """
+
+        keys = set(keys)
+
+        with self._lock:
+            self._check_release()
+            result = {key: self._values[key] for key in keys if key in self._values}
+            generation = self._generation
+
+        missing = keys - result.keys()
+        if missing:
+            loaded = self.load(missing)
+
+            with self._lock:
+                if generation == self._generation:
+                    if (
+                        self.max_size is not None
+                        and len(self._values) + len(loaded) > self.max_size
+                    ):
+                        self._values.clear()
+                    self._values.update(loaded)
+
+            result.update(loaded)
+
+        return result
+
+    def get(self, key):
+        """Return the value for a single key.  See get_many()."""
+
+        return self.get_many([key])[key]
+
+    def clear(self):
+        """Empty the cache, so that values are loaded again."""
+
+        with self._lock:
+            self._clear()
+            self._release = None
+
+    def _clear(self):
+        self._values.clear()
+        self._generation += 1
+
+    def _check_release(self):
+        now = time.monotonic()
+        if (
+            self._release_checked_at is not None
+            and self._release is not None
+            and now - self._release_checked_at < self.check_interval
+        ):
+            return
+
+        release = self.current_release()
+        self._release_checked_at = now
+        if release != self._release:
+            self._clear()
+            self._release = release
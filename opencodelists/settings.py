@@ -51,7 +51,8 @@ else:
 INSTALLED_APPS = [
     "opencodelists",
     "builder",
-    "codelists",
+    "codelists.apps.CodelistsConfig",
+    "conversions",
     "coding_systems.bnf",
     "coding_systems.ctv3",
     "coding_systems.dmd",
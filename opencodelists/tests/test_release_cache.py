@@ -0,0 +1,79 @@
+from opencodelists.release_cache import ReleaseCache
+
+
+class Source:
+    """Stands in for the database, recording the keys that are loaded."""
+
+    def __init__(self):
+        self.release = 1
+        self.loaded = []
+
+    def current_release(self):
+        return self.release
+
+    def load(self, keys):
+        self.loaded.append(set(keys))
+        return {key: f"{key}@{self.release}" for key in keys}
+
+
+def test_get_many():
+    source = Source()
+    cache = ReleaseCache(source.current_release, source.load)
+
+    assert cache.get_many(["a", "b"]) == {"a": "a@1", "b": "b@1"}
+    assert cache.get_many(["b", "c"]) == {"b": "b@1", "c": "c@1"}
+    assert cache.get("a") == "a@1"
+
+    # Only keys that weren't cached were loaded
+    assert source.loaded == [{"a", "b"}, {"c"}]
+
+
+def test_new_release():
+    source = Source()
+    cache = ReleaseCache(source.current_release, source.load)
+    assert cache.get("a") == "a@1"
+
+    # The new release isn't noticed until check_interval has passed
+    source.release = 2
+    assert cache.get("a") == "a@1"
+
+    cache.check_interval = 0
+    assert cache.get("a") == "a@2"
+
+
+def test_clear():
+    source = Source()
+    cache = ReleaseCache(source.current_release, source.load)
+    cache.get("a")
+
+    cache.clear()
+
+    assert cache.get("a") == "a@1"
+    assert source.loaded == [{"a"}, {"a"}]
+
+
+def test_max_size():
+    source = Source()
+    cache = ReleaseCache(source.current_release, source.load, max_size=2)
+    cache.get_many(["a", "b"])
+
+    # Adding another value empties the cache first
+    cache.get("c")
+    cache.get_many(["a", "c"])
+
+    assert source.loaded == [{"a", "b"}, {"c"}, {"a"}]
+
+
+def test_values_loaded_before_clear_are_not_cached():
+    source = Source()
+
+    def load(keys):
+        # Simulate another thread clearing the cache while values are being loaded
+        cache.clear()
+        return source.load(keys)
+
+    cache = ReleaseCache(source.current_release, load)
+
+    assert cache.get("a") == "a@1"
+    assert cache.get("a") == "a@1"
+    assert source.loaded == [{"a"}, {"a"}]
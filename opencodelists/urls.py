@@ -19,6 +19,7 @@ users_patterns = [
 urlpatterns = [
     path("", include("codelists.urls")),
     path("api/v1/", include("codelists.api_urls")),
+    path("api/v1/conversions/", include("conversions.api_urls")),
     path("users/", include(users_patterns)),
     path("admin/", admin.site.urls),
     path("accounts/", include("django.contrib.auth.urls")),
@@ -6,6 +6,10 @@ import Modal from "react-bootstrap/Modal";
 import TreeTables from "../common/tree-tables";
 import { getCookie } from "../utils";
 
+// Status updates are sent to the server in batches.  After a click, we wait for
+// this many milliseconds for further clicks before sending a batch.
+const UPDATE_DELAY = 300;
+
 class CodelistBuilder extends React.Component {
   constructor(props) {
     super(props);
@@ -17,7 +21,17 @@ class CodelistBuilder extends React.Component {
       moreInfoModalCode: null,
     };
 
+    // The sequence number of the most recently sent batch of updates.
+    this.seq = 0;
+
+    // The statuses that the server has reported as changed since the update
+    // queue was last empty.
+    this.serverChanges = {};
+
+    this.updateTimeout = null;
+
     this.updateStatus = props.isEditable ? this.updateStatus.bind(this) : null;
+    this.postUpdates = this.postUpdates.bind(this);
     this.showMoreInfoModal = this.showMoreInfoModal.bind(this);
     this.hideMoreInfoModal = this.hideMoreInfoModal.bind(this);
   }
@@ -29,6 +43,7 @@ class CodelistBuilder extends React.Component {
 
   componentWillUnmount() {
     this._isMounted = false;
+    clearTimeout(this.updateTimeout);
   }
 
   updateStatus(code, status) {
@@ -43,17 +58,36 @@ class CodelistBuilder extends React.Component {
         codeToStatus: newCodeToStatus,
         updateQueue: updateQueue.concat([[code, newCodeToStatus[code]]]),
       };
-    }, this.maybePostUpdates);
+    }, this.schedulePostUpdates);
+  }
+
+  schedulePostUpdates() {
+    // Wait for UPDATE_DELAY milliseconds after the most recent click before
+    // sending queued updates, so that rapid clicks are sent in one batch.
+
+    clearTimeout(this.updateTimeout);
+    this.updateTimeout = setTimeout(() => {
+      this.updateTimeout = null;
+      this.maybePostUpdates();
+    }, UPDATE_DELAY);
   }
 
   maybePostUpdates() {
-    if (this.state.updating || !this.state.updateQueue.length) {
+    if (
+      !this._isMounted ||
+      this.state.updating ||
+      this.updateTimeout !== null ||
+      !this.state.updateQueue.length
+    ) {
       return;
     }
     this.setState({ updating: true }, this.postUpdates);
   }
 
   postUpdates() {
+    this.seq += 1;
+    const seq = this.seq;
+
     fetch(this.props.updateURL, {
       method: "POST",
       credentials: "include",
@@ -63,9 +97,14 @@ class CodelistBuilder extends React.Component {
         "Content-Type": "application/json",
         "X-CSRFToken": getCookie("csrftoken"),
       },
-      body: JSON.stringify({ updates: this.state.updateQueue }),
+      body: JSON.stringify({ seq: seq, updates: this.state.updateQueue }),
     })
-      .then((response) => response.json())
+      .then((response) => {
+        if (!response.ok) {
+          throw new Error(`Updating codelist failed: ${response.status}`);
+        }
+        return response.json();
+      })
       .then((data) => {
         if (!this._isMounted) {
           // In tests the compenent is unmounted, and this may happen before
@@ -75,16 +114,47 @@ class CodelistBuilder extends React.Component {
           return;
         }
 
+        if (data.seq !== seq) {
+          // This is not the response to the batch we most recently sent, so
+          // the queued updates have not been applied.  Send them again.
+          this.setState({ updating: false }, this.maybePostUpdates);
+          return;
+        }
+
         const lastUpdates = data.updates;
+        Object.assign(this.serverChanges, data.changes);
 
         this.setState(
           (state) => {
             const newUpdateQueue = state.updateQueue.slice(lastUpdates.length);
-            return { updating: false, updateQueue: newUpdateQueue };
+            if (newUpdateQueue.length > 0) {
+              return { updating: false, updateQueue: newUpdateQueue };
+            }
+
+            // The server has now applied every update that we have applied
+            // locally, so the statuses it has reported should agree with ours.
+            // If they don't, the server's statuses win.
+            const serverChanges = this.serverChanges;
+            this.serverChanges = {};
+            return {
+              updating: false,
+              updateQueue: newUpdateQueue,
+              codeToStatus: { ...state.codeToStatus, ...serverChanges },
+            };
           },
 
           this.maybePostUpdates
         );
+      })
+      .catch((error) => {
+        console.error(error);
+        if (!this._isMounted) {
+          return;
+        }
+        // Leave the updates queued, and try sending them again after a delay,
+        // so that a server that keeps failing isn't sent a constant stream of
+        // requests.
+        this.setState({ updating: false }, this.schedulePostUpdates);
       });
   }
 
@@ -174,11 +244,11 @@ class CodelistBuilder extends React.Component {
   }
 
   renderMoreInfoModal(code) {
-    const included = this.props.allCodes.filter(
-      (c) => this.state.codeToStatus[c] === "+"
+    const included = new Set(
+      this.props.allCodes.filter((c) => this.state.codeToStatus[c] === "+")
     );
-    const excluded = this.props.allCodes.filter(
-      (c) => this.state.codeToStatus[c] === "-"
+    const excluded = new Set(
+      this.props.allCodes.filter((c) => this.state.codeToStatus[c] === "-")
     );
     const significantAncestors = this.props.hierarchy.significantAncestors(
       code,
@@ -4,17 +4,19 @@ import ReactDOM from "react-dom";
 import React from "react";
 
 import CodelistBuilder from "./codelistbuilder";
-import Hierarchy from "../hierarchy";
+import { decodeCompactHierarchy } from "../hierarchy";
 import { readValueFromPage } from "../utils";
 
-const hierarchy = new Hierarchy(
-  readValueFromPage("parent-map"),
-  readValueFromPage("child-map")
-);
+const {
+  hierarchy,
+  allCodes,
+  includedCodes,
+  excludedCodes,
+  codeToStatus,
+  codeToTerm,
+} = decodeCompactHierarchy(readValueFromPage("hierarchy"));
 
 const treeTables = readValueFromPage("tree-tables");
-const codeToStatus = readValueFromPage("code-to-status");
-const codeToTerm = readValueFromPage("code-to-term");
 
 const ancestorCodes = treeTables
   .map(([_, ancestorCodes]) => ancestorCodes) // eslint-disable-line no-unused-vars
@@ -34,9 +36,9 @@ ReactDOM.render(
     codeToStatus={codeToStatus}
     codeToTerm={codeToTerm}
     visiblePaths={visiblePaths}
-    allCodes={readValueFromPage("all-codes")}
-    includedCodes={readValueFromPage("included-codes")}
-    excludedCodes={readValueFromPage("excluded-codes")}
+    allCodes={allCodes}
+    includedCodes={includedCodes}
+    excludedCodes={excludedCodes}
     isEditable={readValueFromPage("is-editable")}
     updateURL={readValueFromPage("update-url")}
     searchURL={readValueFromPage("search-url")}
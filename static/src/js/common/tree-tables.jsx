@@ -3,14 +3,69 @@
 import Button from "react-bootstrap/Button";
 import React from "react";
 
+// When there are more than this many rows across all tree tables, the tables
+// are rendered in a scrollable viewport, and only the rows that are in or near
+// the viewport are rendered.
+const MAX_UNWINDOWED_ROWS = 500;
+
+// These are the heights, in pixels, of the elements in a windowed viewport.
+// Each element is given an explicit height, so that we can work out which
+// elements are in the viewport without measuring the DOM.
+const VIEWPORT_HEIGHT = 800;
+const HEADING_HEIGHT = 48;
+const ROW_HEIGHT = 30;
+const TOP_LEVEL_ROW_HEIGHT = 38;
+
+// The number of extra elements to render above and below the viewport, so that
+// scrolling doesn't briefly reveal blank space.
+const OVERSCAN = 10;
+
 class TreeTables extends React.Component {
   constructor(props) {
     super(props);
-    this.state = { visiblePaths: props.visiblePaths };
+    this.state = {
+      visiblePaths: props.visiblePaths,
+      windowStart: 0,
+      windowEnd: 0,
+      loadError: null,
+    };
+    // The position of the viewport, and the indexes of the elements that were
+    // last rendered in it.
+    this.scrollTop = 0;
+    this.renderedWindow = null;
+    this.cachedLayout = null;
+    // Codes whose children are being loaded, so that we don't request them
+    // twice if a row is clicked again before they arrive.
+    this.loadingCodes = new Set();
     this.toggleVisibility = this.toggleVisibility.bind(this);
+    this.handleScroll = this.handleScroll.bind(this);
   }
 
   toggleVisibility(path) {
+    const { hierarchy, loadChildren } = this.props;
+    const code = path.split(":").slice(-1)[0];
+
+    if (!hierarchy.isLoaded(code)) {
+      // The children of this code are loaded on demand, and haven't been
+      // loaded yet.
+      if (this.loadingCodes.has(code)) {
+        return;
+      }
+      this.loadingCodes.add(code);
+      loadChildren(code)
+        .then(() => {
+          this.loadingCodes.delete(code);
+          this.setState({ loadError: null });
+          this.toggleVisibility(path);
+        })
+        .catch((error) => {
+          // Leave the row collapsed, so that the user can try again.
+          this.loadingCodes.delete(code);
+          this.setState({ loadError: error.message });
+        });
+      return;
+    }
+
     this.setState((state) => {
       const visiblePaths = new Set(state.visiblePaths);
       this.props.hierarchy.toggleVisibility(visiblePaths, path);
@@ -18,82 +73,98 @@ class TreeTables extends React.Component {
     });
   }
 
-  render() {
-    const {
+  handleScroll(event) {
+    // Scrolling doesn't change the rows or their offsets, so we only need to
+    // work out which elements are now in the viewport, and only re-render if
+    // that has changed.
+    this.scrollTop = event.currentTarget.scrollTop;
+    const { start, end } = windowBounds(
+      this.layout().offsets,
+      this.scrollTop,
+      VIEWPORT_HEIGHT,
+      OVERSCAN
+    );
+    const rendered = this.renderedWindow;
+    if (!rendered || start !== rendered.start || end !== rendered.end) {
+      this.setState({ windowStart: start, windowEnd: end });
+    }
+  }
+
+  layout() {
+    // Return the rows of each table, and for a windowed viewport, the list of
+    // elements (headings and rows) with their offsets.  These depend only on
+    // the inputs below, and are recomputed when one of them changes, but not
+    // when the user scrolls.
+
+    const { hierarchy, treeTables, codeToStatus, codeToTerm } = this.props;
+    const { visiblePaths } = this.state;
+    const inputs = [
       hierarchy,
       treeTables,
       codeToStatus,
       codeToTerm,
-      updateStatus,
-      showMoreInfoModal,
-    } = this.props;
-
-    return treeTables.map(([heading, ancestorCodes]) => (
-      <TreeTable
-        key={heading}
-        hierarchy={hierarchy}
-        heading={heading}
-        ancestorCodes={ancestorCodes}
-        codeToStatus={codeToStatus}
-        codeToTerm={codeToTerm}
-        visiblePaths={this.state.visiblePaths}
-        toggleVisibility={this.toggleVisibility}
-        updateStatus={updateStatus}
-        showMoreInfoModal={showMoreInfoModal}
-      />
-    ));
-  }
-}
+      visiblePaths,
+    ];
 
-function TreeTable(props) {
-  const {
-    hierarchy,
-    heading,
-    ancestorCodes,
-    codeToStatus,
-    codeToTerm,
-    visiblePaths,
-    toggleVisibility,
-    updateStatus,
-    showMoreInfoModal,
-  } = props;
+    if (
+      this.cachedLayout &&
+      inputs.every((input, ix) => input === this.cachedLayout.inputs[ix])
+    ) {
+      return this.cachedLayout;
+    }
 
-  return (
-    <div className="mb-4">
-      <h4>{heading}</h4>
-
-      {ancestorCodes.map((ancestorCode) => (
-        <Tree
-          key={ancestorCode}
-          hierarchy={hierarchy}
-          ancestorCode={ancestorCode}
-          codeToStatus={codeToStatus}
-          codeToTerm={codeToTerm}
-          visiblePaths={visiblePaths}
-          toggleVisibility={toggleVisibility}
-          updateStatus={updateStatus}
-          showMoreInfoModal={showMoreInfoModal}
-        />
-      ))}
-    </div>
-  );
-}
+    const tables = treeTables.map(([heading, ancestorCodes]) => ({
+      heading: heading,
+      rows: ancestorCodes
+        .map((ancestorCode) =>
+          hierarchy.treeRows(
+            ancestorCode,
+            codeToStatus,
+            codeToTerm,
+            visiblePaths
+          )
+        )
+        .flat(),
+    }));
 
-function Tree(props) {
-  const {
-    hierarchy,
-    ancestorCode,
-    codeToStatus,
-    codeToTerm,
-    visiblePaths,
-    toggleVisibility,
-    updateStatus,
-    showMoreInfoModal,
-  } = props;
+    const numRows = tables.reduce((n, table) => n + table.rows.length, 0);
+
+    // Flatten the tables into a single list of elements (headings and rows),
+    // each with a known height, so that we can render only those near the
+    // viewport.
+    const elements = tables
+      .map(({ heading, rows }) => [
+        { heading: heading, height: HEADING_HEIGHT },
+        ...rows.map((row) => ({
+          row: row,
+          height: row.pipes.length === 0 ? TOP_LEVEL_ROW_HEIGHT : ROW_HEIGHT,
+        })),
+      ])
+      .flat();
+    const offsets = elementOffsets(elements.map((element) => element.height));
+
+    this.cachedLayout = { inputs, tables, numRows, elements, offsets };
+    return this.cachedLayout;
+  }
+
+  render() {
+    return (
+      <React.Fragment>
+        {this.state.loadError && (
+          <div className="alert alert-danger" role="alert">
+            {this.state.loadError}.  Please try again.
+          </div>
+        )}
+        {this.renderTables()}
+      </React.Fragment>
+    );
+  }
+
+  renderTables() {
+    const { updateStatus, showMoreInfoModal } = this.props;
+    const { tables, numRows, elements, offsets } = this.layout();
 
-  return hierarchy
-    .treeRows(ancestorCode, codeToStatus, codeToTerm, visiblePaths)
-    .map((row) => (
+    const renderRow = (row) => (
       <TreeRow
         key={row.path}
         code={row.code}
@@ -103,11 +174,105 @@ function Tree(props) {
         pipes={row.pipes}
         hasDescendants={row.hasDescendants}
         isExpanded={row.isExpanded}
-        toggleVisibility={toggleVisibility}
+        toggleVisibility={this.toggleVisibility}
         updateStatus={updateStatus}
         showMoreInfoModal={showMoreInfoModal}
       />
-    ));
+    );
+
+    if (numRows <= MAX_UNWINDOWED_ROWS) {
+      return tables.map(({ heading, rows }) => (
+        <div key={heading} className="mb-4">
+          <h4>{heading}</h4>
+          {rows.map(renderRow)}
+        </div>
+      ));
+    }
+
+    const { start, end } = windowBounds(
+      offsets,
+      this.scrollTop,
+      VIEWPORT_HEIGHT,
+      OVERSCAN
+    );
+    this.renderedWindow = { start, end };
+
+    return (
+      <div
+        style={{ height: VIEWPORT_HEIGHT, overflowY: "auto" }}
+        onScroll={this.handleScroll}
+      >
+        <div style={{ height: offsets[elements.length], position: "relative" }}>
+          <div style={{ transform: `translateY(${offsets[start]}px)` }}>
+            {elements.slice(start, end).map((element) => (
+              // display: flow-root stops the margins of the element's contents
+              // from leaking out, so that the element has exactly the given
+              // height.  Its contents don't wrap, and any that are too wide
+              // can be scrolled to, rather than being clipped.
+              <div
+                key={element.heading || element.row.path}
+                style={{
+                  height: element.height,
+                  display: "flow-root",
+                  whiteSpace: "nowrap",
+                }}
+              >
+                {element.heading ? (
+                  <h4>{element.heading}</h4>
+                ) : (
+                  renderRow(element.row)
+                )}
+              </div>
+            ))}
+          </div>
+        </div>
+      </div>
+    );
+  }
+}
+
+function elementOffsets(heights) {
+  // Given the heights of a list of elements, return the offset of each element
+  // from the top of the list.  The returned array has one more entry than
+  // heights, which is the total height of the list.
+
+  const offsets = [0];
+  heights.forEach((height, ix) => offsets.push(offsets[ix] + height));
+  return offsets;
+}
+
+function windowBounds(offsets, scrollTop, viewportHeight, overscan) {
+  // Given the offsets of a list of elements, as returned by elementOffsets(),
+  // return the indexes of the first element to render (start) and of the
+  // element after the last element to render (end), so that all elements in
+  // the viewport are rendered, along with overscan elements on either side.
+  //
+  // This takes time proportional to the number of elements in the viewport,
+  // plus the logarithm of the total number of elements.
+
+  const numElements = offsets.length - 1;
+
+  // Binary search for the first element whose bottom edge is below scrollTop.
+  let lo = 0;
+  let hi = numElements;
+  while (lo < hi) {
+    const mid = Math.floor((lo + hi) / 2);
+    if (offsets[mid + 1] <= scrollTop) {
+      lo = mid + 1;
+    } else {
+      hi = mid;
+    }
+  }
+
+  let end = lo;
+  while (end < numElements && offsets[end] < scrollTop + viewportHeight) {
+    end++;
+  }
+
+  return {
+    start: Math.max(0, lo - overscan),
+    end: Math.min(numElements, end + overscan),
+  };
 }
 
 function TreeRow(props) {
@@ -245,4 +410,4 @@ function DescendantToggle(props) {
   );
 }
 
-export default TreeTables;
+export { TreeTables as default, elementOffsets, windowBounds };
@@ -1,3 +1,7 @@
+// Statuses are sent by the server as indexes into this array.  This must be kept in
+// sync with STATUSES in codelists/presenters.py.
+const STATUSES = ["?", "!", "+", "(+)", "-", "(-)"];
+
 class Hierarchy {
   constructor(parentMap, childMap) {
     this.nodes = new Set([...Object.keys(parentMap), ...Object.keys(childMap)]);
@@ -5,9 +9,46 @@ class Hierarchy {
     this.childMap = childMap;
     this.ancestorMap = {};
     this.descendantMap = {};
+    this.unloadedCodes = new Set();
+    this.statusSets = null;
+  }
+
+  markUnloaded(code) {
+    // Record that code has children which have not yet been loaded.  This is
+    // used for trees whose nodes are loaded on demand.
+
+    if (!(code in this.childMap)) {
+      this.nodes.add(code);
+      this.unloadedCodes.add(code);
+    }
+  }
+
+  isLoaded(code) {
+    return !this.unloadedCodes.has(code);
+  }
+
+  addChildren(code, childCodes) {
+    // Add edges between code and each of childCodes, once the children of
+    // code have been loaded.
+
+    this.childMap[code] = childCodes;
+    childCodes.forEach((childCode) => {
+      this.nodes.add(childCode);
+      this.parentMap[childCode] = (this.parentMap[childCode] || []).concat(
+        code
+      );
+    });
+    this.unloadedCodes.delete(code);
+
+    // Any cached ancestors and descendants may now be incomplete.
+    this.ancestorMap = {};
+    this.descendantMap = {};
+    this.statusSets = null;
   }
 
   getAncestors(node) {
+    // Return Set of ancestors of node.  The returned Set must not be modified.
+
     if (!(node in this.ancestorMap)) {
       let ancestors = new Set();
       if (node in this.parentMap) {
@@ -19,13 +60,16 @@ class Hierarchy {
         }
       }
 
-      this.ancestorMap[node] = [...ancestors];
+      this.ancestorMap[node] = ancestors;
     }
 
     return this.ancestorMap[node];
   }
 
   getDescendants(node) {
+    // Return Set of descendants of node.  The returned Set must not be
+    // modified.
+
     if (!(node in this.descendantMap)) {
       let descendants = new Set();
       if (node in this.childMap) {
@@ -37,7 +81,7 @@ class Hierarchy {
         }
       }
 
-      this.descendantMap[node] = [...descendants];
+      this.descendantMap[node] = descendants;
     }
 
     return this.descendantMap[node];
@@ -46,37 +90,74 @@ class Hierarchy {
   updateCodeToStatus(codeToStatus, code, status) {
     // Given mapping from codes to statuses, a code, and that code's new
     // status, return an updated mapping.
+    //
+    // Only the statuses of code and its descendants can change, so only these
+    // are recomputed.
 
-    let included = Object.keys(codeToStatus).filter(
-      (c) => codeToStatus[c] === "+" && c !== code
-    );
-    let excluded = Object.keys(codeToStatus).filter(
-      (c) => codeToStatus[c] === "-" && c !== code
-    );
+    const { included, excluded } = this.includedAndExcluded(codeToStatus);
 
+    included.delete(code);
+    excluded.delete(code);
     if (status === "+" && codeToStatus[code] !== "+") {
-      included.push(code);
+      included.add(code);
     } else if (status === "-" && codeToStatus[code] !== "-") {
-      excluded.push(code);
+      excluded.add(code);
     }
 
-    return Object.fromEntries(
-      [...this.nodes].map((code) => [
-        code,
-        this.codeStatus(code, included, excluded),
-      ])
-    );
+    const newCodeToStatus = { ...codeToStatus };
+    newCodeToStatus[code] = this.codeStatus(code, included, excluded);
+    this.getDescendants(code).forEach((descendant) => {
+      newCodeToStatus[descendant] = this.codeStatus(
+        descendant,
+        included,
+        excluded
+      );
+    });
+
+    // Remember the Sets of included and excluded codes for the new mapping, so
+    // that we don't have to rebuild them if the new mapping is passed to the
+    // next call.
+    this.statusSets = {
+      codeToStatus: newCodeToStatus,
+      included: included,
+      excluded: excluded,
+    };
+
+    return newCodeToStatus;
+  }
+
+  includedAndExcluded(codeToStatus) {
+    // Return Sets of codes that are directly included and excluded in the
+    // given mapping.  The returned Sets may be modified.
+
+    if (this.statusSets && this.statusSets.codeToStatus === codeToStatus) {
+      const { included, excluded } = this.statusSets;
+      this.statusSets = null;
+      return { included, excluded };
+    }
+
+    const included = new Set();
+    const excluded = new Set();
+    Object.keys(codeToStatus).forEach((code) => {
+      if (codeToStatus[code] === "+") {
+        included.add(code);
+      } else if (codeToStatus[code] === "-") {
+        excluded.add(code);
+      }
+    });
+    return { included, excluded };
   }
 
   codeStatus(code, included, excluded) {
-    // Return status of code, given lists of codes that are included and excluded.
+    // Return status of code, given Sets of codes that are included and
+    // excluded.
 
-    if (included.includes(code)) {
+    if (included.has(code)) {
       // this code is explicitly included
       return "+";
     }
 
-    if (excluded.includes(code)) {
+    if (excluded.has(code)) {
       // this code is explicitly excluded
       return "-";
     }
@@ -110,35 +191,33 @@ class Hierarchy {
 
   significantAncestors(code, included, excluded) {
     // Find ancestors of code which are both:
-    //   * members of included or excluded, and
+    //   * members of included or excluded (which are Sets), and
     //   * not overridden by any of their descendants
     //
     // If A is an ancestor of B and B is an ancestor of C, then we say that B overrides
     // A because B is closer to C than A.
 
-    const ancestors = this.getAncestors(code);
-
     // these are the ancestors of the code that are directly included or excluded
-    const includedOrExcludedAncestors = ancestors.filter(
-      (a) => included.includes(a) || excluded.includes(a)
-    );
+    const includedOrExcludedAncestors = [];
+    this.getAncestors(code).forEach((a) => {
+      if (included.has(a) || excluded.has(a)) {
+        includedOrExcludedAncestors.push(a);
+      }
+    });
 
     // these are the ancestors of the code that are directly included or excluded,
-    // and which are not overridden by any of their descendants
+    // and which are not overridden by any of their descendants.  There are
+    // usually only a handful of these, and a can only be overridden by one of
+    // them, so we check whether a is an ancestor of any of them rather than
+    // looking through all of a's descendants.
     const significantAncestors = includedOrExcludedAncestors.filter(
       (a) =>
-        !this.getDescendants(a).some((d) =>
-          includedOrExcludedAncestors.includes(d)
-        )
+        !includedOrExcludedAncestors.some((b) => this.getAncestors(b).has(a))
     );
 
     return {
-      includedAncestors: significantAncestors.filter((a) =>
-        included.includes(a)
-      ),
-      excludedAncestors: significantAncestors.filter((a) =>
-        excluded.includes(a)
-      ),
+      includedAncestors: significantAncestors.filter((a) => included.has(a)),
+      excludedAncestors: significantAncestors.filter((a) => excluded.has(a)),
     };
   }
 
@@ -176,7 +255,7 @@ class Hierarchy {
         term: codeToTerm[code],
         path: path,
         pipes: prevPipes.concat(isLastSibling ? "└" : "├").slice(1),
-        hasDescendants: childCodes.length > 0,
+        hasDescendants: childCodes.length > 0 || !this.isLoaded(code),
         isExpanded: isExpanded,
       });
 
@@ -253,7 +332,7 @@ class Hierarchy {
         // the same status as it.
         newDepth = depth + 1;
       } else if (
-        this.getDescendants(code).every((d) =>
+        [...this.getDescendants(code)].every((d) =>
           codeToStatus[d].includes(codeToStatus[code])
         )
       ) {
@@ -292,4 +371,45 @@ class Hierarchy {
   }
 }
 
-export { Hierarchy as default };
+function decodeCompactHierarchy(data) {
+  // Decode the compact representation of a hierarchy, and of the statuses and
+  // terms of its codes, produced by present_compact_hierarchy() in
+  // codelists/presenters.py.
+  //
+  // Codes are referred to by their index in data.codes.  data.statuses gives
+  // the status of each of the first data.statuses.length codes, and data.edges
+  // is a flat array of alternating parent and child indexes.
+
+  const { codes, terms, statuses, edges } = data;
+
+  const parentMap = {};
+  const childMap = {};
+  for (let ix = 0; ix < edges.length; ix += 2) {
+    const parent = codes[edges[ix]];
+    const child = codes[edges[ix + 1]];
+    (parentMap[child] = parentMap[child] || []).push(parent);
+    (childMap[parent] = childMap[parent] || []).push(child);
+  }
+
+  const codeToTerm = {};
+  codes.forEach((code, ix) => {
+    codeToTerm[code] = terms[ix];
+  });
+
+  const allCodes = codes.slice(0, statuses.length);
+  const codeToStatus = {};
+  allCodes.forEach((code, ix) => {
+    codeToStatus[code] = STATUSES[statuses[ix]];
+  });
+
+  return {
+    hierarchy: new Hierarchy(parentMap, childMap),
+    allCodes: allCodes,
+    includedCodes: allCodes.filter((code) => codeToStatus[code] === "+"),
+    excludedCodes: allCodes.filter((code) => codeToStatus[code] === "-"),
+    codeToTerm: codeToTerm,
+    codeToStatus: codeToStatus,
+  };
+}
+
+export { Hierarchy as default, decodeCompactHierarchy };
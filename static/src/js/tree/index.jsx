@@ -7,23 +7,51 @@ import Hierarchy from "../hierarchy";
 import TreeTables from "../common/tree-tables";
 import { readValueFromPage } from "../utils";
 
-const hierarchy = new Hierarchy(
-  readValueFromPage("parent-map"),
-  readValueFromPage("child-map")
-);
+// Only the top-level rows of each tree are included in the page.  The children
+// of each row are loaded from the server when the row is first expanded.
+
+const hierarchy = new Hierarchy({}, {});
+const codeToStatus = {};
+const codeToTerm = {};
+const treeURL = readValueFromPage("tree-url");
+
+const addRows = (rows) => {
+  // Record the status and term of each row, and return the rows' codes.
 
-const treeTables = readValueFromPage("tree-tables");
-const codeToStatus = readValueFromPage("code-to-status");
-const codeToTerm = readValueFromPage("code-to-term");
+  rows.forEach((row) => {
+    codeToStatus[row.code] = row.status;
+    codeToTerm[row.code] = row.term;
+    if (row.num_descendants > 0) {
+      hierarchy.markUnloaded(row.code);
+    }
+  });
+  return rows.map((row) => row.code);
+};
+
+const loadChildren = (code) =>
+  fetch(`${treeURL}?code=${encodeURIComponent(code)}`, {
+    credentials: "include",
+    headers: { Accept: "application/json" },
+  })
+    .then((response) => {
+      if (!response.ok) {
+        throw new Error(
+          `Loading children of ${code} failed with status ${response.status}`
+        );
+      }
+      return response.json();
+    })
+    .then((data) => hierarchy.addChildren(code, addRows(data.children)));
+
+const treeTables = readValueFromPage("tree-tables").map(([heading, rows]) => [
+  heading,
+  addRows(rows),
+]);
 
 const ancestorCodes = treeTables
   .map(([, ancestorCodes]) => ancestorCodes)
   .flat();
-const visiblePaths = hierarchy.initiallyVisiblePaths(
-  ancestorCodes,
-  codeToStatus,
-  0
-);
+const visiblePaths = new Set(ancestorCodes);
 
 ReactDOM.render(
   <TreeTables
@@ -32,6 +60,7 @@ ReactDOM.render(
     codeToStatus={codeToStatus}
     codeToTerm={codeToTerm}
     visiblePaths={visiblePaths}
+    loadChildren={loadChildren}
     updateStatus={null}
     showMoreInfoModal={null}
   />,
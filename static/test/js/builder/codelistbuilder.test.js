@@ -6,7 +6,7 @@ import { act } from "react-dom/test-utils";
 import "@testing-library/jest-dom";
 
 import CodelistBuilder from "../../../src/js/builder/codelistbuilder";
-import Hierarchy from "../../../src/js/hierarchy";
+import { decodeCompactHierarchy } from "../../../src/js/hierarchy";
 
 // See builder/management/commands/generate_builder_fixtures.py and
 // opencodelists/tests/fixtures.py for details about what these fixtures contain.
@@ -30,18 +30,26 @@ afterEach(() => {
 // Not sure if this is the best approach, but it works!
 global.fetch = jest.fn().mockImplementation((url, config) =>
   Promise.resolve({
-    json: () => Promise.resolve(JSON.parse(config.body)),
+    ok: true,
+    json: () => Promise.resolve({ ...JSON.parse(config.body), changes: {} }),
   })
 );
 
 const testRender = (data) => {
-  const hierarchy = new Hierarchy(data.parent_map, data.child_map);
+  const {
+    hierarchy,
+    allCodes,
+    includedCodes,
+    excludedCodes,
+    codeToStatus,
+    codeToTerm,
+  } = decodeCompactHierarchy(data.hierarchy);
   const ancestorCodes = data.tree_tables
     .map(([_, ancestorCodes]) => ancestorCodes) // eslint-disable-line no-unused-vars
     .flat();
   const visiblePaths = hierarchy.initiallyVisiblePaths(
     ancestorCodes,
-    data.code_to_status,
+    codeToStatus,
     1
   );
 
@@ -51,12 +59,12 @@ const testRender = (data) => {
         searches={data.searches}
         filter={data.filter}
         treeTables={data.tree_tables}
-        codeToStatus={data.code_to_status}
-        codeToTerm={data.code_to_term}
+        codeToStatus={codeToStatus}
+        codeToTerm={codeToTerm}
         visiblePaths={visiblePaths}
-        allCodes={data.all_codes}
-        includedCodes={data.included_codes}
-        excludedCodes={data.excluded_codes}
+        allCodes={allCodes}
+        includedCodes={includedCodes}
+        excludedCodes={excludedCodes}
         isEditable={data.is_editable}
         updateURL={data.update_url}
         searchURL={data.search_url}
@@ -85,13 +93,20 @@ it("renders version_from_scratch without error", () => {
 
 it("does the right thing when clicking around", () => {
   const data = versionWithSomeSearchesData;
-  const hierarchy = new Hierarchy(data.parent_map, data.child_map);
+  const {
+    hierarchy,
+    allCodes,
+    includedCodes,
+    excludedCodes,
+    codeToStatus,
+    codeToTerm,
+  } = decodeCompactHierarchy(data.hierarchy);
   const ancestorCodes = data.tree_tables
     .map(([_, ancestorCodes]) => ancestorCodes) // eslint-disable-line no-unused-vars
     .flat();
   const visiblePaths = hierarchy.initiallyVisiblePaths(
     ancestorCodes,
-    data.code_to_status,
+    codeToStatus,
     100 // we want all codes to be visible so that we can check statuses
   );
 
@@ -187,12 +202,12 @@ it("does the right thing when clicking around", () => {
         searches={data.searches}
         filter={data.filter}
         treeTables={data.tree_tables}
-        codeToStatus={data.code_to_status}
-        codeToTerm={data.code_to_term}
+        codeToStatus={codeToStatus}
+        codeToTerm={codeToTerm}
         visiblePaths={visiblePaths}
-        allCodes={data.all_codes}
-        includedCodes={data.included_codes}
-        excludedCodes={data.excluded_codes}
+        allCodes={allCodes}
+        includedCodes={includedCodes}
+        excludedCodes={excludedCodes}
         isEditable={data.is_editable}
         updateURL={data.update_url}
         searchURL={data.search_url}
@@ -235,3 +250,74 @@ it("does the right thing when clicking around", () => {
   checkSummary();
   checkStatus();
 });
+
+it("sends rapid clicks to the server in one batch", () => {
+  jest.useFakeTimers();
+  fetch.mockClear();
+
+  testRender(versionWithSomeSearchesData);
+
+  const click = (code, symbol) => {
+    const button = container.querySelector(
+      `[data-code='${code}'] button[data-symbol='${symbol}']`
+    );
+    button.dispatchEvent(new MouseEvent("click", { bubbles: true }));
+  };
+
+  act(() => {
+    click("128133004", "-"); // Exclude Disorder of elbow
+    click("128133004", "-"); // Un-exclude Disorder of elbow
+  });
+
+  expect(fetch).not.toHaveBeenCalled();
+
+  act(() => {
+    jest.runAllTimers();
+  });
+
+  expect(fetch).toHaveBeenCalledTimes(1);
+  const body = JSON.parse(fetch.mock.calls[0][1].body);
+  expect(body.seq).toBe(1);
+  expect(body.updates.length).toBe(2);
+
+  jest.useRealTimers();
+});
+
+it("sends queued updates again after a failed request", async () => {
+  jest.useFakeTimers();
+  fetch.mockClear();
+  fetch.mockImplementationOnce(() =>
+    Promise.resolve({ ok: false, status: 500 })
+  );
+  const consoleError = jest
+    .spyOn(console, "error")
+    .mockImplementation(() => {});
+
+  testRender(versionWithSomeSearchesData);
+
+  act(() => {
+    const button = container.querySelector(
+      "[data-code='128133004'] button[data-symbol='-']"
+    );
+    button.dispatchEvent(new MouseEvent("click", { bubbles: true }));
+  });
+
+  // The first request fails, and the update stays queued
+  await act(async () => {
+    jest.runAllTimers();
+  });
+  expect(fetch).toHaveBeenCalledTimes(1);
+
+  // The update is sent again after a delay
+  await act(async () => {
+    jest.runAllTimers();
+  });
+  expect(fetch).toHaveBeenCalledTimes(2);
+  const firstBody = JSON.parse(fetch.mock.calls[0][1].body);
+  const secondBody = JSON.parse(fetch.mock.calls[1][1].body);
+  expect(secondBody.seq).toBe(firstBody.seq + 1);
+  expect(secondBody.updates).toEqual(firstBody.updates);
+
+  consoleError.mockRestore();
+  jest.useRealTimers();
+});
@@ -0,0 +1,31 @@
+"use strict";
+
+import {
+  elementOffsets,
+  windowBounds,
+} from "../../../src/js/common/tree-tables";
+
+test("elementOffsets", () => {
+  expect(elementOffsets([10, 10, 20, 10])).toEqual([0, 10, 20, 40, 50]);
+  expect(elementOffsets([])).toEqual([0]);
+});
+
+test("windowBounds", () => {
+  const offsets = elementOffsets([10, 10, 20, 10, 10, 10, 10, 10]);
+
+  expect(windowBounds(offsets, 0, 25, 0)).toEqual({ start: 0, end: 3 });
+
+  // the viewport starts halfway through the third element
+  expect(windowBounds(offsets, 30, 25, 0).start).toBe(2);
+  expect(windowBounds(offsets, 30, 25, 0).end).toBe(5);
+
+  // overscan adds elements either side, without going past either end
+  expect(windowBounds(offsets, 30, 25, 1).start).toBe(1);
+  expect(windowBounds(offsets, 30, 25, 1).end).toBe(6);
+  expect(windowBounds(offsets, 30, 25, 10).start).toBe(0);
+  expect(windowBounds(offsets, 30, 25, 10).end).toBe(8);
+
+  // the viewport is scrolled to the bottom
+  expect(windowBounds(offsets, 65, 25, 0).start).toBe(5);
+  expect(windowBounds(offsets, 65, 25, 0).end).toBe(8);
+});
@@ -1,6 +1,6 @@
 "use strict";
 
-import Hierarchy from "../../src/js/hierarchy";
+import Hierarchy, { decodeCompactHierarchy } from "../../src/js/hierarchy";
 
 test("updateCodeToStatus", () => {
   const hierarchy = buildTestHierarchy();
@@ -45,13 +45,56 @@ test("updateCodeToStatus", () => {
   });
 });
 
+test("updateCodeToStatus matches full recompute on random hierarchies", () => {
+  // Apply a sequence of random updates to random hierarchies, and after each
+  // update check that the incrementally updated statuses match the statuses
+  // computed from scratch by a separate Hierarchy.
+  const random = seededRandom(12345);
+
+  for (let trial = 0; trial < 20; trial++) {
+    const { parentMap, childMap, codes } = buildRandomHierarchy(random, 30);
+    const hierarchy = new Hierarchy(parentMap, childMap);
+    const included = new Set();
+    const excluded = new Set();
+    let codeToStatus = Object.fromEntries(codes.map((code) => [code, "?"]));
+
+    for (let step = 0; step < 30; step++) {
+      const code = codes[Math.floor(random() * codes.length)];
+      const status = random() < 0.5 ? "+" : "-";
+
+      // Setting a code to the status it already has clears the status.
+      const wasIncluded = included.has(code);
+      const wasExcluded = excluded.has(code);
+      included.delete(code);
+      excluded.delete(code);
+      if (status === "+" && !wasIncluded) {
+        included.add(code);
+      } else if (status === "-" && !wasExcluded) {
+        excluded.add(code);
+      }
+
+      codeToStatus = hierarchy.updateCodeToStatus(codeToStatus, code, status);
+
+      const fresh = new Hierarchy(parentMap, childMap);
+      const expected = Object.fromEntries(
+        codes.map((c) => [c, fresh.codeStatus(c, included, excluded)])
+      );
+      expect(codeToStatus).toEqual(expected);
+    }
+  }
+});
+
 test("codeStatus", () => {
   const hierarchy = buildTestHierarchy();
 
   function codeToStatus(included, excluded) {
     let codeToStatus = {};
     hierarchy.nodes.forEach((node) => {
-      codeToStatus[node] = hierarchy.codeStatus(node, included, excluded);
+      codeToStatus[node] = hierarchy.codeStatus(
+        node,
+        new Set(included),
+        new Set(excluded)
+      );
     });
     return codeToStatus;
   }
@@ -378,6 +421,70 @@ test("toggleVisibility", () => {
   );
 });
 
+test("loading children on demand", () => {
+  const hierarchy = new Hierarchy({}, {});
+  hierarchy.markUnloaded("a");
+
+  expect(hierarchy.isLoaded("a")).toBe(false);
+  expect(
+    hierarchy.treeRows("a", { a: "+" }, { a: "Ay" }, new Set(["a"]))
+  ).toEqual([
+    {
+      code: "a",
+      status: "+",
+      term: "Ay",
+      path: "a",
+      pipes: [],
+      hasDescendants: true,
+      isExpanded: false,
+    },
+  ]);
+
+  hierarchy.addChildren("a", ["b", "c"]);
+  hierarchy.markUnloaded("b");
+
+  expect(hierarchy.isLoaded("a")).toBe(true);
+  expect(hierarchy.isLoaded("b")).toBe(false);
+  expect(hierarchy.isLoaded("c")).toBe(true);
+  expect(hierarchy.nodes).toEqual(new Set(["a", "b", "c"]));
+  expect(hierarchy.getDescendants("a")).toEqual(new Set(["b", "c"]));
+  expect(hierarchy.getAncestors("c")).toEqual(new Set(["a"]));
+
+  hierarchy.addChildren("b", ["d"]);
+
+  expect(hierarchy.getDescendants("a")).toEqual(new Set(["b", "c", "d"]));
+});
+
+test("decodeCompactHierarchy", () => {
+  //    a
+  //   / \
+  //  b   c
+  //   \ /
+  //    d
+  const {
+    hierarchy,
+    allCodes,
+    includedCodes,
+    excludedCodes,
+    codeToTerm,
+    codeToStatus,
+  } = decodeCompactHierarchy({
+    codes: ["b", "c", "d", "a"],
+    terms: ["Bee", "Sea", "Dee", "Ay"],
+    statuses: [2, 4, 1],
+    edges: [0, 2, 1, 2, 3, 0, 3, 1],
+  });
+
+  expect(hierarchy.parentMap).toEqual({ b: ["a"], c: ["a"], d: ["b", "c"] });
+  expect(hierarchy.childMap).toEqual({ a: ["b", "c"], b: ["d"], c: ["d"] });
+  expect(hierarchy.nodes).toEqual(new Set(["a", "b", "c", "d"]));
+  expect(allCodes).toEqual(["b", "c", "d"]);
+  expect(includedCodes).toEqual(["b"]);
+  expect(excludedCodes).toEqual(["c"]);
+  expect(codeToTerm).toEqual({ a: "Ay", b: "Bee", c: "Sea", d: "Dee" });
+  expect(codeToStatus).toEqual({ b: "+", c: "-", d: "!" });
+});
+
 function buildTestHierarchy() {
   // Return hierarchy with following structure:
   //
@@ -411,3 +518,37 @@ function buildTestHierarchy() {
 
   return new Hierarchy(parentMap, childMap);
 }
+
+function buildRandomHierarchy(random, numCodes) {
+  // Return parent and child maps of a random hierarchy, in which each code
+  // other than the root has one or two parents chosen from earlier codes.
+
+  const codes = [...Array(numCodes).keys()].map((ix) => `c${ix}`);
+  const parentMap = {};
+  const childMap = {};
+  codes.slice(1).forEach((code, ix) => {
+    const parents = new Set();
+    const numParents = random() < 0.3 ? 2 : 1;
+    while (parents.size < Math.min(numParents, ix + 1)) {
+      parents.add(codes[Math.floor(random() * (ix + 1))]);
+    }
+    parentMap[code] = [...parents];
+    parents.forEach((parent) => {
+      childMap[parent] = (childMap[parent] || []).concat(code);
+    });
+  });
+  return { parentMap, childMap, codes };
+}
+
+function seededRandom(seed) {
+  // Return a function returning pseudo-random numbers in [0, 1), so that
+  // tests are repeatable.  This is the mulberry32 generator.
+
+  return () => {
+    seed |= 0;
+    seed = (seed + 0x6d2b79f5) | 0;
+    let t = Math.imul(seed ^ (seed >>> 15), 1 | seed);
+    t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t;
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+  };
+}